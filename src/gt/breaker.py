@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of sending while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Fail fast once a dependency keeps failing, instead of waiting out a
+    timeout per item.
+
+    After ``threshold`` consecutive failures the breaker opens and
+    ``check()`` raises :class:`CircuitOpen` for ``cooldown`` seconds. Then one
+    trial call is let through; its success closes the breaker again, its
+    failure re-opens it. A ``threshold`` of 0 disables the breaker.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._last_error = ""
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def check(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if not self._trial and self._clock() - self._opened_at >= self.cooldown:
+                # Half-open: this caller probes; everyone else keeps failing fast.
+                self._trial = True
+                return
+            raise CircuitOpen(
+                f"skipped after {self._failures} consecutive failures (last: {self._last_error})"
+            )
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self, error: BaseException) -> None:
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) or type(error).__name__
+            if self.threshold > 0 and (self._trial or self._failures >= self.threshold):
+                self._opened_at = self._clock()
+            self._trial = False
@@ -1,51 +1,255 @@
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import sys
-from typing import Optional
+import time
+from typing import Iterator, Optional, Union
 
 from . import __version__
+from . import breaker as br
 from . import github as gh
 from . import keychain as kc
 from . import config as cfg
 from . import todoist as td
-from .util import log_debug, strip_markdown, open_url
+from . import journal as jr
+from . import labels as lb
+from . import metrics
+from . import picker
+from . import pipeline as pl
+from . import ratelimit as rl
+from . import rules as rs
+from . import store as st
+from . import taskfile as tf
+from . import template as tp
+from .util import GH_TIMEOUT, log_debug, open_url, set_gh_timeout
+
+# Exit status when some issues were imported and others failed.
+EXIT_PARTIAL = 3
+
 
 def build_main_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="gh gt", description="Create Todoist task(s) from GitHub issue(s)")
-    p.add_argument("numbers", type=int, nargs="+", help="GitHub issue number(s)")
-    p.add_argument("--repo", dest="repo", help="Use a specific repository owner/repo instead of cwd")
+    p.add_argument(
+        "numbers",
+        nargs="*",
+        metavar="issue",
+        help="GitHub issue number(s), owner/repo#N reference(s) or issue URL(s)",
+    )
+    p.add_argument("--repo", dest="repo", help="Repository (owner/repo) for bare issue numbers instead of cwd")
+    p.add_argument(
+        "--from-file",
+        dest="from_file",
+        metavar="PATH",
+        help="Read issues one per line (N, owner/repo#N or issue URL) from PATH, or '-' for stdin",
+    )
     p.add_argument("--project-id", dest="project_id")
     p.add_argument("--section-id", dest="section_id")
     p.add_argument("--priority", dest="priority", type=int, choices=[1, 2, 3, 4])
     p.add_argument("--due", dest="due")
     p.add_argument("--labels-as-tags", dest="labels_as_tags", action="store_true")
     p.add_argument("--strip-markdown", dest="strip_md", action="store_true")
+    p.add_argument(
+        "--include-comments",
+        dest="include_comments",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Append the last N issue comments to the task description",
+    )
+    p.add_argument(
+        "--include-linked-prs",
+        dest="include_linked_prs",
+        action="store_true",
+        help="Append cross-referenced pull requests to the task description",
+    )
+    p.add_argument(
+        "--extra-bytes",
+        dest="extra_bytes",
+        type=int,
+        default=2000,
+        metavar="BYTES",
+        help="Byte budget for appended comments and linked PRs (default: 2000)",
+    )
+    fields = ", ".join("{%s}" % f for f in pl.TEMPLATE_FIELDS)
+    p.add_argument(
+        "--content-template",
+        dest="content_template",
+        metavar="TEMPLATE",
+        help=f"Task content, e.g. '[{{repo}}] {{title}}' (fields: {fields}; default: the profile's 'content_template' or '#{{number}} {{title}}')",
+    )
+    p.add_argument(
+        "--description-template",
+        dest="description_template",
+        metavar="TEMPLATE",
+        help="Task description, same fields (default: the profile's 'description_template' or body, comments and URL)",
+    )
+    p.add_argument(
+        "--rules",
+        dest="rules",
+        metavar="PATH",
+        help="Label mapping rules file (default: rules.json in the gh-gt config dir, if present)",
+    )
+    p.add_argument("--no-rules", dest="no_rules", action="store_true", help="Ignore label mapping rules")
     p.add_argument("--open", dest="open_after", action="store_true")
+    p.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        help="Fetch issues and print the task payloads and request estimates without calling Todoist",
+    )
+    p.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Create up to N tasks concurrently (default: the profile's 'jobs' setting or 4; shares one rate limit)",
+    )
+    p.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=None,
+        help=f"Issues fetched before their tasks are sent, in GitHub requests of {gh.GRAPHQL_BATCH} run --jobs at a time (default: {gh.GRAPHQL_BATCH} x --jobs)",
+    )
+    p.add_argument(
+        "--max-github-points",
+        dest="max_github_points",
+        type=int,
+        metavar="N",
+        help="Spend at most N GitHub GraphQL points in this run; issues past the cap fail (resume later)",
+    )
+    p.add_argument(
+        "--connect-timeout",
+        dest="connect_timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Todoist connect timeout (default: the profile's 'connect_timeout' or 5)",
+    )
+    p.add_argument(
+        "--read-timeout",
+        dest="read_timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Todoist read timeout (default: the profile's 'read_timeout' or 20)",
+    )
+    p.add_argument(
+        "--gh-timeout",
+        dest="gh_timeout",
+        type=float,
+        default=GH_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Kill a gh call that runs longer than this (default: {GH_TIMEOUT:g}; 0 waits forever)",
+    )
+    p.add_argument(
+        "--fail-fast-after",
+        dest="fail_fast_after",
+        type=int,
+        default=5,
+        metavar="K",
+        help="After K consecutive Todoist failures, queue or fail the rest without sending (default: 5; 0 disables)",
+    )
+    p.add_argument(
+        "--no-outbox",
+        dest="no_outbox",
+        action="store_true",
+        help="Fail instead of queueing tasks locally when Todoist is unreachable",
+    )
+    p.add_argument(
+        "--upsert",
+        dest="upsert",
+        action="store_true",
+        help="Update the task an issue already has (sending only changed fields) instead of creating another; implies --skip-unchanged",
+    )
+    p.add_argument(
+        "--skip-unchanged",
+        dest="skip_unchanged",
+        action="store_true",
+        help="Skip issues whose title, body, labels and mapping are unchanged since their task was last written;"
+        " without --upsert, changed issues that already have a task are skipped too",
+    )
+    p.add_argument(
+        "--metrics-listen",
+        dest="metrics_listen",
+        metavar="[HOST:]PORT",
+        help="Serve Prometheus metrics at http://HOST:PORT/metrics while the run lasts (host defaults to 127.0.0.1)",
+    )
+    p.add_argument(
+        "--metrics-file",
+        dest="metrics_file",
+        metavar="PATH",
+        help="When the run ends, write Prometheus metrics to PATH (for node_exporter's textfile collector)",
+    )
+    p.add_argument("--journal", dest="journal", metavar="PATH", help="Record per-issue progress to a checkpoint journal")
+    p.add_argument(
+        "--resume",
+        dest="resume",
+        metavar="JOURNAL",
+        help="Continue an interrupted run from its journal, skipping issues already created",
+    )
+    p.add_argument(
+        "--failures-out",
+        dest="failures_out",
+        metavar="PATH",
+        help="On partial failure, write the failed issue numbers to PATH (one per line) for a retry",
+    )
+    p.add_argument(
+        "--output",
+        dest="output",
+        choices=["text", "jsonl"],
+        default="text",
+        help="Output format; jsonl writes one JSON object per issue as it completes",
+    )
+    p.add_argument(
+        "--backend",
+        dest="backend",
+        choices=td.BACKENDS,
+        help="Todoist API backend (default: the profile's 'backend' setting or auto; sync batches task creation)",
+    )
+    _add_profile_arg(p)
     p.add_argument("-v", "--verbose", action="store_true", help="Show brief progress and backend info")
     p.add_argument("-V", "--version", action="version", version=f"gh-gt {__version__}")
     return p
 
 
+def _add_profile_arg(p: argparse.ArgumentParser) -> None:
+    # SUPPRESS keeps a subcommand's default from hiding a --profile given before it.
+    p.add_argument(
+        "--profile",
+        dest="profile",
+        default=argparse.SUPPRESS,
+        help="Todoist account profile to use (default: $GH_GT_PROFILE or 'default')",
+    )
+
+
 def build_auth_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="gh gt auth", description="Manage Todoist auth token")
+    _add_profile_arg(p)
     sub = p.add_subparsers(dest="auth_cmd")
 
     td = sub.add_parser("todoist", help="Set/Save Todoist token")
     td.add_argument("--token", help="Todoist API token to save (optional; prompts if omitted)")
     td.add_argument("--save", choices=["keychain", "file"], default="keychain")
+    _add_profile_arg(td)
 
-    sub.add_parser("unset", help="Delete stored Todoist token")
-    sub.add_parser("show", help="Show token storage status")
+    _add_profile_arg(sub.add_parser("unset", help="Delete stored Todoist token"))
+    _add_profile_arg(sub.add_parser("show", help="Show token storage status"))
     return p
 
 
 def build_config_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="gh gt config", description="Configure gh-gt defaults")
+    _add_profile_arg(p)
     sub = p.add_subparsers(dest="cfg_cmd")
-    proj = sub.add_parser("project", help="Select and save default Todoist project")
+    proj = sub.add_parser("project", help="Select and save default Todoist project (and section)")
     proj.add_argument("--clear", action="store_true", help="Clear default project")
+    proj.add_argument("--refresh", action="store_true", help="Re-read projects from Todoist instead of the local cache")
+    _add_profile_arg(proj)
+    # main() scans argv for -v itself; accept it on either side of the subcommand.
+    for parser in (p, proj):
+        parser.add_argument("-v", "--verbose", action="store_true", default=argparse.SUPPRESS, help="Show backend info")
     return p
 
 
@@ -83,60 +287,342 @@ def run_auth(args: argparse.Namespace) -> int:
             if ans in ("y", "yes", ""):
                 return run_config_project_interactive(clear=False)
         return 0 if ok else 1
+    if args.auth_cmd == "unset":
+        for m in kc.unset_token():
+            print(m)
+        return 0
+    if args.auth_cmd == "show":
+        print(kc.show_status())
+        return 0
+    # Default if user runs `gh gt auth` without subcmd
+    print("Usage: gh gt auth [todoist|unset|show] ...", file=sys.stderr)
+    return 2
 
 
-def run_config_project_interactive(clear: bool, *, show_backend: bool = False) -> int:
+def run_config_project_interactive(clear: bool, *, show_backend: bool = False, refresh: bool = False) -> int:
     if clear:
         cfg.set_default_project_id(None)
         print("default project cleared")
         return 0
     try:
         client = td.TodoistClient()
-        projects = client.list_projects()
+        fetched = False
+
+        def fetch() -> Iterator[dict]:
+            nonlocal fetched
+            fetched = True
+            return client.project_tree()
+
+        entries = picker.load_index(fetch, getattr(client, "token", None) or "", refresh=refresh)
         if show_backend:
-            sys.stderr.write(f"Using Todoist {client.last_backend()}\n")
-        if not projects:
+            sys.stderr.write(f"Using Todoist {client.last_backend()}\n" if fetched else "Using cached project index\n")
+        if not entries:
             print("No projects found in Todoist", file=sys.stderr)
             return 1
-        print("프로젝트를 선택하세요:")
-        for idx, p in enumerate(projects, 1):
-            print(f"  {idx}. {p['name']} ({p['id']})")
-        while True:
-            try:
-                choice = input("번호 입력: ").strip()
-            except EOFError:
-                choice = ""
-            if not choice:
-                print("취소됨")
-                return 1
-            if choice.isdigit():
-                i = int(choice)
-                if 1 <= i <= len(projects):
-                    sel = projects[i - 1]
-                    cfg.set_default_project_id(sel["id"])
-                    print(f"기본 프로젝트 설정: {sel['name']} ({sel['id']})")
-                    return 0
-            print("잘못된 입력입니다. 다시 시도하세요.")
+        index = picker.ProjectIndex(entries)
+        if picker.tty_available():
+            sel = picker.pick_tty(index, prompt="프로젝트 검색: ")
+        else:
+            sel = _pick_numbered(entries, index)
+        if sel is None:
+            print("취소됨")
+            return 1
+        cfg.set_default_project_id(sel.project_id, section_id=sel.section_id)
+        kind = "섹션" if sel.section_id else "프로젝트"
+        print(f"기본 {kind} 설정: {sel.label.strip().lstrip('/ ')}")
+        return 0
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
 
+def _pick_numbered(entries: list[picker.Entry], index: picker.ProjectIndex) -> Optional[picker.Entry]:
+    # Line-based fallback when there is no terminal for the live picker:
+    # a number chooses, any other text filters the list.
+    print("프로젝트 또는 섹션을 선택하세요 (번호 입력, 또는 검색어로 필터):")
+    numbers = {id(e): i for i, e in enumerate(entries, 1)}
+    for i, e in enumerate(entries, 1):
+        print(f"  {i}. {e.label}")
+    while True:
+        try:
+            choice = input("번호 입력: ").strip()
+        except EOFError:
+            choice = ""
+        if not choice:
+            return None
+        if choice.isdigit():
+            i = int(choice)
+            if 1 <= i <= len(entries):
+                return entries[i - 1]
+            print("잘못된 입력입니다. 다시 시도하세요.")
+            continue
+        matches = index.search(choice)
+        if not matches:
+            print("일치하는 항목이 없습니다.")
+        for e in matches:
+            print(f"  {numbers[id(e)]}. {e.label.strip()}")
+
+
 def run_config(args: argparse.Namespace, *, show_backend: bool = False) -> int:
     if args.cfg_cmd == "project":
-        return run_config_project_interactive(clear=args.clear, show_backend=show_backend)
+        return run_config_project_interactive(clear=args.clear, show_backend=show_backend, refresh=args.refresh)
     print("Usage: gh gt config project [--clear]", file=sys.stderr)
     return 2
-    if args.auth_cmd == "unset":
-        for m in unset_token():
-            print(m)
+
+
+def build_flush_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="gh gt flush", description="Send tasks queued while Todoist was unreachable")
+    p.add_argument("--backend", dest="backend", choices=td.BACKENDS, help="Todoist API backend (sync sends 100 per request)")
+    _add_profile_arg(p)
+    p.add_argument("-v", "--verbose", action="store_true", help="Show backend info")
+    return p
+
+
+def build_export_parser() -> argparse.ArgumentParser:
+    p = build_main_parser()
+    p.prog = "gh gt export"
+    p.description = "Build Todoist task payloads from GitHub issue(s) and write them to a file for 'gh gt submit'"
+    p.add_argument(
+        "-o",
+        "--out",
+        dest="export_out",
+        required=True,
+        metavar="FILE",
+        help="NDJSON file to write, one task per line ('-' for stdout; gzip-compressed if it ends in .gz)",
+    )
+    return p
+
+
+def build_submit_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="gh gt submit", description="Create the tasks in a file written by 'gh gt export'")
+    p.add_argument("file", metavar="FILE", help="Task file from 'gh gt export' ('-' for stdin; gzip is detected)")
+    p.add_argument("--backend", dest="backend", choices=td.BACKENDS, help="Todoist API backend (sync sends 100 per request)")
+    p.add_argument("-j", "--jobs", dest="jobs", type=int, default=4, help="Concurrent Todoist requests (default: 4)")
+    p.add_argument(
+        "--retry-unconfirmed",
+        dest="retry_unconfirmed",
+        action="store_true",
+        help="Also send tasks whose earlier send timed out or got a 5xx (check Todoist for them first)",
+    )
+    _add_profile_arg(p)
+    p.add_argument("-v", "--verbose", action="store_true", help="Show backend info")
+    return p
+
+
+def run_submit(args: argparse.Namespace) -> int:
+    store = st.Store()
+    try:
+        client = td.client_for_profile(token=_ensure_token(), backend=args.backend)
+        if args.verbose:
+            sys.stderr.write(f"Submitting {args.file} via Todoist {client.last_backend()}\n")
+        created = skipped = 0
+        failures: list[pl.Outcome] = []
+        label_sync = lb.LabelSync(client, cache_path=os.path.join(cfg.cache_dir(), "labels.json"))
+        records = tf.read_tasks(args.file)
+        outcomes = pl.submit_tasks(
+            client,
+            records,
+            store=store,
+            jobs=max(1, args.jobs),
+            label_sync=label_sync,
+            retry_unconfirmed=args.retry_unconfirmed,
+        )
+        for outcome in outcomes:
+            if outcome.status == pl.CREATED:
+                created += 1
+                print(f"created: {outcome.task.id} - {outcome.task.content}")
+            elif outcome.status == pl.SKIPPED:
+                skipped += 1
+                print(f"skipped: {outcome.ref} ({outcome.detail})", file=sys.stderr)
+            else:
+                print(f"Error: {outcome.detail} ({outcome.ref})", file=sys.stderr)
+                failures.append(outcome)
+        if failures:
+            _print_summary(created, skipped, failures)
+            return EXIT_PARTIAL if created or skipped else 1
         return 0
-    if args.auth_cmd == "show":
-        print(show_status())
+    except KeyboardInterrupt:
+        print("Interrupted; run the same submit again to send the rest", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+
+def run_flush(args: argparse.Namespace) -> int:
+    store = st.Store()
+    try:
+        queued = store.pending_count()
+        if not queued:
+            print("outbox is empty")
+            return 0
+        # One quick check instead of a timeout per queued task.
+        if not td.reachable():
+            print(f"Error: Todoist is unreachable; {queued} task(s) still queued", file=sys.stderr)
+            return 1
+        client = td.client_for_profile(token=_ensure_token(), backend=args.backend)
+        if args.verbose:
+            sys.stderr.write(f"Flushing {queued} queued task(s) via Todoist {client.last_backend()}\n")
+        created = skipped = 0
+        failures: list[pl.Outcome] = []
+        for outcome in pl.flush_outbox(client, store):
+            if outcome.status == pl.CREATED:
+                created += 1
+                print(f"created: {outcome.task.id} - {outcome.task.content}")
+            elif outcome.status == pl.SKIPPED:
+                skipped += 1
+                print(f"skipped: {outcome.ref} ({outcome.detail})", file=sys.stderr)
+            else:
+                print(f"Error: {outcome.detail} ({outcome.ref})", file=sys.stderr)
+                failures.append(outcome)
+        left = store.pending_count()
+        if failures or left:
+            _print_summary(created, skipped, failures, queued=left)
+            return EXIT_PARTIAL if created or skipped else 1
         return 0
-    # Default if user runs `gh gt auth` without subcmd
-    print("Usage: gh gt auth [todoist|unset|show] ...", file=sys.stderr)
-    return 2
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+
+def _ensure_token() -> Optional[str]:
+    # Ensure token present; if missing and interactive, prompt and save
+    token = kc.get_token()
+    if not token and sys.stdin.isatty() and sys.stdout.isatty():
+        import getpass
+
+        print("Todoist API 토큰이 필요합니다.")
+        token = getpass.getpass("토큰 입력: ").strip()
+        if not token:
+            raise RuntimeError("no token provided")
+        try:
+            choice = (input("토큰을 어디에 저장할까요? 키체인(K) / 파일(f) [K/f]: ") or "K").strip().lower()
+        except EOFError:
+            choice = "k"
+        target = "keychain" if choice in ("", "k", "keychain") else "file"
+        ok, msg = kc.save_token(token, where=target)
+        print(msg)
+    return token
+
+
+class _Plan:
+    """Payload sizes and request estimates for --dry-run."""
+
+    def __init__(self) -> None:
+        self.tasks = 0
+        self.total_bytes = 0
+        self.max_bytes = 0
+        self.max_ref = ""
+        self.repos: set[str] = set()
+
+    def add(self, outcome: pl.Outcome) -> None:
+        size = len(json.dumps(outcome.payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        self.tasks += 1
+        self.total_bytes += size
+        if size > self.max_bytes:
+            self.max_bytes, self.max_ref = size, outcome.ref
+        if outcome.repo:
+            self.repos.add(outcome.repo)
+
+    def report(self, *, github_requests: int, jobs: int, backend: Optional[str] = None) -> None:
+        w = sys.stderr.write
+        w(f"\nPlan: {self.tasks} task(s) from {len(self.repos)} repositories (dry run; nothing was created)\n")
+        if self.tasks:
+            avg = self.total_bytes // self.tasks
+            w(f"  payload bytes: total {self.total_bytes}, avg {avg}, max {self.max_bytes} ({self.max_ref})\n")
+        w(f"  GitHub requests: {github_requests} (batched GraphQL)\n")
+        if backend == "sync":
+            requests = -(-self.tasks // td.SYNC_BATCH)
+            w(f"  Todoist requests: {requests} (Sync API, up to {td.SYNC_BATCH} tasks each)\n")
+        else:
+            requests = self.tasks
+            w(f"  Todoist requests: {requests} (one per task, {jobs} concurrent)\n")
+        # The bucket allows a full window's worth up front, then refills steadily.
+        limit, window = rl.TODOIST_REQUESTS, rl.TODOIST_WINDOW
+        over = max(0, requests - limit)
+        if over:
+            minutes = over * window / limit / 60
+            w(f"  rate limit: {limit} requests / {window // 60} min; at least ~{minutes:.0f} min of throttling\n")
+        else:
+            w(f"  rate limit: {limit} requests / {window // 60} min; fits in one window\n")
+
+
+def _github_usage(budget: rl.GitHubBudget) -> str:
+    if budget.remaining is None:
+        return ""
+    line = f"GitHub: {budget.used} point(s) used; {budget.remaining}/{budget.limit} left"
+    if budget.reset_at:
+        line += " until " + time.strftime("%H:%M", time.localtime(budget.reset_at))
+    return line
+
+
+def _print_summary(
+    created: int, skipped: int, failures: list[pl.Outcome], *, queued: int = 0, updated: int = 0, unchanged: int = 0
+) -> None:
+    w = sys.stderr.write
+    line = f"\nSummary: {created} created, {len(failures)} failed, {skipped} skipped"
+    if updated or unchanged:
+        line += f", {updated} updated, {unchanged} unchanged"
+    if queued:
+        line += f", {queued} queued (send with: gh gt flush)"
+    w(line + "\n")
+    width = max((len(f.ref) for f in failures), default=0)
+    for f in failures:
+        w(f"  {f.ref:<{width}}  {f.detail}\n")
+
+
+def _write_failures(path: str, failures: list[pl.Outcome]) -> None:
+    # One issue reference per line, so the file can be fed straight back in:
+    #   gh gt --from-file failures.txt
+    with open(path, "w", encoding="utf-8") as f:
+        for failure in failures:
+            f.write(f"{failure.ref}\n")
+
+
+def _write_jsonl(outcome: pl.Outcome) -> None:
+    task = outcome.task
+    rec = {
+        "repo": outcome.repo,
+        "number": outcome.number,
+        "task_id": task.id if task else None,
+        "url": task.url if task else None,
+        "backend": outcome.backend,
+        "latency_ms": round(outcome.latency_ms, 1) if outcome.latency_ms is not None else None,
+        "status": outcome.status,
+    }
+    if outcome.status != pl.CREATED:
+        rec["ref"] = outcome.ref
+        rec["detail"] = outcome.detail
+    if outcome.status == pl.PLANNED:
+        rec["payload"] = outcome.payload
+    sys.stdout.write(json.dumps(rec, separators=(",", ":"), ensure_ascii=False) + "\n")
+    # Flush per record so downstream consumers see results while the run continues.
+    sys.stdout.flush()
+
+
+def _iter_input_lines(path: str) -> Iterator[str]:
+    # Read lazily so an unbounded stdin stream is processed as it arrives.
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in f:
+            line = line.strip()
+            # Blank lines and "# comments" are ignored; "#123" is an issue.
+            if not line or (line.startswith("#") and not line[1:].isdigit()):
+                continue
+            yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _iter_inputs(args: argparse.Namespace) -> Iterator[Union[int, str]]:
+    yield from args.numbers
+    if args.from_file:
+        yield from _iter_input_lines(args.from_file)
 
 
 def main(argv: Optional[list[str]] = None) -> int:
@@ -146,10 +632,12 @@ def main(argv: Optional[list[str]] = None) -> int:
     if argv and argv[0] == "auth":
         auth_parser = build_auth_parser()
         auth_args = auth_parser.parse_args(argv[1:])
+        cfg.set_active_profile(getattr(auth_args, "profile", None))
         return run_auth(auth_args)
     if argv and argv[0] == "config":
         cfg_parser = build_config_parser()
         cfg_args = cfg_parser.parse_args(argv[1:])
+        cfg.set_active_profile(getattr(cfg_args, "profile", None))
         # Allow leading -v/--verbose before subcommand
         show_backend = False
         for a in argv:
@@ -157,74 +645,236 @@ def main(argv: Optional[list[str]] = None) -> int:
                 show_backend = True
                 break
         return run_config(cfg_args, show_backend=show_backend)
-
-    parser = build_main_parser()
-    args = parser.parse_args(argv)
+    if argv and argv[0] == "flush":
+        flush_args = build_flush_parser().parse_args(argv[1:])
+        cfg.set_active_profile(getattr(flush_args, "profile", None))
+        return run_flush(flush_args)
+    if argv and argv[0] == "submit":
+        submit_args = build_submit_parser().parse_args(argv[1:])
+        cfg.set_active_profile(getattr(submit_args, "profile", None))
+        return run_submit(submit_args)
+
+    exporting = bool(argv) and argv[0] == "export"
+    parser = build_export_parser() if exporting else build_main_parser()
+    args = parser.parse_args(argv[1:] if exporting else argv)
+    export_out: Optional[str] = getattr(args, "export_out", None)
+    if exporting:
+        # Build everything a real run would, but send nothing.
+        args.dry_run = True
+    cfg.set_active_profile(getattr(args, "profile", None))
+    set_gh_timeout(args.gh_timeout)
+    if args.jobs is None:
+        jobs = cfg.profile_settings().get("jobs")
+        args.jobs = jobs if isinstance(jobs, int) and jobs > 0 else 4
+    if args.batch_size is None:
+        args.batch_size = gh.GRAPHQL_BATCH * max(1, args.jobs)
+    templates: dict[str, Optional[tp.Template]] = {}
+    for name in ("content_template", "description_template"):
+        source = getattr(args, name) or cfg.profile_settings().get(name)
+        try:
+            templates[name] = pl.compile_template(source) if source else None
+        except ValueError as e:
+            parser.error(f"invalid {name.replace('_', ' ')}: {e}")
+    if args.journal and args.resume:
+        parser.error("--journal and --resume are mutually exclusive")
+    if args.dry_run and args.journal:
+        parser.error("--dry-run does not write a journal")
+    if export_out == "-" and args.output == "jsonl":
+        parser.error("--output jsonl also writes to stdout; export to a file with -o FILE")
+
+    done = jr.JournalState()
+    if args.resume:
+        try:
+            done = jr.load(args.resume)
+        except OSError as e:
+            print(f"Error: cannot read journal: {e}", file=sys.stderr)
+            return 1
+        if not args.numbers and not args.from_file:
+            args.numbers = list(done.header.get("numbers") or [])
+            args.from_file = done.header.get("from_file")
+            if args.from_file == "-":
+                parser.error("the journaled run read stdin; pipe the same input again with --from-file -")
+        if not args.repo:
+            args.repo = done.header.get("repo")
+    if not args.numbers and not args.from_file:
+        parser.error("at least one issue number (or --from-file) is required")
+
+    journal: Optional[jr.Journal] = None
+    store: Optional[st.Store] = None
+    writer = None
+    metrics_server = None
+    if args.metrics_listen:
+        try:
+            host, port = metrics.parse_listen(args.metrics_listen)
+            metrics_server = metrics.serve(port, host)
+        except (OSError, ValueError) as e:
+            parser.error(f"--metrics-listen: {e}")
+    default_repo: Optional[str] = None
+
+    def resolve_default_repo() -> str:
+        # Only resolved once, and only if a bare number shows up.
+        nonlocal default_repo
+        if default_repo is None:
+            default_repo = gh.resolve_repo(args.repo)
+        return default_repo
 
     try:
-        repo = gh.resolve_repo(args.repo)
-
-        # Ensure token present; if missing and interactive, prompt and save
-        token = kc.get_token()
-        if not token and sys.stdin.isatty() and sys.stdout.isatty():
-            import getpass
-
-            print("Todoist API 토큰이 필요합니다.")
-            token = getpass.getpass("토큰 입력: ").strip()
-            if not token:
-                raise RuntimeError("no token provided")
-            try:
-                choice = (input("토큰을 어디에 저장할까요? 키체인(K) / 파일(f) [K/f]: ") or "K").strip().lower()
-            except EOFError:
-                choice = "k"
-            target = "keychain" if choice in ("", "k", "keychain") else "file"
-            ok, msg = kc.save_token(token, where=target)
-            print(msg)
-
-        client = td.TodoistClient(token=token)
-        if args.verbose:
-            sys.stderr.write(f"Using Todoist {client.last_backend()}\n")
-        # Default project if not provided
-        project_id = args.project_id or cfg.get_default_project_id()
-
-        for num in args.numbers:
-            issue = gh.fetch_issue(repo, num)
-
-            body = issue.body or ""
-            if args.strip_md and body:
-                body = strip_markdown(body)
-
-            description = body.strip()
-            if description:
-                description += "\n\n" + issue.html_url
-            else:
-                description = issue.html_url
-
-            content = f"#{issue.number} {issue.title}"
-
-            labels = None
-            if args.labels_as_tags and issue.labels:
-                labels = issue.labels
-
-            task = client.add_task(
-                content=content,
-                description=description,
-                project_id=project_id,
-                section_id=args.section_id,
-                priority=args.priority,
-                due_string=args.due,
-                labels=labels,
+        journal_path = args.resume or args.journal
+        if journal_path and not args.dry_run:
+            journal = jr.Journal(journal_path)
+            journal.start(
+                repo=args.repo,
+                numbers=args.numbers,
+                from_file=args.from_file,
+                resumed=bool(args.resume),
+                version=__version__,
             )
 
-            print(f"created: {task.id} - {task.content}")
-            if task.url:
-                print(task.url)
-                if args.open_after:
-                    open_url(task.url)
+        client: Optional[td.TodoistClient] = None
+        if not args.dry_run:
+            client = td.client_for_profile(
+                token=_ensure_token(),
+                backend=args.backend,
+                connect_timeout=args.connect_timeout,
+                read_timeout=args.read_timeout,
+            )
+            if args.verbose:
+                sys.stderr.write(f"Using Todoist {client.last_backend()}\n")
+        options = pl.ImportOptions(
+            # Default project if not provided
+            project_id=args.project_id or cfg.get_default_project_id(),
+            # The saved default section only applies to the saved default project.
+            section_id=args.section_id or (None if args.project_id else cfg.get_default_section_id()),
+            priority=args.priority,
+            due=args.due,
+            labels_as_tags=args.labels_as_tags,
+            strip_md=args.strip_md,
+            rules=None if args.no_rules else rs.load_rules(args.rules or cfg.rules_path(), required=bool(args.rules)),
+            include_comments=max(0, min(args.include_comments, 100)),
+            include_linked_prs=args.include_linked_prs,
+            extra_bytes=args.extra_bytes,
+            **templates,
+        )
+        if client is not None:
+            store = st.Store()
+        label_sync = None
+        if client is not None and (args.labels_as_tags or options.rules):
+            label_sync = lb.LabelSync(client, cache_path=os.path.join(cfg.cache_dir(), "labels.json"))
+        importer = pl.Importer(
+            client,
+            options,
+            default_repo=resolve_default_repo,
+            journal=journal,
+            done=done,
+            batch_size=args.batch_size,
+            jobs=args.jobs,
+            dry_run=args.dry_run,
+            label_sync=label_sync,
+            budget=rl.GitHubBudget(max_points=args.max_github_points, max_concurrency=args.jobs),
+            store=store,
+            breaker=br.CircuitBreaker(threshold=max(0, args.fail_fast_after)),
+            outbox=not args.no_outbox,
+            upsert=args.upsert,
+            skip_unchanged=args.skip_unchanged,
+        )
+
+        if export_out:
+            writer = tf.open_writer(export_out)
+        created = 0
+        exported = 0
+        updated = 0
+        unchanged = 0
+        skipped = 0
+        queued = 0
+        failures: list[pl.Outcome] = []
+        plan = _Plan()
+        jsonl = args.output == "jsonl"
+        for outcome in importer.run(_iter_inputs(args)):
+            if jsonl:
+                _write_jsonl(outcome)
+            if outcome.status == pl.PLANNED and writer:
+                tf.write_task(writer, outcome.repo, outcome.number, outcome.payload, outcome.content_hash)
+                exported += 1
+                continue
+            if outcome.status == pl.PLANNED:
+                plan.add(outcome)
+                if not jsonl:
+                    print(f"plan: {outcome.ref}")
+                    print(json.dumps(outcome.payload, ensure_ascii=False))
+                continue
+            if outcome.status == pl.FAILED:
+                print(f"Error: {outcome.detail} ({outcome.ref})", file=sys.stderr)
+                failures.append(outcome)
+                continue
+            if outcome.status == pl.SKIPPED:
+                print(f"skipped: {outcome.ref} ({outcome.detail})", file=sys.stderr)
+                skipped += 1
+                continue
+            if outcome.status == pl.QUEUED:
+                print(f"queued: {outcome.ref} ({outcome.detail})", file=sys.stderr)
+                queued += 1
+                continue
+            if outcome.status == pl.UNCHANGED:
+                if args.verbose:
+                    print(f"unchanged: {outcome.ref}", file=sys.stderr)
+                unchanged += 1
+                continue
+
+            task = outcome.task
+            if outcome.status == pl.UPDATED:
+                updated += 1
+                if not jsonl:
+                    print(f"updated: {task.id} - {task.content} ({outcome.detail})")
+                continue
+            created += 1
+            if not jsonl:
+                print(f"created: {task.id} - {task.content}")
+                if task.url:
+                    print(task.url)
+            if task.url and args.open_after:
+                open_url(task.url)
+
+        if writer:
+            print(f"Exported {exported} task(s) to {export_out}; send them with: gh gt submit {export_out}", file=sys.stderr)
+        elif args.dry_run:
+            backend = args.backend or cfg.profile_settings().get("backend")
+            plan.report(github_requests=importer.github_requests, jobs=args.jobs, backend=backend)
+        if args.verbose or args.dry_run:
+            usage = _github_usage(importer.budget)
+            if usage:
+                sys.stderr.write(usage + "\n")
+        if failures or queued:
+            _print_summary(created, skipped, failures, queued=queued, updated=updated, unchanged=unchanged)
+            if args.failures_out and failures:
+                _write_failures(args.failures_out, failures)
+            if journal and failures:
+                print(f"Resume with: gh gt --resume {journal.path}", file=sys.stderr)
+            return EXIT_PARTIAL if created or exported or updated or unchanged or skipped or queued or plan.tasks else 1
         return 0
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        if journal:
+            print(f"Resume with: gh gt --resume {journal.path}", file=sys.stderr)
+        return 130
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
+        if journal:
+            print(f"Resume with: gh gt --resume {journal.path}", file=sys.stderr)
         return 1
+    finally:
+        if journal:
+            journal.close()
+        if store:
+            store.close()
+        if writer and writer is not sys.stdout:
+            writer.close()
+        if metrics_server:
+            metrics_server.shutdown()
+        if args.metrics_file:
+            try:
+                metrics.write_textfile(args.metrics_file)
+            except OSError as e:
+                print(f"Error: cannot write metrics: {e}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import contextlib
+import copy
 import json
 import os
 import stat
-from typing import Any, Dict, Optional
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks; writes are still atomic
+    fcntl = None  # type: ignore[assignment]
 
 
 def _config_path() -> str:
@@ -15,6 +24,33 @@ def _config_path() -> str:
         return os.path.join(base, "gh-gt", "config.json")
 
 
+def cache_dir() -> str:
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA", os.path.expanduser("~\\AppData\\Local"))
+        return os.path.join(base, "gh-gt", "cache")
+    else:
+        base = os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+        return os.path.join(base, "gh-gt")
+
+
+def state_dir() -> str:
+    # Durable local state (outbox, issue → task mapping); unlike the cache, not safe to delete.
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA", os.path.expanduser("~\\AppData\\Local"))
+        return os.path.join(base, "gh-gt", "state")
+    else:
+        base = os.getenv("XDG_STATE_HOME", os.path.expanduser("~/.local/state"))
+        return os.path.join(base, "gh-gt")
+
+
+def rules_path(profile: Optional[str] = None) -> str:
+    # A profile may point at its own rules file; otherwise they live next to config.json.
+    custom = profile_settings(profile).get("rules")
+    if isinstance(custom, str) and custom:
+        return os.path.expanduser(custom)
+    return os.path.join(os.path.dirname(_config_path()), "rules.json")
+
+
 def _ensure_parent_dir(path: str) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
@@ -26,35 +62,185 @@ def _chmod_600(path: str) -> None:
         pass
 
 
-def read_config() -> Dict[str, Any]:
-    path = _config_path()
+# Parsed JSON files keyed by path, each with the stat signature it was read at.
+_cache: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _signature(st: os.stat_result) -> Tuple[int, int, int]:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextlib.contextmanager
+def _locked(path: str) -> Iterator[None]:
+    # Advisory lock on a sidecar file, so the data file itself can be replaced.
+    _ensure_parent_dir(path)
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except Exception:
-        return {}
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
 
+def read_json(path: str) -> Dict[str, Any]:
+    """Parsed contents of a JSON object file; {} if missing or unreadable.
 
-def write_config(data: Dict[str, Any]) -> None:
-    path = _config_path()
+    The parse is cached per process and reused until the file changes on disk
+    (checked with one stat call). Callers get their own copy.
+    """
+    try:
+        sig = _signature(os.stat(path))
+    except OSError:
+        return {}
+    with _cache_lock:
+        hit = _cache.get(path)
+    if hit is None or hit[0] != sig:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        hit = (sig, data)
+        with _cache_lock:
+            _cache[path] = hit
+    return copy.deepcopy(hit[1])
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    """Replace a JSON file atomically: readers see the old or new file, never a partial one."""
     _ensure_parent_dir(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f)
-        f.write("\n")
-    _chmod_600(path)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        _chmod_600(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    with _cache_lock:
+        _cache.pop(path, None)
 
 
-def get_default_project_id() -> Optional[str]:
-    return read_config().get("default_project_id")
+def update_json(path: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Locked read-modify-write of a JSON file; concurrent updates never lose each other's keys."""
+    with _locked(path):
+        with _cache_lock:
+            _cache.pop(path, None)
+        data = read_json(path)
+        mutate(data)
+        write_json(path, data)
+    return data
 
 
-def set_default_project_id(project_id: Optional[str]) -> None:
-    cfg = read_config()
-    if project_id:
-        cfg["default_project_id"] = project_id
-    else:
-        cfg.pop("default_project_id", None)
-    write_config(cfg)
+def read_config(path: Optional[str] = None) -> Dict[str, Any]:
+    return read_json(path or _config_path())
+
+
+def write_config(data: Dict[str, Any], path: Optional[str] = None) -> None:
+    path = path or _config_path()
+    with _locked(path):
+        write_json(path, data)
+
+
+def update_config(mutate: Callable[[Dict[str, Any]], None], path: Optional[str] = None) -> Dict[str, Any]:
+    return update_json(path or _config_path(), mutate)
+
+
+DEFAULT_PROFILE = "default"
+_active_profile: Optional[str] = None
+
+
+def set_active_profile(name: Optional[str]) -> None:
+    """Select the profile used when callers don't name one (None: GH_GT_PROFILE or default)."""
+    global _active_profile
+    _active_profile = name or None
+
+
+def active_profile() -> str:
+    return _active_profile or os.getenv("GH_GT_PROFILE") or DEFAULT_PROFILE
+
+
+def is_default_profile(profile: Optional[str] = None) -> bool:
+    return (profile or active_profile()) == DEFAULT_PROFILE
+
+
+def list_profiles() -> list[str]:
+    profiles = read_config().get("profiles") or {}
+    return [DEFAULT_PROFILE, *sorted(p for p in profiles if p != DEFAULT_PROFILE)]
+
+
+def section_of(data: Dict[str, Any], profile: Optional[str] = None) -> Dict[str, Any]:
+    """One profile's settings within a parsed config; the default profile uses the top-level keys."""
+    name = profile or active_profile()
+    if name == DEFAULT_PROFILE:
+        return {k: v for k, v in data.items() if k != "profiles"}
+    section = (data.get("profiles") or {}).get(name)
+    return section if isinstance(section, dict) else {}
+
+
+def profile_settings(profile: Optional[str] = None) -> Dict[str, Any]:
+    return section_of(read_config(), profile)
+
+
+def update_profile(
+    mutate: Callable[[Dict[str, Any]], None],
+    profile: Optional[str] = None,
+    path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Locked read-modify-write of one profile's settings; returns the whole config."""
+    name = profile or active_profile()
+
+    def apply(data: Dict[str, Any]) -> None:
+        if name == DEFAULT_PROFILE:
+            mutate(data)
+            return
+        profiles = data.setdefault("profiles", {})
+        section = profiles.setdefault(name, {})
+        mutate(section)
+        if not section:
+            profiles.pop(name, None)
+        if not profiles:
+            data.pop("profiles", None)
+
+    return update_config(apply, path=path)
+
+
+def get_default_project_id(profile: Optional[str] = None) -> Optional[str]:
+    return profile_settings(profile).get("default_project_id")
+
+
+def get_default_section_id(profile: Optional[str] = None) -> Optional[str]:
+    return profile_settings(profile).get("default_section_id")
+
+
+def set_default_project_id(
+    project_id: Optional[str],
+    profile: Optional[str] = None,
+    *,
+    section_id: Optional[str] = None,
+) -> None:
+    # The default section always belongs to the default project, so both are set together.
+    def mutate(cfg: Dict[str, Any]) -> None:
+        if project_id:
+            cfg["default_project_id"] = project_id
+        else:
+            cfg.pop("default_project_id", None)
+        if project_id and section_id:
+            cfg["default_section_id"] = section_id
+        else:
+            cfg.pop("default_section_id", None)
 
+    update_profile(mutate, profile)
@@ -1,20 +1,66 @@
 from __future__ import annotations
 
 import json
+import re
 import subprocess
-from dataclasses import dataclass
-from typing import Optional
+import sys
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Optional, Union
 
-from .util import run_gh
+from . import metrics
+from .ratelimit import GitHubBudget
+from .util import DATACLASS_SLOTS, log_debug, run_gh, run_gh_many
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
+class Comment:
+    author: str
+    body: str
+    created_at: str
+
+
+@dataclass(**DATACLASS_SLOTS)
+class LinkedPR:
+    number: int
+    title: str
+    url: str
+    state: str
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Issue:
     number: int
     title: str
     body: str
     html_url: str
     labels: list[str]
+    # Only filled by fetch_issues when asked for.
+    comments: list[Comment] = field(default_factory=list)
+    linked_prs: list[LinkedPR] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class IssueRef:
+    repo: Optional[str]
+    number: int
+
+
+_REF_RE = re.compile(r"^([\w.-]+/[\w.-]+)#(\d+)$")
+_URL_RE = re.compile(r"^https?://[^/\s]+/([\w.-]+/[\w.-]+)/(?:issues|pull)/(\d+)(?:[/?#]\S*)?$")
+
+
+def parse_issue_ref(text: str) -> IssueRef:
+    """Parse 'N', '#N', 'owner/repo#N' or an issue URL; repo is None for bare numbers."""
+    s = text.strip()
+    if s.startswith("#"):
+        s = s[1:]
+    if s.isdigit():
+        return IssueRef(repo=None, number=int(s))
+    m = _REF_RE.match(s) or _URL_RE.match(s)
+    if m:
+        return IssueRef(repo=m.group(1), number=int(m.group(2)))
+    raise ValueError(f"not an issue number, owner/repo#N reference or issue URL: {text!r}")
 
 
 def resolve_repo(provided: Optional[str]) -> str:
@@ -48,7 +94,214 @@ def fetch_issue(repo: str, number: int) -> Issue:
     title = data.get("title") or ""
     body = data.get("body") or ""
     html_url = data.get("html_url") or ""
-    labels = [lbl.get("name", "") for lbl in data.get("labels", []) if isinstance(lbl, dict)]
+    labels = [sys.intern(lbl.get("name", "")) for lbl in data.get("labels", []) if isinstance(lbl, dict)]
     if not title or not html_url:
         raise RuntimeError("unexpected GitHub issue payload; missing title or html_url")
     return Issue(number=number, title=title, body=body, html_url=html_url, labels=labels)
+
+
+# Issues per GraphQL request; keeps each query well under GitHub's node limits.
+GRAPHQL_BATCH = 50
+# Tries per GraphQL request when GitHub rejects it for rate limiting.
+RATE_LIMIT_ATTEMPTS = 3
+
+_ISSUE_FIELDS = "number title body url labels(first: 100) { nodes { name } }"
+_PR_FIELDS = "number title url state"
+
+
+def _issue_fields(comments: int, linked_prs: bool) -> str:
+    fields = _ISSUE_FIELDS
+    if comments > 0:
+        fields += f" comments(last: {comments}) {{ nodes {{ author {{ login }} body createdAt }} }}"
+    if linked_prs:
+        fields += (
+            " timelineItems(itemTypes: [CROSS_REFERENCED_EVENT, CONNECTED_EVENT], last: 25) { nodes {"
+            f" ... on CrossReferencedEvent {{ source {{ ... on PullRequest {{ {_PR_FIELDS} }} }} }}"
+            f" ... on ConnectedEvent {{ subject {{ ... on PullRequest {{ {_PR_FIELDS} }} }} }}"
+            " } }"
+        )
+    return fields
+
+
+def _graphql_issues_query(numbers: list[int], *, comments: int = 0, linked_prs: bool = False) -> str:
+    fields = _issue_fields(comments, linked_prs)
+    parts = [
+        f"i{n}: issueOrPullRequest(number: {n}) {{ ... on Issue {{ {fields} }} ... on PullRequest {{ {fields} }} }}"
+        for n in numbers
+    ]
+    return (
+        "query($owner: String!, $name: String!) { rateLimit { cost remaining limit resetAt } "
+        "repository(owner: $owner, name: $name) { "
+        + " ".join(parts)
+        + " } }"
+    )
+
+
+def _issue_from_node(number: int, node: dict) -> Issue:
+    title = node.get("title") or ""
+    html_url = node.get("url") or ""
+    if not title or not html_url:
+        raise RuntimeError("unexpected GitHub issue payload; missing title or html_url")
+    # The same few label names repeat across thousands of issues; share one copy.
+    labels = [
+        sys.intern(lbl.get("name", ""))
+        for lbl in ((node.get("labels") or {}).get("nodes") or [])
+        if isinstance(lbl, dict)
+    ]
+    comments = [
+        Comment(
+            author=((c.get("author") or {}).get("login") or "ghost"),
+            body=c.get("body") or "",
+            created_at=c.get("createdAt") or "",
+        )
+        for c in ((node.get("comments") or {}).get("nodes") or [])
+        if isinstance(c, dict)
+    ]
+    linked_prs: list[LinkedPR] = []
+    seen: set[int] = set()
+    for ev in (node.get("timelineItems") or {}).get("nodes") or []:
+        if not isinstance(ev, dict):
+            continue
+        pr = ev.get("source") or ev.get("subject") or {}
+        if pr.get("number") and pr.get("url") and pr["number"] not in seen:
+            seen.add(pr["number"])
+            linked_prs.append(
+                LinkedPR(number=pr["number"], title=pr.get("title") or "", url=pr["url"], state=pr.get("state") or "")
+            )
+    return Issue(
+        number=number,
+        title=title,
+        body=node.get("body") or "",
+        html_url=html_url,
+        labels=labels,
+        comments=comments,
+        linked_prs=linked_prs,
+    )
+
+
+def fetch_issues(
+    repo: str,
+    numbers: list[int],
+    *,
+    comments: int = 0,
+    linked_prs: bool = False,
+    budget: Optional[GitHubBudget] = None,
+    jobs: Optional[int] = None,
+) -> dict[int, Union[Issue, Exception]]:
+    """Fetch many issues of one repository with batched GraphQL queries.
+
+    The last ``comments`` comments and cross-referenced pull requests are
+    requested in the same query, so they never cost an extra call per issue.
+    Per-issue problems (missing issue, bad payload) are returned in place of the
+    Issue so one bad number doesn't fail the rest of the batch.
+
+    Batches run as up to ``jobs`` concurrent gh processes (default: the
+    budget's concurrency). Each request goes through ``budget``, which paces
+    requests by the point budget GitHub reports back and waits out
+    rate-limit rejections.
+    """
+    budget = budget or GitHubBudget()
+    owner, _, name = repo.partition("/")
+    chunks = [numbers[i : i + GRAPHQL_BATCH] for i in range(0, len(numbers), GRAPHQL_BATCH)]
+    calls = [
+        [
+            "api",
+            "graphql",
+            "-f",
+            f"query={_graphql_issues_query(chunk, comments=comments, linked_prs=linked_prs)}",
+            "-f",
+            f"owner={owner}",
+            "-f",
+            f"name={name}",
+        ]
+        for chunk in chunks
+    ]
+
+    def call(args: list[str]) -> tuple[subprocess.CompletedProcess, dict]:
+        for attempt in range(1, RATE_LIMIT_ATTEMPTS + 1):
+            with budget.slot(), metrics.timer("gh_gt_phase_seconds", phase="fetch"):
+                proc = run_gh(args)
+            limited = _rate_limited(proc)
+            if limited:
+                metrics.inc("gh_gt_rate_limited_total", service="github")
+            if not limited or attempt == RATE_LIMIT_ATTEMPTS:
+                break
+            metrics.inc("gh_gt_retries_total", service="github")
+            budget.backoff(secondary=limited == "secondary", attempt=attempt)
+        # gh exits non-zero when the response carries any GraphQL error, but
+        # the partial data for the other aliases is still on stdout.
+        try:
+            data = json.loads(proc.stdout) if proc.stdout.strip() else {}
+        except ValueError:
+            data = {}
+        # Right away, so requests still queued see the updated budget.
+        _track_rate_limit(budget, data)
+        return proc, data
+
+    out: dict[int, Union[Issue, Exception]] = {}
+    for chunk, (proc, data) in zip(chunks, run_gh_many(calls, jobs=jobs or budget.max_concurrency, run=call)):
+        repo_data = (data.get("data") or {}).get("repository")
+        if repo_data is None:
+            msg = _graphql_error(data) or proc.stderr.strip() or f"failed to fetch issues from {repo}"
+            for n in chunk:
+                out[n] = RuntimeError(msg)
+            continue
+        errors = _graphql_errors_by_alias(data)
+        for n in chunk:
+            node = repo_data.get(f"i{n}")
+            if not node:
+                out[n] = RuntimeError(errors.get(f"i{n}") or f"issue {repo}#{n} not found")
+                continue
+            try:
+                out[n] = _issue_from_node(n, node)
+            except RuntimeError as e:
+                out[n] = e
+    return out
+
+
+def _rate_limited(proc: subprocess.CompletedProcess) -> Optional[str]:
+    """'primary' or 'secondary' if GitHub rejected the request for rate limiting."""
+    if proc.returncode == 0:
+        return None
+    text = f"{proc.stderr}\n{proc.stdout[:2000]}".lower()
+    if "secondary rate limit" in text or "abuse detection" in text:
+        return "secondary"
+    if "rate limit exceeded" in text or '"rate_limited"' in text:
+        return "primary"
+    return None
+
+
+def _track_rate_limit(budget: GitHubBudget, data: dict) -> None:
+    rate = (data.get("data") or {}).get("rateLimit")
+    if not isinstance(rate, dict) or rate.get("remaining") is None:
+        return
+    reset_at = None
+    if rate.get("resetAt"):
+        try:
+            reset_at = datetime.fromisoformat(str(rate["resetAt"]).replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            log_debug(f"unparsable rateLimit.resetAt: {rate['resetAt']!r}")
+    budget.update(
+        cost=int(rate.get("cost") or 1),
+        remaining=int(rate["remaining"]),
+        limit=int(rate.get("limit") or 5000),
+        reset_at=reset_at,
+    )
+
+
+def _graphql_error(data: dict) -> Optional[str]:
+    for err in data.get("errors") or []:
+        if isinstance(err, dict) and err.get("message"):
+            return str(err["message"])
+    return None
+
+
+def _graphql_errors_by_alias(data: dict) -> dict[str, str]:
+    out: dict[str, str] = {}
+    for err in data.get("errors") or []:
+        if not isinstance(err, dict):
+            continue
+        path = err.get("path") or []
+        if len(path) >= 2 and isinstance(path[1], str):
+            out.setdefault(path[1], str(err.get("message") or "GraphQL error"))
+    return out
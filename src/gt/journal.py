@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from .util import log_debug
+
+
+# Per-issue states, in the order an issue moves through them.
+FETCHED = "fetched"
+SUBMITTED = "submitted"
+CREATED = "created"
+FAILED = "failed"
+# Todoist was unreachable; the task waits in the local outbox for `gh gt flush`.
+QUEUED = "queued"
+
+
+@dataclass
+class JournalState:
+    header: Dict[str, Any] = field(default_factory=dict)
+    entries: Dict[tuple[str, int], Dict[str, Any]] = field(default_factory=dict)
+
+    def state_of(self, repo: str, number: int) -> Optional[str]:
+        entry = self.entries.get((repo, number))
+        return entry.get("state") if entry else None
+
+    def task_id_of(self, repo: str, number: int) -> Optional[str]:
+        entry = self.entries.get((repo, number))
+        return entry.get("task_id") if entry else None
+
+
+def load(path: str) -> JournalState:
+    """Replay a journal file; later records for the same issue win."""
+    state = JournalState()
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                # A torn final line is expected after a hard kill; skip it.
+                log_debug(f"journal {path}:{lineno}: ignoring unparsable record")
+                continue
+            if not isinstance(rec, dict):
+                continue
+            if rec.get("op") == "start":
+                if not state.header:
+                    state.header = rec
+                continue
+            repo = rec.get("repo")
+            number = rec.get("number")
+            if not isinstance(repo, str) or not isinstance(number, int):
+                continue
+            entry = state.entries.setdefault((repo, number), {})
+            entry["state"] = rec.get("state")
+            if rec.get("task_id"):
+                entry["task_id"] = rec["task_id"]
+    return state
+
+
+class Journal:
+    """Append-only write-ahead log of per-issue import progress.
+
+    Every record is flushed to the OS immediately, so a crashed or interrupted
+    process never loses progress; fsync (durability across an OS crash) is
+    batched every ``sync_every`` records, except that ``submitted`` records
+    are always synced before the tasks are sent so a resume can't create them
+    twice. record_many() writes a whole batch of them behind one fsync.
+    """
+
+    def __init__(self, path: str, *, sync_every: int = 50) -> None:
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self._f = open(path, "a", encoding="utf-8")
+        self._unsynced = 0
+        # Records arrive from the importer's worker threads.
+        self._lock = threading.Lock()
+
+    def start(self, **info: Any) -> None:
+        self._write({"op": "start", **info}, sync=True)
+
+    def record(self, repo: str, number: int, state: str, *, task_id: Optional[str] = None) -> None:
+        rec: Dict[str, Any] = {"repo": repo, "number": number, "state": state}
+        if task_id:
+            rec["task_id"] = task_id
+        self._write(rec, sync=state == SUBMITTED)
+
+    def record_many(self, keys: list[tuple[str, int]], state: str) -> None:
+        """Record ``state`` for many issues at once, with at most one fsync."""
+        self._write_lines(
+            [_line({"repo": repo, "number": number, "state": state}) for repo, number in keys], sync=state == SUBMITTED
+        )
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f.closed:
+                return
+            self._sync_locked()
+            self._f.close()
+
+    def _write(self, rec: Dict[str, Any], *, sync: bool = False) -> None:
+        self._write_lines([_line(rec)], sync=sync)
+
+    def _write_lines(self, lines: list[str], *, sync: bool = False) -> None:
+        if not lines:
+            return
+        with self._lock:
+            self._f.write("".join(lines))
+            self._f.flush()
+            self._unsynced += len(lines)
+            if sync or self._unsynced >= self.sync_every:
+                self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        if self._f.closed:
+            return
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+
+
+def _line(rec: Dict[str, Any]) -> str:
+    return json.dumps(rec, separators=(",", ":"), ensure_ascii=False) + "\n"
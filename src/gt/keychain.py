@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
 import os
-import stat
+import re
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
+from . import config as cfg
 from .util import is_ci, log_debug
 
 
@@ -15,29 +15,27 @@ ITEM = "todoist_token"
 
 
 def _config_path() -> str:
-    if os.name == "nt":
-        base = os.getenv("APPDATA", os.path.expanduser("~\\AppData\\Roaming"))
-        return os.path.join(base, "gh-gt", "config.json")
-    else:
-        base = os.getenv("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
-        return os.path.join(base, "gh-gt", "config.json")
+    # Same file as gt.config; the token shares it with other settings.
+    return cfg._config_path()
 
 
-def _ensure_parent_dir(path: str) -> None:
-    parent = os.path.dirname(path)
-    os.makedirs(parent, exist_ok=True)
+def _item(profile: Optional[str]) -> str:
+    # Keychain entry per profile; the default profile keeps the original name.
+    if cfg.is_default_profile(profile):
+        return ITEM
+    return f"{ITEM}:{profile or cfg.active_profile()}"
 
 
-def _chmod_600(path: str) -> None:
-    try:
-        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
-    except Exception:
-        pass
+def _env_token(profile: Optional[str]) -> Optional[str]:
+    if cfg.is_default_profile(profile):
+        return os.getenv("TODOIST_API_TOKEN") or os.getenv("TODOIST_TOKEN")
+    name = re.sub(r"[^A-Za-z0-9]", "_", profile or cfg.active_profile()).upper()
+    return os.getenv(f"TODOIST_API_TOKEN_{name}")
 
 
-def get_token() -> Optional[str]:
+def get_token(profile: Optional[str] = None) -> Optional[str]:
     # 1) env
-    token = os.getenv("TODOIST_API_TOKEN") or os.getenv("TODOIST_TOKEN")
+    token = _env_token(profile)
     if token:
         return token
 
@@ -45,28 +43,20 @@ def get_token() -> Optional[str]:
     try:
         import keyring  # type: ignore
 
-        token = keyring.get_password(SERVICE, ITEM)
+        token = keyring.get_password(SERVICE, _item(profile))
         if token:
             return token
     except Exception as e:
         log_debug(f"keyring unavailable: {e}")
 
     # 3) file config
-    path = _config_path()
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            t = data.get("todoist_token")
-            if isinstance(t, str) and t:
-                return t
-    except FileNotFoundError:
-        return None
-    except Exception as e:
-        log_debug(f"failed to read config file: {e}")
+    t = cfg.section_of(cfg.read_config(_config_path()), profile).get("todoist_token")
+    if isinstance(t, str) and t:
+        return t
     return None
 
 
-def save_token(token: str, where: str = "keychain") -> Tuple[bool, str]:
+def save_token(token: str, where: str = "keychain", profile: Optional[str] = None) -> Tuple[bool, str]:
     if is_ci():
         return False, "CI detected; refusing to save token. Use env vars."
 
@@ -79,35 +69,30 @@ def save_token(token: str, where: str = "keychain") -> Tuple[bool, str]:
         try:
             import keyring  # type: ignore
 
-            keyring.set_password(SERVICE, ITEM, token)
+            keyring.set_password(SERVICE, _item(profile), token)
             return True, "saved to keychain"
         except Exception as e:
             if target == "keychain":
                 return False, f"failed to save to keychain: {e}"
             log_debug(f"keychain save failed; falling back to file: {e}")
 
-    # file fallback
+    # file fallback: merge into config.json so other settings survive
     try:
         path = _config_path()
-        _ensure_parent_dir(path)
-        data = {"todoist_token": token}
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f)
-            f.write("\n")
-        _chmod_600(path)
+        cfg.update_profile(lambda data: data.__setitem__("todoist_token", token), profile, path=path)
         return True, f"saved to file: {path}"
     except Exception as e:
         return False, f"failed to save to file: {e}"
 
 
-def unset_token() -> list[str]:
+def unset_token(profile: Optional[str] = None) -> list[str]:
     messages: list[str] = []
     # keychain
     try:
         import keyring  # type: ignore
 
         try:
-            keyring.delete_password(SERVICE, ITEM)
+            keyring.delete_password(SERVICE, _item(profile))
             messages.append("deleted from keychain")
         except keyring.errors.PasswordDeleteError:  # type: ignore
             pass
@@ -116,12 +101,17 @@ def unset_token() -> list[str]:
     except Exception:
         pass
 
-    # file
+    # file: drop only the token; keep other settings such as the default project
     try:
         path = _config_path()
         if os.path.exists(path):
-            os.remove(path)
-            messages.append("deleted config file")
+            had_token = "todoist_token" in cfg.section_of(cfg.read_config(path), profile)
+            data = cfg.update_profile(lambda d: d.pop("todoist_token", None), profile, path=path)
+            if not data:
+                os.remove(path)
+                messages.append("deleted config file")
+            elif had_token:
+                messages.append("deleted token from config file")
     except Exception as e:
         messages.append(f"file delete failed: {e}")
 
@@ -130,19 +120,22 @@ def unset_token() -> list[str]:
     return messages
 
 
-def show_status() -> str:
-    env = "set" if (os.getenv("TODOIST_API_TOKEN") or os.getenv("TODOIST_TOKEN")) else "unset"
+def show_status(profile: Optional[str] = None) -> str:
+    env = "set" if _env_token(profile) else "unset"
 
     kc = "unknown"
     try:
         import keyring  # type: ignore
 
-        kc_val = keyring.get_password(SERVICE, ITEM)
+        kc_val = keyring.get_password(SERVICE, _item(profile))
         kc = "present" if kc_val else "absent"
     except Exception:
         kc = "unavailable"
 
     path = _config_path()
-    file_state = "present" if os.path.exists(path) else "absent"
+    file_state = "present" if cfg.section_of(cfg.read_config(path), profile).get("todoist_token") else "absent"
 
-    return f"env={env}, keychain={kc}, file={file_state}"
+    status = f"env={env}, keychain={kc}, file={file_state}"
+    if not cfg.is_default_profile(profile):
+        status = f"profile={profile or cfg.active_profile()}, {status}"
+    return status
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from . import config as cfg
+from . import metrics
+from .util import log_debug
+
+
+# How long a cached copy of the account's label list is trusted.
+CACHE_TTL = 24 * 60 * 60
+
+
+def normalize_labels(names: Iterable[str], aliases: Optional[Dict[str, str]] = None) -> list[str]:
+    """Collapse whitespace, apply aliases and drop case-insensitive duplicates."""
+    out: list[str] = []
+    seen: set[str] = set()
+    for name in names:
+        name = " ".join(name.split())
+        if not name:
+            continue
+        if aliases:
+            name = aliases.get(name.lower(), name)
+        key = name.lower()
+        if key not in seen:
+            seen.add(key)
+            out.append(name)
+    return out
+
+
+class LabelSync:
+    """Makes sure task labels exist in Todoist before tasks reference them.
+
+    Todoist auto-creates an unknown label on every task that uses it. Instead,
+    the account's labels are read once (or from the on-disk cache), and all
+    missing labels of a batch are created together in one request. Names are
+    matched case-insensitively and rewritten to the existing spelling.
+    """
+
+    def __init__(self, client: Any, *, cache_path: Optional[str] = None, ttl: float = CACHE_TTL) -> None:
+        self.client = client
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._known: Optional[Dict[str, str]] = None
+        # One cache entry per account, without keeping the token itself on disk.
+        token = getattr(client, "token", None) or ""
+        self._cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+    def ensure(self, names: Iterable[str]) -> Dict[str, str]:
+        """Create whichever of ``names`` are missing; map each to its Todoist spelling."""
+        known = self._load()
+        wanted = {n.lower(): n for n in names}
+        missing = [name for key, name in wanted.items() if key not in known]
+        if missing:
+            log_debug(f"creating {len(missing)} Todoist label(s): {', '.join(missing)}")
+            created = self.client.create_labels(missing)
+            for name in created:
+                known[name.lower()] = name
+            if len(created) < len(missing):
+                # Usually a stale cache (label made elsewhere): re-read the list once.
+                known = self._load(refresh=True)
+            self._save()
+        return {name: known.get(key, name) for key, name in wanted.items()}
+
+    def _load(self, *, refresh: bool = False) -> Dict[str, str]:
+        if self._known is not None and not refresh:
+            return self._known
+        cached = None if refresh else self._read_cache()
+        metrics.inc("gh_gt_cache_total", cache="labels", result="miss" if cached is None else "hit")
+        if cached is None:
+            cached = list(self.client.list_labels())
+            self._known = {n.lower(): n for n in cached}
+            self._save()
+        else:
+            self._known = {n.lower(): n for n in cached}
+        return self._known
+
+    def _read_cache(self) -> Optional[list[str]]:
+        if not self.cache_path:
+            return None
+        entry = cfg.read_json(self.cache_path).get(self._cache_key)
+        if not isinstance(entry, dict) or time.time() - float(entry.get("fetched_at", 0)) > self.ttl:
+            return None
+        labels = entry.get("labels")
+        return [str(n) for n in labels] if isinstance(labels, list) else None
+
+    def _save(self) -> None:
+        if not self.cache_path or self._known is None:
+            return
+        entry = {"fetched_at": time.time(), "labels": sorted(self._known.values())}
+        try:
+            cfg.update_json(self.cache_path, lambda data: data.__setitem__(self._cache_key, entry))
+        except OSError as e:
+            log_debug(f"failed to write label cache: {e}")
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import bisect
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+# Upper bounds (seconds) of the latency histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+class Registry:
+    """In-process counters and histograms, rendered in the Prometheus text format.
+
+    Metrics are created on first use; every update is a dict operation under
+    one lock, cheap enough for the per-task hot paths.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._help: Dict[str, tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[_Labels, float]] = {}
+        # name → labels → (bucket counts, sum, count)
+        self._histograms: Dict[str, Dict[_Labels, list[Any]]] = {}
+
+    def describe(self, name: str, kind: str, text: str) -> None:
+        self._help[name] = (kind, text)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = _key(labels)
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            hist = self._histograms.setdefault(name, {}).get(key)
+            if hist is None:
+                hist = self._histograms[name][key] = [[0] * len(BUCKETS), 0.0, 0]
+            if i < len(BUCKETS):
+                hist[0][i] += 1
+            hist[1] += seconds
+            hist[2] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def value(self, name: str, **labels: str) -> float:
+        """Current value of a counter series (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_key(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                self._header(lines, name, "counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_fmt(key)} {value:g}")
+            for name in sorted(self._histograms):
+                self._header(lines, name, "histogram")
+                for key, (buckets, total, count) in sorted(self._histograms[name].items()):
+                    running = 0
+                    for bound, n in zip(BUCKETS, buckets):
+                        running += n
+                        lines.append(f"{name}_bucket{_fmt(key + (('le', f'{bound:g}'),))} {running}")
+                    lines.append(f"{name}_bucket{_fmt(key + (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{_fmt(key)} {total:.6f}")
+                    lines.append(f"{name}_count{_fmt(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list[str], name: str, kind: str) -> None:
+        text = self._help.get(name, (kind, ""))[1]
+        if text:
+            lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def _key(labels: Dict[str, str]) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt(key: _Labels) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+
+for _name, _kind, _text in (
+    ("gh_gt_issues_fetched_total", "counter", "Issues fetched from GitHub"),
+    ("gh_gt_outcomes_total", "counter", "Issues processed, by outcome status and Todoist backend"),
+    ("gh_gt_retries_total", "counter", "Requests retried after a rate-limit answer, by service"),
+    ("gh_gt_rate_limited_total", "counter", "Rate-limit answers (HTTP 429, GitHub rate limits), by service"),
+    ("gh_gt_cache_total", "counter", "Local cache lookups, by cache and result (hit/miss)"),
+    ("gh_gt_phase_seconds", "histogram", "Time spent per phase: fetch (per GitHub batch), build (per window), send (per Todoist write)"),
+):
+    REGISTRY.describe(_name, _kind, _text)
+
+
+def write_textfile(path: str, registry: Registry = REGISTRY) -> None:
+    """Write the metrics for node_exporter's textfile collector, replacing the file atomically."""
+    parent = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=parent, prefix=".gh-gt-metrics.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(registry.render())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def serve(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> Any:
+    """Serve ``/metrics`` on a background thread; returns the server (call shutdown() to stop)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="gh-gt-metrics", daemon=True).start()
+    return server
+
+
+def parse_listen(value: str) -> tuple[str, int]:
+    """'PORT' or 'HOST:PORT' → (host, port); the host defaults to localhost."""
+    host, _, port = value.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        raise ValueError(f"expected PORT or HOST:PORT, got {value!r}")
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import os
+import sys
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from . import config as cfg
+from . import metrics
+from .util import DATACLASS_SLOTS, log_debug
+
+
+# How long the cached project/section index is used without asking Todoist.
+CACHE_TTL = 24 * 60 * 60
+# Matches shown below the prompt.
+VISIBLE = 10
+
+_WORD_START = " /-_.:"
+
+
+@dataclass(**DATACLASS_SLOTS)
+class Entry:
+    label: str
+    project_id: str
+    section_id: Optional[str]
+    # Lower-cased "Project / Section" path the query is matched against.
+    key: str
+
+
+def entries_from_tree(tree: Iterable[dict[str, Any]]) -> list[Entry]:
+    """Flatten Todoist.project_tree() output into picker entries, in tree order."""
+    out: list[Entry] = []
+    path: list[str] = []
+    for p in tree:
+        del path[p["depth"] :]
+        path.append(p["name"])
+        indent = "  " * p["depth"]
+        out.append(Entry(f"{indent}{p['name']} ({p['id']})", p["id"], None, " / ".join(path).lower()))
+        for sec in p["sections"]:
+            key = " / ".join([*path, sec["name"]]).lower()
+            out.append(Entry(f"{indent}  / {sec['name']} ({sec['id']})", p["id"], sec["id"], key))
+    return out
+
+
+def fuzzy_score(query: str, key: str) -> Optional[int]:
+    """Score ``query`` as an in-order subsequence of ``key``; None if it isn't one.
+
+    Consecutive characters and characters at word starts score higher, gaps
+    cost a little, so "wb" ranks "work / backlog" above "wobbly".
+    """
+    score = 0
+    pos = -1
+    for ch in query:
+        i = key.find(ch, pos + 1)
+        if i < 0:
+            return None
+        if i == pos + 1:
+            score += 4
+        if i == 0 or key[i - 1] in _WORD_START:
+            score += 3
+        score -= min(i - pos - 1, 3)
+        pos = i
+    return score
+
+
+class ProjectIndex:
+    """In-memory index for type-to-filter search over projects and sections.
+
+    Narrowing is incremental: when the new query extends the previous one,
+    only the previous matches are rescored, since anything that failed to
+    match a prefix can't match the longer query.
+    """
+
+    def __init__(self, entries: list[Entry]) -> None:
+        self.entries = entries
+        self._query = ""
+        self._matches: list[int] = list(range(len(entries)))
+
+    def search(self, query: str, limit: int = VISIBLE) -> list[Entry]:
+        q = "".join(query.lower().split())
+        pool = self._matches if q.startswith(self._query) else range(len(self.entries))
+        scored: list[tuple[int, int, int]] = []
+        matches: list[int] = []
+        for i in pool:
+            s = fuzzy_score(q, self.entries[i].key)
+            if s is not None:
+                matches.append(i)
+                scored.append((-s, len(self.entries[i].key), i))
+        self._query, self._matches = q, matches
+        if not q:
+            return [self.entries[i] for i in matches[:limit]]
+        return [self.entries[i] for _, _, i in heapq.nsmallest(limit, scored)]
+
+    def count(self) -> int:
+        """Entries matching the last query."""
+        return len(self._matches)
+
+
+def load_index(
+    fetch: Callable[[], Iterable[dict[str, Any]]],
+    token: str,
+    *,
+    cache_path: Optional[str] = None,
+    ttl: float = CACHE_TTL,
+    refresh: bool = False,
+) -> list[Entry]:
+    """Picker entries from the on-disk cache, or from ``fetch()`` when stale or missing."""
+    path = cache_path or os.path.join(cfg.cache_dir(), "projects.json")
+    # One cache entry per account, without keeping the token itself on disk.
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+    if not refresh:
+        hit = cfg.read_json(path).get(key) or {}
+        if time.time() - float(hit.get("fetched_at") or 0) < ttl and hit.get("entries"):
+            log_debug(f"project index: {len(hit['entries'])} entries from cache")
+            metrics.inc("gh_gt_cache_total", cache="projects", result="hit")
+            return [Entry(*e) for e in hit["entries"]]
+    metrics.inc("gh_gt_cache_total", cache="projects", result="miss")
+    entries = entries_from_tree(fetch())
+    if entries:
+        record = {"fetched_at": time.time(), "entries": [[e.label, e.project_id, e.section_id, e.key] for e in entries]}
+        try:
+            cfg.update_json(path, lambda data: data.__setitem__(key, record))
+        except OSError as e:
+            log_debug(f"cannot write project cache: {e}")
+    return entries
+
+
+def pick_tty(index: ProjectIndex, prompt: str = "> ") -> Optional[Entry]:
+    """Interactive type-to-filter picker on the terminal; None if cancelled.
+
+    Type to filter, Up/Down (or Ctrl-P/Ctrl-N) to move, Enter to choose,
+    Esc or Ctrl-C to cancel.
+    """
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    out = sys.stdout
+    query = ""
+    selected = 0
+    shown: list[Entry] = index.search("")
+    try:
+        tty.setcbreak(fd)
+        while True:
+            selected = max(0, min(selected, len(shown) - 1))
+            lines = [("> " if i == selected else "  ") + e.label.strip() for i, e in enumerate(shown)]
+            out.write("\r\x1b[J" + prompt + query + f"  [{index.count()}/{len(index.entries)}]")
+            for line in lines:
+                out.write("\n\r" + line)
+            # Back up to the prompt line, cursor after the query.
+            if lines:
+                out.write(f"\x1b[{len(lines)}A")
+            col = _width(prompt + query)
+            out.write("\r" + (f"\x1b[{col}C" if col else ""))
+            out.flush()
+
+            try:
+                key = os.read(fd, 32).decode("utf-8", "ignore")
+            except KeyboardInterrupt:
+                return None
+            if key in ("\r", "\n"):
+                return shown[selected] if shown else None
+            if key in ("\x1b", "\x03", "\x04"):
+                return None
+            if key in ("\x1b[A", "\x10"):
+                selected -= 1
+                continue
+            if key in ("\x1b[B", "\x0e"):
+                selected += 1
+                continue
+            if key in ("\x7f", "\x08"):
+                query = query[:-1]
+            elif key == "\x15":
+                query = ""
+            elif key.isprintable():
+                query += key
+            else:
+                continue
+            shown = index.search(query)
+            selected = 0
+    finally:
+        out.write("\r\x1b[J")
+        out.flush()
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+
+def _width(text: str) -> int:
+    # Terminal columns; Hangul and other wide characters take two.
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+
+
+def tty_available() -> bool:
+    if not (sys.stdin.isatty() and sys.stdout.isatty()):
+        return False
+    try:
+        import termios  # noqa: F401
+        import tty  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,904 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, NoReturn, Optional, Union
+
+from . import breaker as br
+from . import github as gh
+from . import journal as jr
+from . import labels as lb
+from . import metrics
+from . import ratelimit as rl
+from . import rules as rs
+from . import store as st
+from . import template as tp
+from . import todoist as td
+from .util import DATACLASS_SLOTS, log_debug, strip_markdown, truncate_utf8
+
+
+CREATED = "created"
+FAILED = "failed"
+SKIPPED = "skipped"
+PLANNED = "planned"
+QUEUED = "queued"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+# How many of the latest issues a run remembers to skip repeated references;
+# bounded so memory stays flat on an endless input stream.
+DEDUPE_WINDOW = 10_000
+# Seconds a partly filled window waits for more streamed input before it is
+# processed anyway, so a slow pipe doesn't hold back issues already read.
+INPUT_WAIT = 0.5
+
+
+@dataclass
+class ImportOptions:
+    project_id: Optional[str] = None
+    section_id: Optional[str] = None
+    priority: Optional[int] = None
+    due: Optional[str] = None
+    labels_as_tags: bool = False
+    strip_md: bool = False
+    # Per-label overrides; take precedence over the run-wide values above.
+    rules: Optional[rs.RuleSet] = None
+    include_comments: int = 0
+    include_linked_prs: bool = False
+    # Byte budget for the comments / linked PR section of the description.
+    extra_bytes: int = 2000
+    # Replace the default "#N title" content / body + URL description.
+    content_template: Optional[tp.Template] = None
+    description_template: Optional[tp.Template] = None
+
+
+@dataclass(**DATACLASS_SLOTS)
+class Outcome:
+    ref: str
+    status: str
+    repo: Optional[str] = None
+    number: Optional[int] = None
+    task: Optional[td.TodoistTask] = None
+    detail: Optional[str] = None
+    backend: Optional[str] = None
+    latency_ms: Optional[float] = None
+    payload: Optional[Dict[str, Any]] = None
+    # Set on planned outcomes, so an export can carry it to submit.
+    content_hash: Optional[str] = None
+
+
+def build_task_fields(issue: gh.Issue, opts: ImportOptions) -> Dict[str, Any]:
+    """Keyword arguments for TodoistClient.add_task for one issue."""
+    if opts.description_template:
+        description = opts.description_template.render(_template_values(issue, opts, opts.description_template))
+    else:
+        description = _body(issue, opts)
+        extra = _extra_section(issue, opts)
+        if extra:
+            description = f"{description}\n\n{extra}" if description else extra
+        if description:
+            description += "\n\n" + issue.html_url
+        else:
+            description = issue.html_url
+
+    names: list[str] = []
+    if opts.labels_as_tags and issue.labels:
+        names.extend(issue.labels)
+
+    mapped = opts.rules.apply(issue.labels) if opts.rules and issue.labels else {}
+    if mapped.get("labels"):
+        names.extend(mapped["labels"])
+    labels = lb.normalize_labels(names, opts.rules.aliases if opts.rules else None) or None
+
+    if opts.content_template:
+        content = opts.content_template.render(_template_values(issue, opts, opts.content_template))
+    else:
+        content = f"#{issue.number} {issue.title}"
+
+    # The run's section belongs to the run's project; a rule that moves the task elsewhere drops it.
+    section_id = opts.section_id if "project_id" not in mapped else None
+
+    return {
+        "content": content,
+        "description": description,
+        "project_id": mapped.get("project_id", opts.project_id),
+        "section_id": mapped.get("section_id", section_id),
+        "priority": mapped.get("priority", opts.priority),
+        "due_string": mapped.get("due", opts.due),
+        "labels": labels,
+    }
+
+
+def _body(issue: gh.Issue, opts: ImportOptions) -> str:
+    body = issue.body or ""
+    if opts.strip_md and body:
+        body = strip_markdown(body)
+    return body.strip()
+
+
+def _repo_of(issue: gh.Issue) -> str:
+    try:
+        return gh.parse_issue_ref(issue.html_url).repo or ""
+    except ValueError:
+        return ""
+
+
+# Fields templates may use, and how each is computed from an issue.
+_TEMPLATE_VALUES: Dict[str, Callable[[gh.Issue, ImportOptions], str]] = {
+    "number": lambda issue, opts: str(issue.number),
+    "title": lambda issue, opts: issue.title,
+    "body": _body,
+    "url": lambda issue, opts: issue.html_url,
+    "repo": lambda issue, opts: _repo_of(issue),
+    "labels": lambda issue, opts: ", ".join(issue.labels),
+    # Recent comments / linked PRs, as enabled by the include options.
+    "extra": lambda issue, opts: _extra_section(issue, opts),
+}
+TEMPLATE_FIELDS = tuple(_TEMPLATE_VALUES)
+
+
+def compile_template(source: str) -> tp.Template:
+    """Compile a --content-template / --description-template over the issue fields."""
+    return tp.compile_template(source, TEMPLATE_FIELDS)
+
+
+def _template_values(issue: gh.Issue, opts: ImportOptions, template: tp.Template) -> Dict[str, str]:
+    # Only what the template uses; the body in particular may be costly to strip.
+    return {name: _TEMPLATE_VALUES[name](issue, opts) for name in template.names}
+
+
+def options_key(opts: ImportOptions) -> str:
+    """Digest of the options that shape task fields, including the rules version."""
+    data = {k: v for k, v in vars(opts).items() if k != "rules"}
+    data["rules"] = opts.rules.version if opts.rules else None
+    for name in ("content_template", "description_template"):
+        data[name] = data[name].source if data[name] else None
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def content_hash(issue: gh.Issue, opts: ImportOptions, key: str) -> str:
+    """Compact digest of everything in ``issue`` that feeds its task, under
+    ``opts`` (whose options_key is ``key``)."""
+    h = hashlib.sha1(key.encode("utf-8"))
+    parts = [issue.title, issue.body or "", issue.html_url, *(issue.labels or [])]
+    if opts.include_comments:
+        for c in issue.comments:
+            parts += [c.author, c.created_at, c.body]
+    if opts.include_linked_prs:
+        for pr in issue.linked_prs:
+            parts += [str(pr.number), pr.title, pr.state, pr.url]
+    for part in parts:
+        h.update(b"\0" + part.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _extra_section(issue: gh.Issue, opts: ImportOptions) -> str:
+    parts: list[str] = []
+    if opts.include_linked_prs and issue.linked_prs:
+        lines = [f"- #{pr.number} {pr.title} ({pr.state.lower()}) {pr.url}" for pr in issue.linked_prs]
+        parts.append("Linked PRs:\n" + "\n".join(lines))
+    if opts.include_comments and issue.comments:
+        lines = []
+        for c in issue.comments:
+            text = strip_markdown(c.body) if opts.strip_md else c.body.strip()
+            lines.append(f"- @{c.author} ({c.created_at[:10]}): " + " ".join(text.split()))
+        parts.append("Recent comments:\n" + "\n".join(lines))
+    if not parts:
+        return ""
+    return truncate_utf8("\n\n".join(parts), max(0, opts.extra_bytes))
+
+
+class Importer:
+    """Turns a stream of issue references into Todoist tasks.
+
+    Input is consumed in windows of ``batch_size``. Within a window issues are
+    grouped per repository and fetched with one batched GitHub request per
+    group, then tasks are created on up to ``jobs`` threads through the shared
+    client. Outcomes are yielded in input order, one per input item. A
+    streamed input that stalls for ``input_wait`` seconds closes the window
+    early.
+
+    With ``dry_run`` no client is needed: each issue yields a ``planned``
+    outcome carrying the task payload that would have been sent.
+    """
+
+    def __init__(
+        self,
+        client: Optional[td.TodoistClient],
+        options: ImportOptions,
+        *,
+        default_repo: Callable[[], str],
+        journal: Optional[jr.Journal] = None,
+        done: Optional[jr.JournalState] = None,
+        batch_size: Optional[int] = None,
+        jobs: int = 4,
+        dry_run: bool = False,
+        label_sync: Optional[lb.LabelSync] = None,
+        budget: Optional[rl.GitHubBudget] = None,
+        store: Optional[st.Store] = None,
+        breaker: Optional[br.CircuitBreaker] = None,
+        outbox: bool = True,
+        upsert: bool = False,
+        skip_unchanged: bool = False,
+        input_wait: float = INPUT_WAIT,
+    ) -> None:
+        self.client = client
+        self.dry_run = dry_run
+        self.label_sync = label_sync
+        # GitHub API requests issued so far (one per batched query).
+        self.github_requests = 0
+        # With a store, created tasks are recorded in its issue → task
+        # mapping and, with ``outbox``, tasks that can't reach Todoist are
+        # queued in it.
+        self.store = store
+        self.outbox = outbox and store is not None
+        # Update the task an issue already has instead of creating another.
+        self.upsert = upsert
+        self._markers: Optional[dict[str, Dict[str, Any]]] = None
+        # Content hashes are recorded with every task written; with
+        # ``skip_unchanged`` an issue whose hash still matches is skipped
+        # before anything is built or sent.
+        self.skip_unchanged = (skip_unchanged or upsert) and store is not None and not dry_run
+        self._options_key = options_key(options)
+        self._hashes: dict[tuple[str, int], str] = {}
+        self._offline = threading.Event()
+        # Shared by all senders: after repeated Todoist failures the rest fail
+        # fast (or are queued) instead of each waiting out its timeout.
+        self.breaker = breaker or br.CircuitBreaker()
+        self._offline_lock = threading.Lock()
+        self.options = options
+        self.journal = journal
+        self.done = done or jr.JournalState()
+        self.jobs = max(1, jobs)
+        # By default a window holds one GraphQL chunk per job, so its fetches run in parallel.
+        self.batch_size = max(1, batch_size or gh.GRAPHQL_BATCH * self.jobs)
+        self.input_wait = input_wait
+        # Shared by all fetch threads; throttles them as GitHub's budget drains.
+        self.budget = budget or rl.GitHubBudget(max_concurrency=self.jobs)
+        self._default_repo = default_repo
+        # The most recent DEDUPE_WINDOW issues, oldest first, so a repeated
+        # reference is skipped even when it lands in a later window.
+        self._recent: OrderedDict[tuple[str, int], None] = OrderedDict()
+
+    def run(self, items: Iterable[Union[int, str]]) -> Iterator[Outcome]:
+        pool = ThreadPoolExecutor(max_workers=self.jobs)
+        outcomes: Optional[Generator[Outcome, None, None]] = None
+        try:
+            for window in _windows(items, self.batch_size, self.input_wait):
+                outcomes = self._run_window(pool, window)
+                for outcome in outcomes:
+                    metrics.inc("gh_gt_outcomes_total", status=outcome.status, backend=outcome.backend or "none")
+                    yield outcome
+        finally:
+            # On Ctrl-C (or an abandoned generator) don't start queued sends;
+            # closing the window first lets it journal the ones it cancels.
+            if outcomes is not None:
+                outcomes.close()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _run_window(self, pool: ThreadPoolExecutor, window: list[Union[int, str]]) -> Generator[Outcome, None, None]:
+        slots: list[Union[Outcome, tuple[str, int]]] = []
+        wanted: dict[str, dict[int, None]] = {}
+        for item in window:
+            text = str(item)
+            try:
+                ref = gh.parse_issue_ref(text)
+            except ValueError as e:
+                slots.append(Outcome(ref=text, status=FAILED, detail=str(e)))
+                continue
+            repo = ref.repo or self._default_repo()
+            key = (repo, ref.number)
+            if key in self._recent:
+                slots.append(Outcome(ref=_ref(*key), status=SKIPPED, repo=repo, number=ref.number, detail="duplicate"))
+                continue
+            self._recent[key] = None
+            if len(self._recent) > DEDUPE_WINDOW:
+                self._recent.popitem(last=False)
+            skip = self._journal_skip(repo, ref.number)
+            if skip:
+                slots.append(skip)
+                continue
+            slots.append(key)
+            wanted.setdefault(repo, {})[ref.number] = None
+
+        fetched: dict[tuple[str, int], Union[gh.Issue, Exception]] = {}
+        repos = list(wanted)
+        for repo, result in zip(repos, pool.map(lambda r: self._fetch(r, list(wanted[r])), repos)):
+            for num, issue in result.items():
+                fetched[(repo, num)] = issue
+        self.github_requests += sum(-(-len(wanted[r]) // gh.GRAPHQL_BATCH) for r in repos)
+
+        started = time.perf_counter()
+        known = {r: self.store.mapped(r, list(wanted[r])) for r in repos} if self.skip_unchanged else {}
+        built: dict[tuple[str, int], Union[Dict[str, Any], Exception]] = {}
+        for i, slot in enumerate(slots):
+            if isinstance(slot, tuple):
+                issue = fetched.get(slot) or RuntimeError(f"issue {_ref(*slot)} missing from GitHub response")
+                if isinstance(issue, Exception):
+                    built[slot] = issue
+                    continue
+                if self.store or self.dry_run:
+                    digest = content_hash(issue, self.options, self._options_key)
+                    repo, num = slot
+                    mapped = known[repo].get(num) if self.skip_unchanged else None
+                    if mapped and mapped[1] == digest:
+                        slots[i] = Outcome(
+                            ref=_ref(repo, num), status=UNCHANGED, repo=repo, number=num, detail="unchanged since last sync"
+                        )
+                        continue
+                    if mapped and not self.upsert:
+                        # Changed, but only --upsert may touch a task that already exists.
+                        slots[i] = Outcome(
+                            ref=_ref(repo, num),
+                            status=SKIPPED,
+                            repo=repo,
+                            number=num,
+                            detail=f"already has task {mapped[0]}; use --upsert to update it",
+                        )
+                        continue
+                    self._hashes[slot] = digest
+                built[slot] = build_task_fields(issue, self.options)
+        metrics.observe("gh_gt_phase_seconds", time.perf_counter() - started, phase="build")
+        # Raw bodies and comments aren't needed once descriptions are built.
+        fetched.clear()
+        if self.label_sync and not self.dry_run:
+            _sync_labels(self.label_sync, [f for f in built.values() if not isinstance(f, Exception)])
+
+        if self.dry_run:
+            for slot in slots:
+                yield slot if isinstance(slot, Outcome) else self._plan(slot, built[slot])
+            return
+
+        # Each pending issue maps to its future and, for batched creates, its
+        # index in that future's result list.
+        pending: dict[tuple[str, int], tuple[Future, Optional[int]]] = {}
+        ready = [slot for slot in slots if isinstance(slot, tuple) and not isinstance(built[slot], Exception)]
+        if self.journal:
+            # The whole window is marked submitted behind one fsync before anything is sent.
+            self.journal.record_many(ready, jr.SUBMITTED)
+        if self.upsert:
+            for key in ready:
+                existing = self._existing(key, built[key])
+                if existing:
+                    pending[key] = (pool.submit(self._update, key, existing, built[key]), None)
+            ready = [key for key in ready if key not in pending]
+        if getattr(self.client, "backend", None) == "sync":
+            for i in range(0, len(ready), td.SYNC_BATCH):
+                chunk = ready[i : i + td.SYNC_BATCH]
+                fut = pool.submit(self._create_many, chunk, [built[k] for k in chunk])
+                for j, key in enumerate(chunk):
+                    pending[key] = (fut, j)
+        else:
+            for key in ready:
+                pending[key] = (pool.submit(self._create, key[0], key[1], built[key]), None)
+
+        try:
+            yield from self._collect(slots, built, pending)
+        finally:
+            # Interrupted: sends that never started didn't reach Todoist, so a resume may retry them.
+            cancelled = [key for key, (fut, _) in pending.items() if fut.cancel()]
+            if self.journal and cancelled:
+                self.journal.record_many(cancelled, jr.FAILED)
+            # Left over only for issues that failed or were queued.
+            self._hashes.clear()
+
+    def _collect(
+        self,
+        slots: list[Union[Outcome, tuple[str, int]]],
+        built: dict[tuple[str, int], Union[Dict[str, Any], Exception]],
+        pending: dict[tuple[str, int], tuple[Future, Optional[int]]],
+    ) -> Iterator[Outcome]:
+        for slot in slots:
+            if isinstance(slot, Outcome):
+                yield slot
+                continue
+            repo, num = slot
+            if slot not in pending:
+                yield Outcome(ref=_ref(repo, num), status=FAILED, repo=repo, number=num, detail=str(built[slot]))
+                continue
+            fut, index = pending[slot]
+            try:
+                result = fut.result()
+                if index is not None:
+                    result = result[index]
+                    if isinstance(result, Exception):
+                        raise result
+                task, backend, latency_ms, status, detail = result
+            except _Queued as q:
+                yield Outcome(ref=_ref(repo, num), status=QUEUED, repo=repo, number=num, detail=str(q))
+                continue
+            except Exception as e:
+                yield Outcome(ref=_ref(repo, num), status=FAILED, repo=repo, number=num, detail=str(e))
+                continue
+            yield Outcome(
+                ref=_ref(repo, num),
+                status=status,
+                repo=repo,
+                number=num,
+                task=task,
+                detail=detail,
+                backend=backend,
+                latency_ms=latency_ms,
+            )
+
+    def _plan(self, slot: tuple[str, int], fields: Union[Dict[str, Any], Exception]) -> Outcome:
+        repo, num = slot
+        if isinstance(fields, Exception):
+            return Outcome(ref=_ref(repo, num), status=FAILED, repo=repo, number=num, detail=str(fields))
+        payload = td.task_payload(**fields)
+        return Outcome(
+            ref=_ref(repo, num),
+            status=PLANNED,
+            repo=repo,
+            number=num,
+            payload=payload,
+            content_hash=self._hashes.pop(slot, None),
+        )
+
+    def _journal_skip(self, repo: str, num: int) -> Optional[Outcome]:
+        prev = self.done.state_of(repo, num)
+        if prev == jr.CREATED:
+            log_debug(f"journal: {repo}#{num} already created as {self.done.task_id_of(repo, num)}; skipping")
+            return Outcome(ref=_ref(repo, num), status=SKIPPED, repo=repo, number=num, detail="already created")
+        if prev == jr.QUEUED:
+            return Outcome(
+                ref=_ref(repo, num), status=SKIPPED, repo=repo, number=num, detail="queued in the outbox; run 'gh gt flush'"
+            )
+        if prev == jr.SUBMITTED:
+            # The previous run died mid-send; the task may or may not exist.
+            return Outcome(
+                ref=_ref(repo, num),
+                status=SKIPPED,
+                repo=repo,
+                number=num,
+                detail="interrupted while submitting; check Todoist before retrying",
+            )
+        return None
+
+    def _fetch(self, repo: str, numbers: list[int]) -> dict[int, Union[gh.Issue, Exception]]:
+        extras: Dict[str, Any] = {"budget": self.budget}
+        if self.options.include_comments:
+            extras["comments"] = self.options.include_comments
+        if self.options.include_linked_prs:
+            extras["linked_prs"] = True
+        try:
+            result = gh.fetch_issues(repo, numbers, **extras)
+        except Exception as e:
+            return {n: e for n in numbers}
+        metrics.inc("gh_gt_issues_fetched_total", sum(not isinstance(i, Exception) for i in result.values()))
+        if self.journal:
+            for num, issue in result.items():
+                if not isinstance(issue, Exception):
+                    self.journal.record(repo, num, jr.FETCHED)
+        return result
+
+    def _create(self, repo: str, num: int, fields: Dict[str, Any]) -> _Sent:
+        if self._offline.is_set() or self._breaker_open([(repo, num)]):
+            self._queue(repo, num, fields)
+        started = time.perf_counter()
+        try:
+            task = self.client.add_task(**fields)
+        except Exception as e:
+            self._track(e)
+            if self._went_offline(e):
+                self._queue(repo, num, fields)
+            self._fail([(repo, num)], e)
+        self.breaker.success()
+        self._created(repo, num, task, fields)
+        latency_ms = (time.perf_counter() - started) * 1000
+        metrics.observe("gh_gt_phase_seconds", latency_ms / 1000, phase="send")
+        return task, self.client.last_backend(), latency_ms, CREATED, None
+
+    def _create_many(
+        self, keys: list[tuple[str, int]], batch: list[Dict[str, Any]]
+    ) -> list[Union[_Sent, Exception]]:
+        if self._offline.is_set() or self._breaker_open(keys):
+            return [self._queued(key, fields) for key, fields in zip(keys, batch)]
+        started = time.perf_counter()
+        try:
+            results = self.client.add_tasks(batch)
+        except Exception as e:
+            self._track(e)
+            if self._went_offline(e):
+                return [self._queued(key, fields) for key, fields in zip(keys, batch)]
+            self._fail(keys, e)
+        self.breaker.success()
+        latency_ms = (time.perf_counter() - started) * 1000
+        metrics.observe("gh_gt_phase_seconds", latency_ms / 1000, phase="send")
+        out: list[Union[_Sent, Exception]] = []
+        for (repo, num), fields, task in zip(keys, batch, results):
+            if isinstance(task, Exception):
+                if self.journal:
+                    self.journal.record(repo, num, jr.FAILED)
+                out.append(task)
+            else:
+                self._created(repo, num, task, fields)
+                out.append((task, "sync", latency_ms, CREATED, None))
+        return out
+
+    def _created(self, repo: str, num: int, task: td.TodoistTask, fields: Dict[str, Any]) -> None:
+        if self.journal:
+            self.journal.record(repo, num, jr.CREATED, task_id=task.id)
+        if self.store:
+            self.store.record_task(repo, num, task.id, fields, self._hashes.pop((repo, num), None))
+
+    def _existing(self, key: tuple[str, int], fields: Dict[str, Any]) -> Optional[tuple[str, Dict[str, Any]]]:
+        """(task id, snapshot of its fields) of the task an issue already has.
+
+        Looked up in the store's mapping first, then by the issue URL that
+        ends every task description (for tasks created before the mapping
+        existed, or from another machine).
+        """
+        found = self.store.snapshot_for(*key) if self.store else None
+        if found and found[1] is not None:
+            return found[0], found[1]
+        task = self._marker_index().get(_marker(fields.get("description")))
+        if found:
+            # Mapped but without a snapshot: diff against the live task if it's
+            # the same one, else send every field.
+            return found[0], task if task and task["id"] == found[0] else {}
+        return (task["id"], task) if task else None
+
+    def _marker_index(self) -> dict[str, Dict[str, Any]]:
+        # Listed once per run, on the first issue the store can't answer for.
+        if self._markers is None:
+            self._markers = {}
+            try:
+                for task in self.client.iter_tasks():
+                    marker = _marker(task.get("description"))
+                    if marker:
+                        self._markers.setdefault(marker, task)
+            except Exception as e:
+                log_debug(f"cannot list Todoist tasks for --upsert lookup: {e}")
+        return self._markers
+
+    def _update(self, key: tuple[str, int], existing: tuple[str, Dict[str, Any]], fields: Dict[str, Any]) -> _Sent:
+        repo, num = key
+        task_id, snapshot = existing
+        task = td.TodoistTask(id=task_id, content=fields["content"], url=td.TASK_URL.format(id=task_id))
+        changes = td.diff_fields(snapshot, fields)
+        if not changes:
+            self._created(repo, num, task, fields)
+            return task, None, 0.0, UNCHANGED, None
+        try:
+            self.breaker.check()
+        except br.CircuitOpen:
+            # The outbox only creates tasks, so an update can't be queued; it fails.
+            if self.journal:
+                self.journal.record(repo, num, jr.FAILED)
+            raise
+        started = time.perf_counter()
+        try:
+            self.client.update_task(task_id, **changes)
+        except Exception as e:
+            self._track(e)
+            if isinstance(e, td.TodoistError) and e.status == 404:
+                # Deleted in Todoist since; create it again.
+                log_debug(f"task {task_id} for {_ref(repo, num)} is gone; creating a new one")
+                return self._create(repo, num, fields)
+            self._fail([key], e)
+        self.breaker.success()
+        self._created(repo, num, task, fields)
+        latency_ms = (time.perf_counter() - started) * 1000
+        metrics.observe("gh_gt_phase_seconds", latency_ms / 1000, phase="send")
+        return task, self.client.last_backend(), latency_ms, UPDATED, ", ".join(sorted(changes))
+
+    def _fail(self, keys: list[tuple[str, int]], error: Exception) -> NoReturn:
+        """Journal a failed send and re-raise it.
+
+        Only a send that certainly didn't reach Todoist is recorded as failed
+        (and retried by a resume). One that may have been applied anyway, like
+        a read timeout, stays ``submitted`` so a resume reports it instead of
+        writing the task a second time.
+        """
+        if td.may_have_applied(error):
+            raise RuntimeError(f"{error} (the request may have reached Todoist; check there before retrying)") from error
+        if self.journal:
+            for repo, num in keys:
+                self.journal.record(repo, num, jr.FAILED)
+        raise error
+
+    def _breaker_open(self, keys: list[tuple[str, int]]) -> bool:
+        """True if the breaker is open and these tasks should be queued; raises
+        CircuitOpen when they have to fail instead (no store)."""
+        try:
+            self.breaker.check()
+        except br.CircuitOpen:
+            if self.outbox:
+                return True
+            if self.journal:
+                for repo, num in keys:
+                    self.journal.record(repo, num, jr.FAILED)
+            raise
+        return False
+
+    def _track(self, error: Exception) -> None:
+        # Only failures that say Todoist itself is in trouble count; a
+        # rejected payload still means the service is answering.
+        if td.is_transient_error(error):
+            self.breaker.failure(error)
+        else:
+            self.breaker.success()
+
+    def _went_offline(self, error: Exception) -> bool:
+        """After a send that never reached Todoist, check connectivity once for the whole run."""
+        if not self.outbox or not td.is_connectivity_error(error):
+            return False
+        with self._offline_lock:
+            if not self._offline.is_set() and not td.reachable():
+                log_debug("Todoist unreachable; queueing remaining tasks in the outbox")
+                self._offline.set()
+        return self._offline.is_set()
+
+    def _queue(self, repo: str, num: int, fields: Dict[str, Any]) -> None:
+        raise self._queued((repo, num), fields)
+
+    def _queued(self, key: tuple[str, int], fields: Dict[str, Any]) -> "_Queued":
+        repo, num = key
+        self.store.enqueue(repo, num, fields, self._hashes.pop(key, None))
+        if self.journal:
+            self.journal.record(repo, num, jr.QUEUED)
+        return _Queued("Todoist unreachable; queued for 'gh gt flush'")
+
+
+# What a send returns: task, backend, latency in ms, outcome status, detail.
+_Sent = tuple[td.TodoistTask, Optional[str], float, str, Optional[str]]
+
+
+_END = object()
+
+
+def _windows(items: Iterable[Any], size: int, wait: float) -> Iterator[list[Any]]:
+    """Split ``items`` into lists of up to ``size``.
+
+    Anything but a list or tuple may block between items (a pipe, a tailed
+    file), so it is read on a helper thread and a window is handed on as soon
+    as no new item has arrived for ``wait`` seconds.
+    """
+    if isinstance(items, (list, tuple)) or wait <= 0:
+        it = iter(items)
+        while True:
+            window = list(itertools.islice(it, size))
+            if not window:
+                return
+            yield window
+
+    pending: queue.Queue[Any] = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    error: list[BaseException] = []
+
+    def put(item: Any) -> bool:
+        # Bounded, so a reader ahead of the run waits; gives up once the run ends.
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            error.append(e)
+        put(_END)
+
+    threading.Thread(target=read, name="gh-gt-input", daemon=True).start()
+    try:
+        done = False
+        while not done:
+            first = pending.get()
+            if first is _END:
+                break
+            window = [first]
+            while len(window) < size:
+                try:
+                    item = pending.get(timeout=wait)
+                except queue.Empty:
+                    break
+                if item is _END:
+                    done = True
+                    break
+                window.append(item)
+            yield window
+        if error:
+            raise error[0]
+    finally:
+        stop.set()
+
+
+def _marker(description: Optional[str]) -> str:
+    """The issue URL on the last line of a task description, or ""."""
+    last = (description or "").rstrip().rpartition("\n")[2].strip()
+    return last if last.startswith(("https://", "http://")) else ""
+
+
+class _Queued(Exception):
+    """A task went to the outbox instead of Todoist."""
+
+
+def _sync_labels(label_sync: lb.LabelSync, batch: list[Dict[str, Any]]) -> None:
+    """Create the batch's missing labels together and rewrite names to their Todoist spelling."""
+    names = {name for fields in batch for name in fields.get("labels") or []}
+    if not names:
+        return
+    try:
+        canonical = label_sync.ensure(names)
+    except Exception as e:
+        # Not fatal: Todoist still creates unknown labels on the task itself.
+        log_debug(f"label sync failed, leaving labels to Todoist: {e}")
+        return
+    for fields in batch:
+        if fields.get("labels"):
+            fields["labels"] = [canonical.get(n, n) for n in fields["labels"]]
+
+
+def flush_outbox(client: td.TodoistClient, store: st.Store, *, batch_size: int = td.SYNC_BATCH) -> Iterator[Outcome]:
+    """Send queued tasks in outbox order; yields one outcome per item.
+
+    Items whose issue already has a task in the mapping are dropped, not
+    sent again. If Todoist turns out to be unreachable the flush stops and
+    the rest stay queued. A send that may have been applied anyway (read
+    timeout, 5xx) is dropped and reported rather than risk a second task;
+    items that fail for other reasons stay queued with their error and are
+    retried by the next flush.
+    """
+    after = 0
+    while True:
+        items = store.pending(max(1, batch_size), after=after)
+        if not items:
+            return
+        after = items[-1].id
+        todo: list[st.OutboxItem] = []
+        for it in items:
+            existing = store.task_for(it.repo, it.number)
+            if existing:
+                store.remove(it.id)
+                yield Outcome(
+                    ref=_ref(it.repo, it.number),
+                    status=SKIPPED,
+                    repo=it.repo,
+                    number=it.number,
+                    detail=f"already created as {existing}",
+                )
+            else:
+                todo.append(it)
+        if not todo:
+            continue
+
+        results: list[Union[td.TodoistTask, Exception]]
+        if getattr(client, "backend", None) == "sync":
+            try:
+                results = client.add_tasks([it.fields for it in todo])
+            except Exception as e:
+                results = [e] * len(todo)
+        else:
+            results = []
+            for it in todo:
+                try:
+                    results.append(client.add_task(**it.fields))
+                except Exception as e:
+                    results.append(e)
+                    if td.is_connectivity_error(e):
+                        break
+
+        for it, result in zip(todo, results):
+            ref = _ref(it.repo, it.number)
+            if isinstance(result, Exception):
+                if td.is_connectivity_error(result):
+                    yield Outcome(ref=ref, status=QUEUED, repo=it.repo, number=it.number, detail="Todoist unreachable; still queued")
+                    return
+                if td.may_have_applied(result):
+                    # Sending it again could create it twice; drop it and report it for review.
+                    store.remove(it.id)
+                    detail = f"{result} (the request may have reached Todoist; check there, removed from the outbox)"
+                    yield Outcome(ref=ref, status=FAILED, repo=it.repo, number=it.number, detail=detail)
+                    continue
+                store.mark_failed(it.id, str(result))
+                yield Outcome(ref=ref, status=FAILED, repo=it.repo, number=it.number, detail=str(result))
+                continue
+            store.record_task(it.repo, it.number, result.id, it.fields, it.content_hash)
+            store.remove(it.id)
+            yield Outcome(ref=ref, status=CREATED, repo=it.repo, number=it.number, task=result, backend=client.last_backend())
+
+
+def submit_tasks(
+    client: td.TodoistClient,
+    records: Iterable[tuple[str, int, Dict[str, Any], Optional[str]]],
+    *,
+    store: Optional[st.Store] = None,
+    jobs: int = 4,
+    batch_size: int = td.SYNC_BATCH,
+    label_sync: Optional[lb.LabelSync] = None,
+    retry_unconfirmed: bool = False,
+) -> Iterator[Outcome]:
+    """Create tasks from already built fields (``gh gt submit``); one outcome per record, in order.
+
+    Records are consumed ``batch_size`` at a time, so memory stays flat
+    however long the input is. Issues the store already maps to a task are
+    skipped, which makes re-submitting a partly sent file safe. So are
+    issues whose earlier send may have created a task without confirming it
+    (read timeout, 5xx), unless ``retry_unconfirmed``. With ``label_sync``
+    each batch's missing labels are created up front, as an import run does.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+
+    def record(
+        item: tuple[str, int, Dict[str, Any], Optional[str]], task: Union[td.TodoistTask, Exception]
+    ) -> Union[td.TodoistTask, Exception]:
+        # Recorded as soon as Todoist answers, so an interrupted submit never loses a created task.
+        repo, num, fields, digest = item
+        if isinstance(task, Exception):
+            if not td.may_have_applied(task):
+                return task
+            if store:
+                store.mark_unconfirmed(repo, num, str(task))
+            return RuntimeError(f"{task} (the request may have reached Todoist; check there before retrying)")
+        if store:
+            store.record_task(repo, num, task.id, fields, digest)
+        return task
+
+    def add(item: tuple[str, int, Dict[str, Any], Optional[str]]) -> Union[td.TodoistTask, Exception]:
+        try:
+            task: Union[td.TodoistTask, Exception] = client.add_task(**item[2])
+        except Exception as e:
+            task = e
+        return record(item, task)
+
+    def skip(repo: str, num: int) -> Optional[str]:
+        if not store:
+            return None
+        task_id = store.task_for(repo, num)
+        if task_id:
+            return f"already created as {task_id}"
+        error = None if retry_unconfirmed else store.unconfirmed_for(repo, num)
+        if error:
+            return f"an earlier send may have created it ({error}); check Todoist, or submit with --retry-unconfirmed"
+        return None
+
+    try:
+        it = iter(records)
+        while True:
+            batch = list(itertools.islice(it, max(1, batch_size)))
+            if not batch:
+                return
+            skipped = [skip(repo, num) for repo, num, _, _ in batch]
+            todo = [item for item, reason in zip(batch, skipped) if not reason]
+            if label_sync:
+                _sync_labels(label_sync, [fields for _, _, fields, _ in todo])
+            results: list[Union[td.TodoistTask, Exception]] = []
+            if todo and getattr(client, "backend", None) == "sync":
+                try:
+                    results = client.add_tasks([fields for _, _, fields, _ in todo])
+                except Exception as e:
+                    results = [e] * len(todo)
+                results = [record(item, result) for item, result in zip(todo, results)]
+            elif todo:
+                results = list(pool.map(add, todo))
+            sent = iter(results)
+            for (repo, num, _, _), reason in zip(batch, skipped):
+                ref = _ref(repo, num)
+                if reason:
+                    yield Outcome(ref=ref, status=SKIPPED, repo=repo, number=num, detail=reason)
+                    continue
+                result = next(sent)
+                if isinstance(result, Exception):
+                    yield Outcome(ref=ref, status=FAILED, repo=repo, number=num, detail=str(result))
+                    continue
+                yield Outcome(ref=ref, status=CREATED, repo=repo, number=num, task=result, backend=client.last_backend())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _ref(repo: str, num: int) -> str:
+    return f"{repo}#{num}"
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from .util import log_debug
+
+
+# Todoist REST API: 450 requests per user per 15 minute window.
+TODOIST_REQUESTS = 450
+TODOIST_WINDOW = 15 * 60
+# Wait after a GitHub secondary (abuse) rate limit, per attempt.
+SECONDARY_BACKOFF = 60.0
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request a client sends.
+
+    ``capacity`` requests may go out back to back; after that they are paced
+    at ``capacity / per`` requests per second.
+    """
+
+    def __init__(
+        self,
+        capacity: int = TODOIST_REQUESTS,
+        per: float = TODOIST_WINDOW,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.rate = self.capacity / per
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available; returns seconds waited."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            # Reserve the token now; callers that have to wait queue up behind it.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket after a 429 so every sender backs off, not just one."""
+        with self._lock:
+            # Leave the bucket so the next acquire() waits ``seconds``.
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+
+class GitHubBudget:
+    """GitHub GraphQL point budget as reported by the ``rateLimit`` field.
+
+    Fetches take a slot before each request. While plenty of the hourly
+    budget is left up to ``max_concurrency`` requests run at once; as it
+    drains, fewer do, and below ``reserve`` (a share of the limit kept for
+    other tools using the same token) requests wait for the reset.
+    ``max_points`` caps what this run may spend in total.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_points: Optional[int] = None,
+        max_concurrency: int = 4,
+        reserve: float = 0.1,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_points = max_points
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserve = reserve
+        self.used = 0
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._cost = 1
+        self._active = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._cond = threading.Condition()
+
+    def concurrency(self) -> int:
+        """Requests allowed in flight for the budget left."""
+        if self.remaining is None or not self.limit:
+            return self.max_concurrency
+        share = self.remaining / self.limit
+        if share >= 0.5:
+            return self.max_concurrency
+        return max(1, int(self.max_concurrency * share / 0.5))
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self._wait_for_reset()
+        with self._cond:
+            if self.max_points is not None and self.used + self._cost > self.max_points:
+                raise RuntimeError(f"GitHub point budget for this run ({self.max_points}) used up")
+            while self._active >= self.concurrency():
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def update(self, *, cost: int, remaining: int, limit: int, reset_at: Optional[float]) -> None:
+        with self._cond:
+            self.used += cost
+            self._cost = max(1, cost)
+            self.remaining, self.limit, self.reset_at = remaining, limit, reset_at
+            # More (or fewer) requests may run now.
+            self._cond.notify_all()
+
+    def backoff(self, *, secondary: bool, attempt: int) -> None:
+        """Sleep after GitHub rejected a request for rate limiting."""
+        with self._cond:
+            if secondary:
+                # Secondary limits carry no reset time; back off linearly.
+                wait = SECONDARY_BACKOFF * attempt
+            else:
+                self.remaining = 0
+                wait = max(1.0, self.reset_at - self._clock()) if self.reset_at else SECONDARY_BACKOFF
+        log_debug(f"GitHub {'secondary ' if secondary else ''}rate limit hit; retrying in {wait:.0f}s")
+        self._sleep(wait)
+
+    def _wait_for_reset(self) -> None:
+        with self._cond:
+            low = (
+                self.remaining is not None
+                and self.limit
+                and self.reset_at
+                and self.remaining < max(self._cost, self.limit * self.reserve)
+            )
+            wait = self.reset_at - self._clock() if low else 0
+        if wait > 0:
+            log_debug(f"GitHub budget low ({self.remaining}/{self.limit}); waiting {wait:.0f}s for the reset")
+            self._sleep(wait)
+            with self._cond:
+                if self.reset_at and self._clock() >= self.reset_at:
+                    self.remaining = self.limit
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+
+# Task fields a rule may set, and the type each must have in the rules file.
+FIELDS: Dict[str, type] = {
+    "priority": int,
+    "project_id": str,
+    "section_id": str,
+    "due": str,
+    "labels": list,
+}
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Label → task field rules, compiled into a single lookup table.
+
+    Matching is case-insensitive on the GitHub label name. When several of an
+    issue's labels match, the rule listed first in the file wins for each
+    scalar field, and ``labels`` from every matching rule are combined.
+    """
+
+    by_label: Dict[str, tuple[int, Dict[str, Any]]] = field(default_factory=dict)
+    # Lower-cased label name → Todoist label it should be filed under.
+    aliases: Dict[str, str] = field(default_factory=dict)
+    # Digest of the compiled rules; changes whenever the mapping changes.
+    version: str = ""
+
+    def apply(self, labels: Iterable[str]) -> Dict[str, Any]:
+        hits = []
+        for name in labels:
+            hit = self.by_label.get(name.lower())
+            if hit is not None:
+                hits.append(hit)
+        if not hits:
+            return {}
+        hits.sort(key=lambda h: h[0])
+        out: Dict[str, Any] = {}
+        for _, fields in hits:
+            for key, value in fields.items():
+                if key == "labels":
+                    extra = out.setdefault("labels", [])
+                    extra.extend(v for v in value if v not in extra)
+                else:
+                    out.setdefault(key, value)
+        return out
+
+
+def compile_rules(data: Any) -> RuleSet:
+    """Validate a parsed rules document and build its lookup table.
+
+    Accepted shape::
+
+        {
+          "labels": {"P0": {"priority": 4}, "area/db": {"section_id": "123"}},
+          "aliases": {"type: bug": "bug", "Bug": "bug"}
+        }
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("labels", {}), dict):
+        raise ValueError('rules must be an object with a "labels" mapping')
+    if not isinstance(data.get("aliases", {}), dict):
+        raise ValueError('"aliases" must map label names to label names')
+    aliases: Dict[str, str] = {}
+    for name, target in data.get("aliases", {}).items():
+        if not isinstance(target, str) or not target.strip():
+            raise ValueError(f"alias for {name!r} must be a non-empty string")
+        aliases[" ".join(name.split()).lower()] = " ".join(target.split())
+    table: Dict[str, tuple[int, Dict[str, Any]]] = {}
+    for order, (label, fields) in enumerate(data.get("labels", {}).items()):
+        if not isinstance(fields, dict):
+            raise ValueError(f"rule for label {label!r} must be an object")
+        compiled: Dict[str, Any] = {}
+        for key, value in fields.items():
+            kind = FIELDS.get(key)
+            if kind is None:
+                raise ValueError(f"rule for label {label!r}: unknown field {key!r} (use: {', '.join(FIELDS)})")
+            if not isinstance(value, kind) or isinstance(value, bool):
+                raise ValueError(f"rule for label {label!r}: {key} must be {kind.__name__}")
+            if key == "priority" and not 1 <= value <= 4:
+                raise ValueError(f"rule for label {label!r}: priority must be 1-4")
+            if key == "labels":
+                value = [str(v) for v in value]
+            compiled[key] = value
+        # The first rule for a label (case-insensitively) wins.
+        table.setdefault(label.lower(), (order, compiled))
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return RuleSet(by_label=table, aliases=aliases, version=hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12])
+
+
+def load_rules(path: str, *, required: bool = False) -> Optional[RuleSet]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        if required:
+            raise RuntimeError(f"rules file not found: {path}")
+        return None
+    except ValueError as e:
+        raise RuntimeError(f"invalid rules file {path}: {e}")
+    try:
+        return compile_rules(data)
+    except ValueError as e:
+        raise RuntimeError(f"invalid rules file {path}: {e}")
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from . import config as cfg
+from .util import DATACLASS_SLOTS
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    fields TEXT NOT NULL,
+    queued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    content_hash TEXT,
+    UNIQUE (profile, repo, number)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    profile TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    task_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    snapshot TEXT,
+    content_hash TEXT,
+    PRIMARY KEY (profile, repo, number)
+);
+CREATE TABLE IF NOT EXISTS unconfirmed (
+    profile TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    failed_at REAL NOT NULL,
+    PRIMARY KEY (profile, repo, number)
+);
+"""
+
+
+@dataclass(**DATACLASS_SLOTS)
+class OutboxItem:
+    id: int
+    repo: str
+    number: int
+    # add_task keyword arguments, exactly as built for the original run.
+    fields: Dict[str, Any]
+    attempts: int
+    # Digest of the issue the fields were built from, recorded with the task.
+    content_hash: Optional[str] = None
+
+
+def default_path() -> str:
+    return os.path.join(cfg.state_dir(), "gh-gt.db")
+
+
+class Store:
+    """Local SQLite state shared by runs of one profile.
+
+    Holds the outbox (tasks whose send failed because Todoist was
+    unreachable, waiting for ``gh gt flush``), the issue → task mapping
+    used to avoid creating the same task twice, and the issues whose send
+    may have created a task that was never confirmed.
+    """
+
+    def __init__(self, path: Optional[str] = None, *, profile: Optional[str] = None) -> None:
+        self.path = path or default_path()
+        self.profile = profile or cfg.active_profile()
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        # One connection shared by the importer's worker threads, serialized by the lock.
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # In WAL mode this still survives a crashed process; it only skips
+            # an fsync per commit, which would otherwise cost one per task.
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            for table, added in (("tasks", ("snapshot", "content_hash")), ("outbox", ("content_hash",))):
+                columns = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+                for column in added:
+                    if column not in columns:
+                        self._db.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def enqueue(self, repo: str, number: int, fields: Dict[str, Any], content_hash: Optional[str] = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO outbox (profile, repo, number, fields, queued_at, content_hash) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (profile, repo, number) DO UPDATE SET fields = excluded.fields,"
+                " content_hash = excluded.content_hash",
+                (self.profile, repo, number, json.dumps(fields, ensure_ascii=False), time.time(), content_hash),
+            )
+
+    def pending(self, limit: int = 100, *, after: int = 0) -> list[OutboxItem]:
+        """Queued items in the order they were queued, starting after id ``after``."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, repo, number, fields, attempts, content_hash FROM outbox"
+                " WHERE profile = ? AND id > ? ORDER BY id LIMIT ?",
+                (self.profile, after, limit),
+            ).fetchall()
+        return [
+            OutboxItem(id=r[0], repo=r[1], number=r[2], fields=json.loads(r[3]), attempts=r[4], content_hash=r[5])
+            for r in rows
+        ]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox WHERE profile = ?", (self.profile,)).fetchone()[0]
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM outbox WHERE id = ?", (item_id,))
+
+    def mark_failed(self, item_id: int, error: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?", (error, item_id)
+            )
+
+    def record_task(
+        self,
+        repo: str,
+        number: int,
+        task_id: str,
+        fields: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        """Map an issue to its task; ``fields`` is the snapshot of what the task
+        was last sent and ``content_hash`` the digest of the issue it came from."""
+        snapshot = json.dumps(fields, ensure_ascii=False) if fields is not None else None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tasks (profile, repo, number, task_id, created_at, snapshot, content_hash)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.profile, repo, number, task_id, time.time(), snapshot, content_hash),
+            )
+            self._db.execute(
+                "DELETE FROM unconfirmed WHERE profile = ? AND repo = ? AND number = ?", (self.profile, repo, number)
+            )
+
+    def mark_unconfirmed(self, repo: str, number: int, error: str) -> None:
+        """Remember a send that may have created a task without saying so (read timeout, 5xx)."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO unconfirmed (profile, repo, number, error, failed_at) VALUES (?, ?, ?, ?, ?)",
+                (self.profile, repo, number, error, time.time()),
+            )
+
+    def unconfirmed_for(self, repo: str, number: int) -> Optional[str]:
+        """The error of an unconfirmed send for this issue, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT error FROM unconfirmed WHERE profile = ? AND repo = ? AND number = ?",
+                (self.profile, repo, number),
+            ).fetchone()
+        return row[0] if row else None
+
+    def task_for(self, repo: str, number: int) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT task_id FROM tasks WHERE profile = ? AND repo = ? AND number = ?",
+                (self.profile, repo, number),
+            ).fetchone()
+        return row[0] if row else None
+
+    def snapshot_for(self, repo: str, number: int) -> Optional[tuple[str, Optional[Dict[str, Any]]]]:
+        """(task id, last-sent fields) for an issue, or None if it has no task."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT task_id, snapshot FROM tasks WHERE profile = ? AND repo = ? AND number = ?",
+                (self.profile, repo, number),
+            ).fetchone()
+        if not row:
+            return None
+        return row[0], json.loads(row[1]) if row[1] else None
+
+    def mapped(self, repo: str, numbers: list[int]) -> Dict[int, tuple[str, Optional[str]]]:
+        """(task id, content hash) for those of these issues that have a task."""
+        out: Dict[int, tuple[str, Optional[str]]] = {}
+        # Stay under SQLite's bound parameter limit.
+        for i in range(0, len(numbers), 500):
+            chunk = numbers[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT number, task_id, content_hash FROM tasks WHERE profile = ? AND repo = ? AND number IN ({marks})",
+                    (self.profile, repo, *chunk),
+                ).fetchall()
+            out.update((number, (task_id, digest)) for number, task_id, digest in rows)
+        return out
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import sys
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+# Task files are NDJSON, one built task per line:
+#   {"repo": "owner/repo", "number": 12, "task": {"content": "#12 Title", ...}, "hash": "..."}
+# where "task" holds add_task keyword arguments and the optional "hash" is
+# the issue's content hash, recorded with the task on submit. Paths ending
+# in .gz are gzip-compressed; "-" is stdin / stdout.
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def open_writer(path: str) -> TextIO:
+    if path == "-":
+        return sys.stdout
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "wb", compresslevel=6), encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def write_task(
+    f: TextIO, repo: str, number: int, task: Dict[str, Any], content_hash: Optional[str] = None
+) -> None:
+    rec: Dict[str, Any] = {"repo": repo, "number": number, "task": task}
+    if content_hash:
+        rec["hash"] = content_hash
+    f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+    f.write("\n")
+
+
+def read_tasks(path: str) -> Iterator[tuple[str, int, Dict[str, Any], Optional[str]]]:
+    """(repo, number, add_task fields, content hash) per line, read lazily; gzip is detected by content."""
+    raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        stream = raw
+        if isinstance(raw, io.BufferedReader) and raw.peek(2)[:2] == _GZIP_MAGIC:
+            stream = gzip.GzipFile(fileobj=raw)
+        for lineno, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8"), 1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+                repo, number, task = rec["repo"], int(rec["number"]), rec["task"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise RuntimeError(f"{path}:{lineno}: not a task record: {e}")
+            if not isinstance(task, dict) or not task.get("content"):
+                raise RuntimeError(f"{path}:{lineno}: task has no content")
+            yield repo, number, task, rec.get("hash")
+    finally:
+        if raw is not sys.stdin.buffer:
+            raw.close()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, Mapping, Union
+
+# Filters a placeholder may apply, left to right: {title|oneline|upper}
+FILTERS: Dict[str, Callable[[str], str]] = {
+    "lower": str.lower,
+    "upper": str.upper,
+    "strip": str.strip,
+    "first_line": lambda s: s.strip().split("\n", 1)[0],
+    "oneline": lambda s: " ".join(s.split()),
+}
+
+_TOKEN_RE = re.compile(r"\{\{|\}\}|\{([^{}]*)\}|[{}]")
+
+_Part = Union[str, tuple[str, tuple[Callable[[str], str], ...]]]
+
+
+class Template:
+    """A task template compiled once and rendered per issue.
+
+    The language is deliberately tiny: literal text, ``{field}``
+    placeholders with optional ``|filter`` chains, and ``{{`` / ``}}`` for
+    literal braces. Nothing is evaluated, so a template can't reach beyond
+    the values it is given.
+    """
+
+    def __init__(self, source: str, parts: list[_Part]) -> None:
+        self.source = source
+        self._parts = parts
+        # Fields the template uses; callers only need to compute these.
+        self.names = frozenset(p[0] for p in parts if isinstance(p, tuple))
+
+    def render(self, values: Mapping[str, str]) -> str:
+        out: list[str] = []
+        for part in self._parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name, filters = part
+            value = values[name]
+            for f in filters:
+                value = f(value)
+            out.append(value)
+        return "".join(out)
+
+    def __repr__(self) -> str:
+        return f"Template({self.source!r})"
+
+
+def compile_template(source: str, fields: Iterable[str]) -> Template:
+    """Parse ``source`` into a Template over ``fields``; ValueError if it's malformed."""
+    known = set(fields)
+    parts: list[_Part] = []
+    literal: list[str] = []
+    pos = 0
+    for m in _TOKEN_RE.finditer(source):
+        literal.append(source[pos : m.start()])
+        pos = m.end()
+        token = m.group(0)
+        if token in ("{{", "}}"):
+            literal.append(token[0])
+            continue
+        if m.group(1) is None:
+            raise ValueError(f"unmatched {token!r} at position {m.start()} (use {token * 2} for a literal brace)")
+        name, *names = [s.strip() for s in m.group(1).split("|")]
+        if name not in known:
+            raise ValueError(f"unknown field {{{name}}} (use: {', '.join(sorted(known))})")
+        filters = []
+        for f in names:
+            if f not in FILTERS:
+                raise ValueError(f"unknown filter {f!r} in {{{m.group(1)}}} (use: {', '.join(FILTERS)})")
+            filters.append(FILTERS[f])
+        if any(literal):
+            parts.append("".join(literal))
+        literal = []
+        parts.append((name, tuple(filters)))
+    literal.append(source[pos:])
+    if any(literal):
+        parts.append("".join(literal))
+    return Template(source, parts)
@@ -3,15 +3,64 @@ from __future__ import annotations
 import json
 import os
 import sys
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Union
 from collections.abc import Iterable
 
+from . import config as cfg
+from . import metrics
 from .keychain import get_token
-from .util import log_debug
+from .ratelimit import TODOIST_WINDOW, RateLimiter
+from .util import DATACLASS_SLOTS, log_debug
 
 
-@dataclass
+REST_BASE = "https://api.todoist.com/rest/v2"
+SYNC_URL = "https://api.todoist.com/sync/v9/sync"
+# The Sync API accepts at most this many commands per request.
+SYNC_BATCH = 100
+# Attempts per request when Todoist answers 429 Too Many Requests.
+MAX_ATTEMPTS = 3
+BACKENDS = ("auto", "sdk", "rest", "sync")
+TASK_URL = "https://app.todoist.com/app/task/{id}"
+
+
+def task_payload(
+    *,
+    content: str,
+    description: Optional[str] = None,
+    project_id: Optional[str] = None,
+    section_id: Optional[str] = None,
+    priority: Optional[int] = None,
+    due_string: Optional[str] = None,
+    labels: Optional[list[str]] = None,
+) -> Dict[str, Any]:
+    """JSON body for POST /tasks; unset fields are left out."""
+    payload: Dict[str, Any] = {"content": content}
+    if description:
+        payload["description"] = description
+    if project_id:
+        payload["project_id"] = project_id
+    if section_id:
+        payload["section_id"] = section_id
+    if priority:
+        payload["priority"] = priority
+    if due_string:
+        payload["due_string"] = due_string
+    if labels:
+        payload["labels"] = labels
+    return payload
+
+
+class TodoistError(RuntimeError):
+    """Todoist answered with an error status."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(**DATACLASS_SLOTS)
 class TodoistTask:
     id: str
     content: str
@@ -19,28 +68,184 @@ class TodoistTask:
 
 
 class TodoistClient:
-    def __init__(self, token: Optional[str] = None) -> None:
+    """Todoist API client; one instance is meant to be shared by a whole run.
+
+    All requests go through one HTTP connection pool and one rate limiter, so
+    concurrent senders (and issues from many repositories) share the budget.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        *,
+        max_connections: int = 10,
+        limiter: Optional[RateLimiter] = None,
+        backend: str = "auto",
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+    ) -> None:
         self.token = token or get_token()
         if not self.token:
             raise RuntimeError(
                 "Todoist token not found. Run 'gh gt auth todoist --token <TOKEN> --save keychain' or set TODOIST_API_TOKEN."
             )
+        if backend not in BACKENDS:
+            raise RuntimeError(f"unknown Todoist backend {backend!r} (use: {', '.join(BACKENDS)})")
 
+        self.backend = backend
+        self.timeout = (connect_timeout, read_timeout)
+        self.limiter = limiter or RateLimiter()
+        self._max_connections = max_connections
+        self._session = None
+        self._session_lock = threading.Lock()
         self._lib_client = None
-        self._default_backend = "rest"
+        self._default_backend = "sync" if backend == "sync" else "rest"
         self._last_backend: Optional[str] = None
-        use_sdk = True
-        if os.getenv("GT_DISABLE_TODOIST_SDK"):
-            use_sdk = False
-        if "todoist_api_python.api" in sys.modules:
-            use_sdk = True
+        # Backend that worked per operation ("tasks", "projects"), as remembered
+        # from earlier runs; only consulted in auto mode.
+        self._known: Dict[str, str] = {}
+        self._capability_key = ""
+        use_sdk = backend == "sdk"
+        if backend == "auto":
+            use_sdk = self._auto_wants_sdk()
         if use_sdk:
             try:
                 from todoist_api_python.api import TodoistAPI  # type: ignore
-                self._lib_client = TodoistAPI(self.token)
+                self._lib_client = self._make_sdk_client(TodoistAPI)
                 self._default_backend = "sdk"
             except Exception as e:
+                if backend == "sdk":
+                    raise RuntimeError(f"Todoist SDK backend unavailable: {e}")
                 log_debug(f"todoist-api-python unavailable, will use REST fallback: {e}")
+                self._remember(tasks="rest", projects="rest")
+
+    def _auto_wants_sdk(self) -> bool:
+        imported = sys.modules.get("todoist_api_python.api") is not None
+        if os.getenv("GT_DISABLE_TODOIST_SDK"):
+            # Only an SDK the host program already imported is used.
+            return imported
+        version = _sdk_version()
+        self._capability_key = f"todoist-api-python=={version}"
+        self._known = dict(_capabilities().get(self._capability_key) or {})
+        metrics.inc("gh_gt_cache_total", cache="backends", result="hit" if self._known else "miss")
+        if self._known:
+            log_debug(f"Todoist backends from capability cache: {self._known}")
+            return "sdk" in self._known.values()
+        return imported or version != "none"
+
+    def _remember(self, **ops: str) -> None:
+        """Persist which backend worked, so later auto runs skip the probing."""
+        if self.backend != "auto" or not self._capability_key:
+            return
+        if all(self._known.get(op) == b for op, b in ops.items()):
+            return
+        self._known.update(ops)
+        known = dict(self._known)
+        try:
+            cfg.update_json(_capabilities_path(), lambda data: data.__setitem__(self._capability_key, known))
+        except OSError as e:
+            log_debug(f"cannot write Todoist capability cache: {e}")
+
+    def _make_sdk_client(self, api_cls: Any) -> Any:
+        # Older SDKs are built on requests and accept a session: hand them ours
+        # so the SDK and REST paths share one connection pool.
+        import inspect
+
+        try:
+            params = inspect.signature(api_cls).parameters
+        except (TypeError, ValueError):
+            params = {}
+        if "session" in params:
+            return api_cls(self.token, session=self._http())
+        if "client" in params:
+            # httpx-based SDKs (v3+): same timeouts and connection cap as the REST path.
+            import httpx  # type: ignore
+
+            connect, read = self.timeout
+            client = httpx.Client(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(max_connections=self._max_connections),
+            )
+            return api_cls(self.token, client=client)
+        return api_cls(self.token)
+
+    def _http(self) -> Any:
+        with self._session_lock:
+            if self._session is None:
+                import requests  # type: ignore
+                from requests.adapters import HTTPAdapter  # type: ignore
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._max_connections)
+                session.mount("https://", adapter)
+                session.headers["Authorization"] = f"Bearer {self.token}"
+                self._session = session
+            return self._session
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        session = self._http()
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.limiter.acquire()
+            url = path if path.startswith("https://") else REST_BASE + path
+            resp = session.request(method, url, timeout=self.timeout, **kwargs)
+            if resp.status_code == 429:
+                metrics.inc("gh_gt_rate_limited_total", service="todoist")
+            if resp.status_code != 429 or attempt == MAX_ATTEMPTS:
+                break
+            metrics.inc("gh_gt_retries_total", service="todoist")
+            delay = _retry_after(resp)
+            log_debug(f"Todoist 429 on {method} {path}; retrying in {delay:.1f}s")
+            self.limiter.penalize(delay)
+        if resp.status_code >= 400:
+            raise TodoistError(f"Todoist API error {resp.status_code}: {resp.text}", status=resp.status_code)
+        return resp
+
+    def _call_sdk(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        # Same 429 handling as _request, for the SDK's own HTTP errors.
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.limiter.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if _status_of(e) != 429:
+                    raise
+                metrics.inc("gh_gt_rate_limited_total", service="todoist")
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                metrics.inc("gh_gt_retries_total", service="todoist")
+                delay = _retry_after(e.response)  # type: ignore[attr-defined]
+                log_debug(f"Todoist 429 on SDK {getattr(fn, '__name__', 'call')}; retrying in {delay:.1f}s")
+                self.limiter.penalize(delay)
+
+    def _sync(self, commands: list[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send Sync API commands in one request; returns uuid → sync_status."""
+        resp = self._request("POST", SYNC_URL, data={"commands": json.dumps(commands)})
+        return (resp.json() or {}).get("sync_status") or {}
+
+    def list_labels(self) -> list[str]:
+        """Names of the account's personal labels."""
+        items = self._request("GET", "/labels").json() or []
+        return [str(it["name"]) for it in items if isinstance(it, dict) and it.get("name")]
+
+    def create_labels(self, names: list[str]) -> list[str]:
+        """Create labels with batched Sync API commands; returns the names created."""
+        import uuid
+
+        created: list[str] = []
+        for i in range(0, len(names), SYNC_BATCH):
+            chunk = names[i : i + SYNC_BATCH]
+            commands = [
+                {"type": "label_add", "uuid": str(uuid.uuid4()), "temp_id": str(uuid.uuid4()), "args": {"name": n}}
+                for n in chunk
+            ]
+            status = self._sync(commands)
+            for cmd, name in zip(commands, chunk):
+                result = status.get(cmd["uuid"])
+                if result == "ok":
+                    created.append(name)
+                else:
+                    log_debug(f"label_add {name!r} failed: {result}")
+        return created
 
     def add_task(
         self,
@@ -53,11 +258,25 @@ class TodoistClient:
         due_string: Optional[str] = None,
         labels: Optional[list[str]] = None,
     ) -> TodoistTask:
-        if self._lib_client is not None:
+        if self.backend == "sync":
+            result = self.add_tasks([{
+                "content": content,
+                "description": description,
+                "project_id": project_id,
+                "section_id": section_id,
+                "priority": priority,
+                "due_string": due_string,
+                "labels": labels,
+            }])[0]
+            if isinstance(result, Exception):
+                raise result
+            return result
+        if self._lib_client is not None and self._known.get("tasks") != "rest":
             log_debug("Todoist backend: sdk")
             self._last_backend = "sdk"
             try:
-                task = self._lib_client.add_task(
+                task = self._call_sdk(
+                    self._lib_client.add_task,
                     content=content,
                     description=description,
                     project_id=project_id,
@@ -66,94 +285,432 @@ class TodoistClient:
                     due_string=due_string,
                     labels=labels,
                 )
-                return TodoistTask(id=str(task.id), content=task.content, url=getattr(task, "url", None))
             except Exception as e:
-                raise RuntimeError(f"Todoist add_task failed: {e}")
+                raise RuntimeError(f"Todoist add_task failed: {e}") from e
+            self._remember(tasks="sdk")
+            return TodoistTask(id=str(task.id), content=task.content, url=getattr(task, "url", None))
 
         # Fallback: direct REST
         log_debug("Todoist backend: rest")
         self._last_backend = "rest"
-        import requests  # type: ignore
-
-        headers = {"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"}
-        payload: Dict[str, Any] = {"content": content}
-        if description:
-            payload["description"] = description
-        if project_id:
-            payload["project_id"] = project_id
-        if section_id:
-            payload["section_id"] = section_id
-        if priority:
-            payload["priority"] = priority
-        if due_string:
-            payload["due_string"] = due_string
-        if labels:
-            payload["labels"] = labels
-
-        resp = requests.post("https://api.todoist.com/rest/v2/tasks", headers=headers, json=payload, timeout=20)
-        if resp.status_code >= 400:
-            detail = resp.text
-            raise RuntimeError(f"Todoist API error {resp.status_code}: {detail}")
-        data = resp.json()
+        payload = task_payload(
+            content=content,
+            description=description,
+            project_id=project_id,
+            section_id=section_id,
+            priority=priority,
+            due_string=due_string,
+            labels=labels,
+        )
+        data = self._request("POST", "/tasks", json=payload).json()
+        self._remember(tasks="rest")
         return TodoistTask(id=str(data.get("id")), content=data.get("content", ""), url=data.get("url"))
 
+    def add_tasks(self, batch: list[Dict[str, Any]]) -> list[Union[TodoistTask, Exception]]:
+        """Create many tasks with batched Sync API ``item_add`` commands.
+
+        ``batch`` holds add_task keyword arguments; the result has one task, or
+        the error for that task, per entry.
+        """
+        import uuid
+
+        self._last_backend = "sync"
+        out: list[Union[TodoistTask, Exception]] = []
+        for i in range(0, len(batch), SYNC_BATCH):
+            chunk = batch[i : i + SYNC_BATCH]
+            commands = []
+            for fields in chunk:
+                args = task_payload(**fields)
+                if "due_string" in args:
+                    args["due"] = {"string": args.pop("due_string")}
+                commands.append({"type": "item_add", "uuid": str(uuid.uuid4()), "temp_id": str(uuid.uuid4()), "args": args})
+            resp = self._request("POST", SYNC_URL, data={"commands": json.dumps(commands)}).json() or {}
+            status = resp.get("sync_status") or {}
+            ids = resp.get("temp_id_mapping") or {}
+            for cmd in commands:
+                result = status.get(cmd["uuid"])
+                task_id = ids.get(cmd["temp_id"])
+                if result == "ok" and task_id:
+                    out.append(TodoistTask(id=str(task_id), content=cmd["args"]["content"], url=TASK_URL.format(id=task_id)))
+                else:
+                    out.append(RuntimeError(f"Todoist item_add failed: {result}"))
+        return out
+
+    def update_task(self, task_id: str, **changes: Any) -> None:
+        """Change fields of an existing task in place; only ``changes`` are sent.
+
+        ``changes`` uses add_task keyword names; None clears a field. A
+        changed project_id / section_id moves the task (Sync ``item_move``),
+        since REST and the SDK can only edit a task where it is.
+        """
+        import uuid
+
+        move = {k: changes.pop(k) for k in _MOVE_FIELDS if k in changes}
+        args = _update_args(changes)
+        commands: list[Dict[str, Any]] = []
+        if args and self.backend == "sync":
+            sync_args = dict(args)
+            if "due_string" in sync_args:
+                due = sync_args.pop("due_string")
+                sync_args["due"] = None if due == "no date" else {"string": due}
+            commands.append({"type": "item_update", "uuid": str(uuid.uuid4()), "args": {"id": task_id, **sync_args}})
+        elif args and self._lib_client is not None and self._known.get("tasks") != "rest":
+            self._last_backend = "sdk"
+            try:
+                self._call_sdk(self._lib_client.update_task, task_id=task_id, **args)
+            except Exception as e:
+                raise RuntimeError(f"Todoist update_task failed: {e}") from e
+        elif args:
+            self._last_backend = "rest"
+            self._request("POST", f"/tasks/{task_id}", json=args)
+        if move.get("section_id"):
+            commands.append({"type": "item_move", "uuid": str(uuid.uuid4()), "args": {"id": task_id, "section_id": move["section_id"]}})
+        elif move.get("project_id"):
+            commands.append({"type": "item_move", "uuid": str(uuid.uuid4()), "args": {"id": task_id, "project_id": move["project_id"]}})
+        if not commands:
+            return
+        if self.backend == "sync":
+            self._last_backend = "sync"
+        status = self._sync(commands)
+        for cmd in commands:
+            result = status.get(cmd["uuid"])
+            if result != "ok":
+                code = result.get("http_code") if isinstance(result, dict) else None
+                raise TodoistError(f"Todoist {cmd['type']} failed: {result}", status=code)
+
     def list_projects(self) -> list[dict[str, str]]:
         """Return a list of projects with 'id' and 'name' keys."""
-        # Try SDK first; normalize shapes; on any issue, fall back to REST.
-        if self._lib_client is not None:
+        return list(self.iter_projects())
+
+    def iter_projects(self) -> Iterator[dict[str, str]]:
+        """Projects as {'id', 'name', 'parent_id'} dicts, fetched page by page as consumed."""
+        # Try SDK first (unless an earlier run found it unusable); on an error
+        # or an empty first page, fall back to REST.
+        if self._lib_client is not None and self._known.get("projects") != "rest":
             try:
-                raw = self._lib_client.get_projects()
-                # Normalize any iterable (e.g., ResultsPaginator) and flatten one level
-                if isinstance(raw, Iterable) and not isinstance(raw, (str, bytes, dict)):
-                    seq = list(raw)
-                else:
-                    seq = [raw]
-                flat: list[object] = []
-                for item in seq:
-                    if isinstance(item, Iterable) and not isinstance(item, (str, bytes, dict)):
-                        flat.extend(list(item))
-                    else:
-                        flat.append(item)
-
-                out: list[dict[str, str]] = []
-                for p in flat:
-                    if hasattr(p, "id") and hasattr(p, "name"):
-                        out.append({"id": str(getattr(p, "id")), "name": str(getattr(p, "name"))})
-                    elif isinstance(p, dict):
-                        pid = p.get("id")
-                        name = p.get("name")
-                        if pid and name:
-                            out.append({"id": str(pid), "name": str(name)})
-
-                log_debug(
-                    f"SDK get_projects normalized: items={len(out)} (raw_type={type(raw).__name__}, first_type={(type(flat[0]).__name__ if flat else 'none')})",
-                )
-                if out:
-                    log_debug("Todoist backend (projects): sdk")
-                    self._last_backend = "sdk"
-                    return out
-                else:
-                    log_debug("SDK get_projects returned no usable items; falling back to REST")
+                items = self._sdk_items(self._lib_client.get_projects, _PROJECT_KEYS)
+                first = next(items, None)
             except Exception as e:
                 log_debug(f"SDK get_projects error: {e}; falling back to REST")
+                first = None
+            if first is not None:
+                log_debug("Todoist backend (projects): sdk")
+                self._last_backend = "sdk"
+                self._remember(projects="sdk")
+                yield first
+                yield from items
+                return
+            log_debug("SDK get_projects returned no usable items; falling back to REST")
 
-        # REST fallback
         log_debug("Todoist backend (projects): rest")
         self._last_backend = "rest"
-        import requests  # type: ignore
-        headers = {"Authorization": f"Bearer {self.token}"}
-        resp = requests.get("https://api.todoist.com/rest/v2/projects", headers=headers, timeout=20)
-        if resp.status_code >= 400:
-            raise RuntimeError(f"Todoist API error {resp.status_code}: {resp.text}")
-        items = resp.json() or []
-        out: list[dict[str, str]] = []
-        for it in items:
-            if isinstance(it, dict):
-                pid = it.get("id")
-                name = it.get("name")
-                if pid and name:
-                    out.append({"id": str(pid), "name": str(name)})
-        return out
+        self._remember(projects="rest")
+        yield from self._rest_items("/projects", _PROJECT_KEYS)
+
+    def iter_sections(self, project_id: Optional[str] = None) -> Iterator[dict[str, str]]:
+        """Sections as {'id', 'name', 'project_id'} dicts, fetched page by page."""
+        params = {"project_id": project_id} if project_id else None
+        yield from self._rest_items("/sections", _SECTION_KEYS, params)
+
+    def iter_tasks(self, project_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Active tasks as add_task-style field dicts plus 'id', page by page."""
+        params = {"project_id": project_id} if project_id else None
+        for it in self._rest_pages("/tasks", params):
+            if isinstance(it, dict) and it.get("id"):
+                yield _task_fields(it)
+
+    def project_tree(self) -> Iterator[Dict[str, Any]]:
+        """Projects in sidebar order, each with 'depth' and its 'sections'.
+
+        Projects and sections come from one Sync API read; if that fails the
+        REST listings are used instead.
+        """
+        try:
+            resp = self._request(
+                "POST", SYNC_URL, data={"sync_token": "*", "resource_types": json.dumps(["projects", "sections"])}
+            )
+            data = resp.json() or {}
+            projects = [p for p in data.get("projects") or [] if _live(p)]
+            sections = [s for s in data.get("sections") or [] if _live(s)]
+            self._last_backend = "sync"
+        except Exception as e:
+            log_debug(f"Sync read of projects failed: {e}; using REST listings")
+            projects = list(self.iter_projects())
+            sections = list(self.iter_sections())
+
+        by_project: Dict[str, list[Dict[str, str]]] = {}
+        for sec in sorted(sections, key=lambda x: x.get("section_order") or x.get("order") or 0):
+            by_project.setdefault(str(sec.get("project_id")), []).append({"id": str(sec["id"]), "name": str(sec["name"])})
+        children: Dict[Optional[str], list[Dict[str, Any]]] = {}
+        ids = {str(p["id"]) for p in projects}
+        for proj in sorted(projects, key=lambda x: x.get("child_order") or x.get("order") or 0):
+            parent = proj.get("parent_id")
+            parent = str(parent) if parent and str(parent) in ids else None
+            children.setdefault(parent, []).append(proj)
+
+        def walk(parent: Optional[str], depth: int) -> Iterator[Dict[str, Any]]:
+            for proj in children.get(parent, []):
+                pid = str(proj["id"])
+                yield {"id": pid, "name": str(proj["name"]), "depth": depth, "sections": by_project.get(pid, [])}
+                yield from walk(pid, depth + 1)
+
+        yield from walk(None, 0)
+
+    def _sdk_items(self, fn: Any, keys: tuple[str, ...]) -> Iterator[dict[str, str]]:
+        # SDK listings are either a flat list or a paginator yielding pages
+        # (lists); walk them lazily without copying.
+        raw = self._call_sdk(fn)
+        pages = raw if isinstance(raw, Iterable) and not isinstance(raw, (str, bytes, dict)) else [raw]
+        for page in pages:
+            items = page if isinstance(page, Iterable) and not isinstance(page, (str, bytes, dict)) else [page]
+            for it in items:
+                norm = _normalize(it, keys)
+                if norm:
+                    yield norm
+
+    def _rest_items(
+        self, path: str, keys: tuple[str, ...], params: Optional[Dict[str, Any]] = None
+    ) -> Iterator[dict[str, str]]:
+        for it in self._rest_pages(path, params):
+            norm = _normalize(it, keys)
+            if norm:
+                yield norm
+
+    def _rest_pages(self, path: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        # REST v2 returns one JSON list; newer API versions return
+        # {"results": [...], "next_cursor": ...} pages. Handle both.
+        params = dict(params or {})
+        while True:
+            data = self._request("GET", path, params=params or None).json()
+            if isinstance(data, dict):
+                items, cursor = data.get("results") or [], data.get("next_cursor")
+            else:
+                items, cursor = data or [], None
+            yield from items
+            if not cursor:
+                return
+            params["cursor"] = cursor
 
     def last_backend(self) -> str:
         return self._last_backend or self._default_backend
+
+
+class ClientPool:
+    """One warm client per profile, so each account keeps its own connection
+    pool and rate limit budget however many times it is asked for."""
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, TodoistClient] = {}
+        self._lock = threading.Lock()
+
+    def get(self, profile: Optional[str] = None) -> TodoistClient:
+        name = profile or cfg.active_profile()
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = self._clients[name] = client_for_profile(name)
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+
+def client_for_profile(
+    profile: Optional[str] = None,
+    token: Optional[str] = None,
+    backend: Optional[str] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+) -> TodoistClient:
+    """New client using a profile's token and its backend / connection / rate limit settings."""
+    profile = profile or cfg.active_profile()
+    settings = cfg.profile_settings(profile)
+    kwargs: Dict[str, Any] = {}
+    for name, value in (("connect_timeout", connect_timeout), ("read_timeout", read_timeout)):
+        value = value or settings.get(name)
+        if isinstance(value, (int, float)) and value > 0:
+            kwargs[name] = float(value)
+    backend = backend or settings.get("backend")
+    if backend and backend != "auto":
+        kwargs["backend"] = backend
+    if isinstance(settings.get("max_connections"), int):
+        kwargs["max_connections"] = settings["max_connections"]
+    if isinstance(settings.get("rate_limit"), int):
+        # Requests per 15 minute window; lower it for accounts shared with other tools.
+        kwargs["limiter"] = RateLimiter(settings["rate_limit"], TODOIST_WINDOW)
+    token = token or get_token(profile)
+    if not token:
+        raise RuntimeError(
+            f"Todoist token not found for profile '{profile}'. "
+            f"Run 'gh gt auth todoist --profile {profile} --token <TOKEN> --save keychain'."
+        )
+    return TodoistClient(token=token, **kwargs)
+
+
+_POOL = ClientPool()
+
+
+def get_client(profile: Optional[str] = None) -> TodoistClient:
+    """Shared client for ``profile`` (default: the active profile)."""
+    return _POOL.get(profile)
+
+
+def is_connectivity_error(exc: BaseException) -> bool:
+    """True if ``exc`` (or its cause) means the request never reached Todoist.
+
+    Read timeouts don't count: the task may have been created anyway.
+    """
+    seen = 0
+    while exc is not None and seen < 5:
+        names = {cls.__name__ for cls in type(exc).__mro__}
+        if "ReadTimeout" in names:
+            return False
+        # requests: ConnectionError / ConnectTimeout; httpx (SDK v3+): ConnectError / ConnectTimeout.
+        if names & {"ConnectionError", "ConnectTimeout", "ConnectError"}:
+            return True
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return False
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """True for failures that say Todoist is struggling (network, timeouts, 429/5xx),
+    as opposed to a problem with one particular task."""
+    seen = 0
+    while exc is not None and seen < 5:
+        names = {cls.__name__ for cls in type(exc).__mro__}
+        if names & {"ConnectionError", "ConnectTimeout", "ConnectError", "Timeout", "TimeoutException", "TimeoutError"}:
+            return True
+        status = _status_of(exc)
+        if status is not None and (status == 429 or status >= 500):
+            return True
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return False
+
+
+def may_have_applied(exc: BaseException) -> bool:
+    """True if a failed write may still have taken effect: the request reached
+    Todoist but its answer was lost (read timeout) or was a server error.
+
+    Connection failures and 429s mean nothing was done; a retry is safe.
+    """
+    if not is_transient_error(exc) or is_connectivity_error(exc):
+        return False
+    seen = 0
+    while exc is not None and seen < 5:
+        if _status_of(exc) == 429:
+            return False
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return True
+
+
+def reachable(host: str = "api.todoist.com", port: int = 443, timeout: float = 2.0) -> bool:
+    """One quick TCP connect, used to tell "offline" from a failing request."""
+    import socket
+
+    try:
+        socket.create_connection((host, port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+_PROJECT_KEYS = ("id", "name", "parent_id")
+_SECTION_KEYS = ("id", "name", "project_id")
+
+
+def _normalize(item: Any, keys: tuple[str, ...]) -> Optional[dict[str, str]]:
+    """SDK object or REST dict → plain dict of ``keys``; None without id and name."""
+    get = item.get if isinstance(item, dict) else lambda k: getattr(item, k, None)
+    if not get("id") or not get("name"):
+        return None
+    return {k: str(get(k)) for k in keys if get(k) is not None}
+
+
+# add_task fields that can't be edited in place; changing them moves the task.
+_MOVE_FIELDS = ("project_id", "section_id")
+
+
+def diff_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """The add_task fields of ``new`` that differ from the snapshot ``old``.
+
+    Empty values compare equal to missing ones and label order is ignored.
+    A move always carries both the project and the section.
+    """
+    changes: Dict[str, Any] = {}
+    for key, value in new.items():
+        before = old.get(key)
+        if key == "labels":
+            same = sorted(before or []) == sorted(value or [])
+        else:
+            same = (before or None) == (value or None)
+        if not same:
+            changes[key] = value
+    if any(k in changes for k in _MOVE_FIELDS):
+        changes["project_id"] = new.get("project_id") or old.get("project_id")
+        changes["section_id"] = new.get("section_id")
+    return changes
+
+
+def _update_args(changes: Dict[str, Any]) -> Dict[str, Any]:
+    # Todoist ignores null in an update, so clearing needs explicit values.
+    cleared = {"description": "", "priority": 1, "due_string": "no date", "labels": []}
+    return {k: (cleared.get(k) if v is None else v) for k, v in changes.items()}
+
+
+def _task_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    """REST task JSON → add_task keyword arguments (plus 'id')."""
+    due = item.get("due") or {}
+    return {
+        "id": str(item["id"]),
+        "content": item.get("content") or "",
+        "description": item.get("description") or None,
+        "project_id": str(item["project_id"]) if item.get("project_id") else None,
+        "section_id": str(item["section_id"]) if item.get("section_id") else None,
+        # 1 is Todoist's "no priority".
+        "priority": item.get("priority") if (item.get("priority") or 1) > 1 else None,
+        "due_string": due.get("string") if isinstance(due, dict) else None,
+        "labels": list(item.get("labels") or []) or None,
+    }
+
+
+def _live(item: Any) -> bool:
+    return isinstance(item, dict) and bool(item.get("id")) and not item.get("is_deleted") and not item.get("is_archived")
+
+
+def _capabilities_path() -> str:
+    return os.path.join(cfg.cache_dir(), "backends.json")
+
+
+def _capabilities() -> Dict[str, Any]:
+    return cfg.read_json(_capabilities_path())
+
+
+def _sdk_version() -> str:
+    # Reads package metadata only; much cheaper than importing the SDK.
+    from importlib import metadata
+
+    try:
+        return metadata.version("todoist-api-python")
+    except metadata.PackageNotFoundError:
+        return "none"
+
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    """HTTP status of an error: TodoistError.status, or the response of an
+    httpx / requests status error raised by the SDK."""
+    status = getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status
+    code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _retry_after(resp: Any) -> float:
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After", "")))
+    except (TypeError, ValueError):
+        return 1.0
@@ -3,7 +3,13 @@ import re
 import shlex
 import subprocess
 import sys
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, TypeVar, Union
+
+
+# Keyword arguments for @dataclass giving instances __slots__ (Python 3.10+),
+# so records kept alive by large imports don't each carry a __dict__.
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 def is_ci() -> bool:
@@ -30,6 +36,15 @@ def strip_markdown(md: str) -> str:
     return text.strip()
 
 
+def truncate_utf8(text: str, max_bytes: int, marker: str = "…") -> str:
+    # Cut to at most max_bytes of UTF-8 without splitting a character.
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text
+    room = max(0, max_bytes - len(marker.encode("utf-8")))
+    return data[:room].decode("utf-8", errors="ignore").rstrip() + marker
+
+
 def open_url(url: str) -> None:
     try:
         if sys.platform == "darwin":
@@ -42,7 +57,43 @@ def open_url(url: str) -> None:
         pass
 
 
-def run_gh(args: list[str]) -> subprocess.CompletedProcess:
+# Seconds a single gh invocation may run before it is killed.
+GH_TIMEOUT = 120.0
+_gh_timeout: Optional[float] = GH_TIMEOUT
+
+
+def set_gh_timeout(seconds: Optional[float]) -> None:
+    """Set the gh timeout for later run_gh calls; 0 or None disables it."""
+    global _gh_timeout
+    _gh_timeout = seconds if seconds and seconds > 0 else None
+
+
+def run_gh(args: list[str], *, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
     cmd = ["gh", *args]
     log_debug("Running: " + shlex.join(cmd))
-    return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    limit = timeout or _gh_timeout
+    try:
+        return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=limit)
+    except subprocess.TimeoutExpired:
+        # Same shape as any other gh failure, so callers report it per issue.
+        return subprocess.CompletedProcess(cmd, 124, "", f"gh {args[0] if args else ''} timed out after {limit:g}s")
+
+
+_T = TypeVar("_T")
+
+
+def run_gh_many(
+    arg_lists: Sequence[list[str]],
+    *,
+    jobs: int = 4,
+    run: Optional[Callable[[list[str]], _T]] = None,
+) -> list[Union[_T, subprocess.CompletedProcess]]:
+    """Run several gh invocations with up to ``jobs`` in flight; results in input order.
+
+    ``run`` replaces run_gh for each call, e.g. to add retries or parse the output.
+    """
+    run = run or run_gh  # type: ignore[assignment]
+    if jobs <= 1 or len(arg_lists) <= 1:
+        return [run(args) for args in arg_lists]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(arg_lists))) as pool:
+        return list(pool.map(run, arg_lists))
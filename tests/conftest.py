@@ -12,7 +12,11 @@ if str(_src) not in sys.path:
 
 
 @pytest.fixture(autouse=True)
-def _set_env_token(monkeypatch):
+def _set_env_token(monkeypatch, tmp_path):
+    # Keep config and cache files out of the real home directory
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
     # Ensure no interactive prompts during tests
     monkeypatch.setenv("TODOIST_API_TOKEN", "test-token")
     # Force keyring to a null backend to avoid touching real keychain
@@ -22,6 +26,12 @@ def _set_env_token(monkeypatch):
     # Avoid CI guard interfering with save_token during unit tests
     monkeypatch.delenv("CI", raising=False)
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    monkeypatch.delenv("GH_GT_PROFILE", raising=False)
+    import gt.config as cfg
+    import gt.metrics as metrics
+
+    cfg.set_active_profile(None)
+    metrics.REGISTRY.reset()
 
 
 class Completed:
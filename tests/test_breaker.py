@@ -0,0 +1,50 @@
+import pytest
+
+from gt.breaker import CircuitBreaker, CircuitOpen
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_after_threshold_consecutive_failures():
+    br = CircuitBreaker(threshold=3, cooldown=10, clock=Clock())
+    for _ in range(2):
+        br.check()
+        br.failure(TimeoutError("slow"))
+    br.success()
+    for _ in range(3):
+        br.check()
+        br.failure(TimeoutError("slow"))
+    assert br.is_open
+    with pytest.raises(CircuitOpen, match="3 consecutive failures"):
+        br.check()
+
+
+def test_half_open_trial_closes_or_reopens():
+    clock = Clock()
+    br = CircuitBreaker(threshold=1, cooldown=10, clock=clock)
+    br.failure(ConnectionError("down"))
+    clock.now = 10
+    br.check()  # the trial call
+    with pytest.raises(CircuitOpen):
+        br.check()  # others keep failing fast while it runs
+    br.failure(ConnectionError("still down"))
+    with pytest.raises(CircuitOpen):
+        br.check()
+    clock.now = 20
+    br.check()
+    br.success()
+    assert not br.is_open
+    br.check()
+
+
+def test_zero_threshold_disables():
+    br = CircuitBreaker(threshold=0)
+    for _ in range(50):
+        br.failure(TimeoutError())
+    br.check()
@@ -4,6 +4,20 @@ import sys
 import gt.cli as cli
 
 
+def batched(fetch):
+    # Adapt a per-issue fake to the batched gh.fetch_issues(repo, numbers) shape
+    def fetch_issues(repo, numbers, **kw):
+        out = {}
+        for n in numbers:
+            try:
+                out[n] = fetch(repo, n)
+            except Exception as e:
+                out[n] = e
+        return out
+
+    return fetch_issues
+
+
 class Issue:
     def __init__(self, number=1, title="T", body="B", html_url="http://i", labels=None):
         self.number = number
@@ -18,7 +32,7 @@ def test_cli_creates_task_with_repo(monkeypatch, capsys):
     import gt.github as gh
 
     monkeypatch.setattr(gh, "resolve_repo", lambda repo: repo or "alice/proj")
-    monkeypatch.setattr(gh, "fetch_issue", lambda repo, n: Issue(number=n, title="Title", body="Body", html_url="http://i"))
+    monkeypatch.setattr(gh, "fetch_issues", batched(lambda repo, n: Issue(number=n, title="Title", body="Body", html_url="http://i")))
 
     # Mock Todoist
     import gt.todoist as td
@@ -45,7 +59,7 @@ def test_cli_creates_multiple_tasks(monkeypatch, capsys):
     import gt.github as gh
 
     monkeypatch.setattr(gh, "resolve_repo", lambda repo: repo or "alice/proj")
-    monkeypatch.setattr(gh, "fetch_issue", lambda repo, n: Issue(number=n, title=f"Title {n}", body="Body", html_url=f"http://i/{n}"))
+    monkeypatch.setattr(gh, "fetch_issues", batched(lambda repo, n: Issue(number=n, title=f"Title {n}", body="Body", html_url=f"http://i/{n}")))
 
     # Mock Todoist with counter
     import gt.todoist as td
@@ -86,8 +100,11 @@ def test_config_project_interactive(monkeypatch, capsys, tmp_path):
         def __init__(self, token=None):
             pass
 
-        def list_projects(self):
-            return [{"id": "p1", "name": "Inbox"}, {"id": "p2", "name": "Work"}]
+        def project_tree(self):
+            return iter([
+                {"id": "p1", "name": "Inbox", "depth": 0, "sections": []},
+                {"id": "p2", "name": "Work", "depth": 0, "sections": []},
+            ])
 
         def last_backend(self):
             return "sdk"
@@ -111,13 +128,15 @@ def test_cli_main_labels_and_strip_and_open(monkeypatch, capsys):
     monkeypatch.setattr(gh, "resolve_repo", lambda repo: repo or "alice/proj")
     monkeypatch.setattr(
         gh,
-        "fetch_issue",
-        lambda repo, n: Issue(
-            number=n,
-            title="Title",
-            body="Some `code`\n```\nblock\n```",
-            html_url="http://i",
-            labels=["bug", "p1"],
+        "fetch_issues",
+        batched(
+            lambda repo, n: Issue(
+                number=n,
+                title="Title",
+                body="Some `code`\n```\nblock\n```",
+                html_url="http://i",
+                labels=["bug", "p1"],
+            )
         ),
     )
 
@@ -161,7 +180,7 @@ def test_cli_fetch_issue_error(monkeypatch, capsys):
     def boom(*a, **k):
         raise RuntimeError("fail")
 
-    monkeypatch.setattr(gh, "fetch_issue", boom)
+    monkeypatch.setattr(gh, "fetch_issues", batched(boom))
 
     rc = cli.main(["1"])
     out = capsys.readouterr()
@@ -237,11 +256,528 @@ def test_config_project_no_items(monkeypatch, capsys):
         def last_backend(self):
             return "rest"
 
-        def list_projects(self):
-            return []
+        def project_tree(self):
+            return iter([])
 
     monkeypatch.setattr(td, "TodoistClient", lambda *a, **k: DummyClient())
     rc = cli.run_config_project_interactive(clear=False, show_backend=True)
     out = capsys.readouterr()
     assert rc == 1
     assert "Using Todoist rest" in out.err
+
+
+def test_cli_resume_skips_created_issues(monkeypatch, capsys, tmp_path):
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(gh, "resolve_repo", lambda repo: repo or "alice/proj")
+    fetched = []
+
+    def fetch(repo, n):
+        fetched.append(n)
+        if n == 3 and len(fetched) == 3:
+            raise KeyboardInterrupt
+        return Issue(number=n, title=f"Title {n}", html_url=f"http://i/{n}")
+
+    monkeypatch.setattr(gh, "fetch_issues", batched(fetch))
+
+    created = []
+
+    class DummyClient:
+        def __init__(self, token=None):
+            pass
+
+        def add_task(self, **kwargs):
+            created.append(kwargs["content"])
+            return td.TodoistTask(id=f"t{len(created)}", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+
+    path = tmp_path / "run.journal"
+    args = ["1", "2", "3", "4", "--repo", "alice/proj", "--batch-size", "2", "--journal", str(path)]
+    rc = cli.main(args)
+    err = capsys.readouterr().err
+    assert rc == 130
+    assert f"--resume {path}" in err
+    assert created == ["#1 Title 1", "#2 Title 2"]
+
+    # Resume without repeating the numbers: only 3 and 4 are fetched and created
+    fetched.clear()
+    rc = cli.main(["--resume", str(path)])
+    assert rc == 0
+    assert fetched == [3, 4]
+    assert created == ["#1 Title 1", "#2 Title 2", "#3 Title 3", "#4 Title 4"]
+
+
+def test_cli_resume_does_not_resend_after_read_timeout(monkeypatch, capsys, tmp_path):
+    import requests  # type: ignore
+
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(
+        gh, "fetch_issues", batched(lambda repo, n: Issue(number=n, title=f"T{n}", html_url=f"http://i/{n}"))
+    )
+    created = []
+
+    class DummyClient:
+        def __init__(self, token=None, **kw):
+            pass
+
+        def add_task(self, **kwargs):
+            # Todoist creates the task, but the answer never arrives.
+            created.append(kwargs["content"])
+            if len(created) == 1:
+                raise requests.exceptions.ReadTimeout("read timed out")
+            return td.TodoistTask(id=f"t{len(created)}", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+
+    path = tmp_path / "run.journal"
+    rc = cli.main(["1", "2", "--repo", "a/b", "--journal", str(path)])
+    assert rc == cli.EXIT_PARTIAL
+    assert "may have reached Todoist" in capsys.readouterr().err
+
+    rc = cli.main(["--resume", str(path)])
+    assert created == ["#1 T1", "#2 T2"]
+    assert "interrupted while submitting" in capsys.readouterr().err
+
+
+def test_cli_partial_failure_continues(monkeypatch, capsys, tmp_path):
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(gh, "resolve_repo", lambda repo: repo or "alice/proj")
+
+    def fetch(repo, n):
+        if n == 2:
+            raise RuntimeError("HTTP 404: Not Found")
+        return Issue(number=n, title=f"Title {n}", html_url=f"http://i/{n}")
+
+    monkeypatch.setattr(gh, "fetch_issues", batched(fetch))
+
+    class DummyClient:
+        def __init__(self, token=None):
+            pass
+
+        def add_task(self, **kwargs):
+            return td.TodoistTask(id="t", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+
+    failed = tmp_path / "failed.txt"
+    rc = cli.main(["1", "2", "3", "--repo", "alice/proj", "--failures-out", str(failed)])
+    out = capsys.readouterr()
+    assert rc == cli.EXIT_PARTIAL
+    assert out.out.count("created:") == 2
+    assert "Summary: 2 created, 1 failed, 0 skipped" in out.err
+    assert "alice/proj#2  HTTP 404: Not Found" in out.err
+    assert failed.read_text(encoding="utf-8") == "alice/proj#2\n"
+
+
+def test_cli_reads_issues_from_stdin(monkeypatch, capsys):
+    import io
+
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(gh, "resolve_repo", lambda repo: repo or "alice/proj")
+    fetched = []
+
+    def fetch(repo, n):
+        fetched.append((repo, n))
+        return Issue(number=n, title=f"Title {n}", html_url=f"http://i/{n}")
+
+    monkeypatch.setattr(gh, "fetch_issues", batched(fetch))
+
+    class DummyClient:
+        def __init__(self, token=None):
+            pass
+
+        def add_task(self, **kwargs):
+            return td.TodoistTask(id="t", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+    stdin = "7\n\n# comment\nbob/lib#8\nhttps://github.com/carol/app/issues/9\nnot-an-issue\n"
+    monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+
+    rc = cli.main(["--from-file", "-"])
+    out = capsys.readouterr()
+    assert fetched == [("alice/proj", 7), ("bob/lib", 8), ("carol/app", 9)]
+    assert out.out.count("created:") == 3
+    assert rc == cli.EXIT_PARTIAL
+    assert "not-an-issue" in out.err
+
+
+def test_cli_requires_some_input(capsys):
+    import pytest
+
+    with pytest.raises(SystemExit):
+        cli.main([])
+
+
+def test_cli_export_to_stdout_rejects_jsonl_output(capsys):
+    import pytest
+
+    with pytest.raises(SystemExit):
+        cli.main(["export", "a/b#1", "-o", "-", "--output", "jsonl"])
+    assert "--output jsonl" in capsys.readouterr().err
+
+
+def test_cli_groups_issues_per_repo(monkeypatch, capsys):
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(gh, "resolve_repo", lambda repo: "alice/proj")
+    calls = []
+
+    def fetch_issues(repo, numbers, **kw):
+        calls.append((repo, list(numbers)))
+        return {n: Issue(number=n, title=f"{repo} {n}", html_url=f"http://i/{n}") for n in numbers}
+
+    monkeypatch.setattr(gh, "fetch_issues", fetch_issues)
+    clients = []
+
+    class DummyClient:
+        def __init__(self, token=None):
+            clients.append(self)
+
+        def add_task(self, **kwargs):
+            return td.TodoistTask(id="t", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+
+    rc = cli.main(["1", "bob/lib#2", "https://github.com/alice/proj/issues/3", "bob/lib#4", "--jobs", "3"])
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert sorted(calls) == [("alice/proj", [1, 3]), ("bob/lib", [2, 4])]
+    assert len(clients) == 1
+    lines = [ln for ln in out.splitlines() if ln.startswith("created:")]
+    assert lines == [
+        "created: t - #1 alice/proj 1",
+        "created: t - #2 bob/lib 2",
+        "created: t - #3 alice/proj 3",
+        "created: t - #4 bob/lib 4",
+    ]
+
+    # By default a window holds one GraphQL chunk per job, so one repository's chunks can run in parallel.
+    calls.clear()
+    assert cli.main([f"alice/proj#{n}" for n in range(1, 121)] + ["--jobs", "2"]) == 0
+    assert [len(numbers) for _, numbers in calls] == [100, 20]
+
+
+def test_cli_jsonl_output(monkeypatch, capsys):
+    import json
+
+    import gt.github as gh
+    import gt.todoist as td
+
+    def fetch(repo, n):
+        if n == 2:
+            raise RuntimeError("not found")
+        return Issue(number=n, title="T", html_url=f"http://i/{n}")
+
+    monkeypatch.setattr(gh, "fetch_issues", batched(fetch))
+
+    class DummyClient:
+        def __init__(self, token=None):
+            pass
+
+        def add_task(self, **kwargs):
+            return td.TodoistTask(id="t1", content=kwargs["content"], url="http://t/1")
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+
+    rc = cli.main(["alice/proj#1", "alice/proj#2", "--output", "jsonl"])
+    out = capsys.readouterr().out
+    recs = [json.loads(line) for line in out.splitlines()]
+    assert rc == cli.EXIT_PARTIAL
+    assert recs[0]["status"] == "created"
+    assert recs[0]["repo"] == "alice/proj" and recs[0]["number"] == 1
+    assert recs[0]["task_id"] == "t1" and recs[0]["url"] == "http://t/1"
+    assert recs[0]["backend"] == "rest" and recs[0]["latency_ms"] >= 0
+    assert recs[1]["status"] == "failed" and recs[1]["detail"] == "not found"
+    assert "created:" not in out
+
+
+def test_cli_dry_run_plans_without_todoist(monkeypatch, capsys):
+    import json
+
+    import gt.config as cfg
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(
+        gh,
+        "fetch_issues",
+        batched(lambda repo, n: Issue(number=n, title="T", body="**bold**", html_url=f"http://i/{n}", labels=["bug"])),
+    )
+
+    def no_client(*a, **k):
+        raise AssertionError("dry run must not build a Todoist client")
+
+    monkeypatch.setattr(td, "TodoistClient", no_client)
+
+    rc = cli.main(["alice/proj#1", "alice/proj#2", "--dry-run", "--strip-markdown", "--labels-as-tags", "--priority", "4"])
+    out = capsys.readouterr()
+    assert rc == 0
+    payloads = [json.loads(line) for line in out.out.splitlines() if line.startswith("{")]
+    assert payloads[0] == {"content": "#1 T", "description": "bold\n\nhttp://i/1", "priority": 4, "labels": ["bug"]}
+    assert len(payloads) == 2
+    assert "Plan: 2 task(s) from 1 repositories" in out.err
+    assert "GitHub requests: 1" in out.err
+    assert "Todoist requests: 2" in out.err
+
+    assert cli.main(["alice/proj#1", "--dry-run", "--output", "jsonl"]) == 0
+    rec = json.loads(capsys.readouterr().out)
+    assert rec["status"] == "planned"
+    assert rec["payload"] == {"content": "#1 T", "description": "**bold**\n\nhttp://i/1"}
+
+    # The estimate follows the backend the run would use, including the profile's.
+    cfg.update_profile(lambda data: data.__setitem__("backend", "sync"))
+    assert cli.main(["alice/proj#1", "alice/proj#2", "--dry-run"]) == 0
+    assert "Todoist requests: 1 (Sync API" in capsys.readouterr().err
+
+
+def test_cli_applies_label_rules(monkeypatch, capsys, tmp_path):
+    import json
+
+    import gt.config as cfg
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(cfg, "_config_path", lambda: str(tmp_path / "config.json"))
+    (tmp_path / "rules.json").write_text(
+        json.dumps({"labels": {"P0": {"priority": 4}, "area/db": {"section_id": "s-db"}}}), encoding="utf-8"
+    )
+    labels = {1: ["P0", "area/db"], 2: ["docs"]}
+    monkeypatch.setattr(
+        gh, "fetch_issues", batched(lambda repo, n: Issue(number=n, title="T", html_url="http://i", labels=labels[n]))
+    )
+    sent = {}
+
+    class DummyClient:
+        def __init__(self, token=None):
+            pass
+
+        def add_task(self, **kwargs):
+            sent[kwargs["content"]] = kwargs
+            return td.TodoistTask(id="t", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+
+    rc = cli.main(["a/b#1", "a/b#2", "--priority", "1", "--section-id", "s-default"])
+    assert rc == 0
+    assert sent["#1 T"]["priority"] == 4 and sent["#1 T"]["section_id"] == "s-db"
+    assert sent["#2 T"]["priority"] == 1 and sent["#2 T"]["section_id"] == "s-default"
+
+    rc = cli.main(["a/b#1", "--no-rules"])
+    assert rc == 0
+    assert sent["#1 T"]["priority"] is None
+
+
+def test_cli_profile_selects_token_and_project(monkeypatch, capsys):
+    import gt.config as cfg
+    import gt.github as gh
+    import gt.todoist as td
+
+    cfg.update_config(
+        lambda d: d.update(profiles={"work": {"todoist_token": "work-token", "default_project_id": "pw", "jobs": 2}})
+    )
+    monkeypatch.setattr(gh, "fetch_issues", batched(lambda repo, n: Issue(number=n, title="T", body="", html_url="u")))
+    seen = {}
+
+    class DummyClient:
+        def __init__(self, token=None):
+            seen["token"] = token
+
+        def add_task(self, **kwargs):
+            seen["project_id"] = kwargs["project_id"]
+            return td.TodoistTask(id="t1", content=kwargs["content"], url="http://t")
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.delenv("TODOIST_API_TOKEN", raising=False)
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+    rc = cli.main(["a/b#1", "--profile", "work"])
+    assert rc == 0
+    assert seen == {"token": "work-token", "project_id": "pw"}
+
+
+def test_cli_auth_show_with_profile(capsys):
+    rc = cli.main(["auth", "show", "--profile", "work"])
+    assert rc == 0
+    assert capsys.readouterr().out.startswith("profile=work, env=unset")
+
+
+def test_config_project_selects_section(monkeypatch, capsys):
+    import builtins
+    import gt.config as cfg
+    import gt.todoist as td
+
+    class DummyClient:
+        def project_tree(self):
+            yield {"id": "p1", "name": "Work", "depth": 0, "sections": [{"id": "s1", "name": "Backlog"}]}
+            yield {"id": "p2", "name": "Ops", "depth": 1, "sections": []}
+
+        def last_backend(self):
+            return "sync"
+
+    monkeypatch.setattr(td, "TodoistClient", lambda *a, **k: DummyClient())
+    monkeypatch.setattr(builtins, "input", lambda *a, **k: "2")
+    assert cli.run_config_project_interactive(clear=False) == 0
+    out = capsys.readouterr().out
+    assert "  2.   / Backlog (s1)" in out and "  3.   Ops (p2)" in out
+    assert cfg.get_default_project_id() == "p1" and cfg.get_default_section_id() == "s1"
+
+    cfg.set_default_project_id("p2")
+    assert cfg.get_default_section_id() is None
+
+
+def test_config_project_filters_and_uses_cached_index(monkeypatch, capsys):
+    import builtins
+    import gt.config as cfg
+    import gt.todoist as td
+
+    fetches = []
+
+    class DummyClient:
+        def project_tree(self):
+            fetches.append(1)
+            yield {"id": "p1", "name": "Inbox", "depth": 0, "sections": []}
+            yield {"id": "p2", "name": "Release Train", "depth": 0, "sections": []}
+
+        def last_backend(self):
+            return "sync"
+
+    monkeypatch.setattr(td, "TodoistClient", lambda *a, **k: DummyClient())
+    answers = iter(["rel", "2"])
+    monkeypatch.setattr(builtins, "input", lambda *a, **k: next(answers))
+    assert cli.main(["config", "project"]) == 0
+    out = capsys.readouterr().out
+    assert out.count("  2. Release Train (p2)") == 2  # full list, then the filtered one
+    assert cfg.get_default_project_id() == "p2"
+
+    monkeypatch.setattr(builtins, "input", lambda *a, **k: "1")
+    assert cli.main(["config", "project", "-v"]) == 0
+    assert "Using cached project index" in capsys.readouterr().err
+    assert len(fetches) == 1
+
+
+def test_cli_flush_reports_empty_and_offline(monkeypatch, capsys):
+    import gt.store as st
+    import gt.todoist as td
+
+    assert cli.main(["flush"]) == 0
+    assert "outbox is empty" in capsys.readouterr().out
+
+    store = st.Store()
+    store.enqueue("a/b", 1, {"content": "#1 T"})
+    store.close()
+    monkeypatch.setattr(td, "reachable", lambda: False)
+    assert cli.main(["flush"]) == 1
+    assert "1 task(s) still queued" in capsys.readouterr().err
+
+
+def test_cli_export_then_submit_gzip(monkeypatch, capsys, tmp_path):
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(
+        gh,
+        "fetch_issues",
+        batched(
+            lambda repo, n: Issue(
+                number=n, title=f"T{n}", html_url=f"https://github.com/{repo}/issues/{n}", labels=["bug", "docs"]
+            )
+        ),
+    )
+    out = str(tmp_path / "tasks.ndjson.gz")
+    assert cli.main(["export", "a/b#1", "a/b#2", "--priority", "3", "--labels-as-tags", "-o", out]) == 0
+    assert "Exported 2 task(s)" in capsys.readouterr().err
+
+    sent = []
+    label_requests = []
+
+    class DummyClient:
+        token = "x"
+
+        def __init__(self, token=None):
+            pass
+
+        def list_labels(self):
+            return ["Bug"]
+
+        def create_labels(self, names):
+            label_requests.append(sorted(names))
+            return names
+
+        def add_task(self, **kwargs):
+            sent.append(kwargs)
+            return td.TodoistTask(id=f"t{len(sent)}", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+    monkeypatch.setenv("TODOIST_API_TOKEN", "x")
+    assert cli.main(["submit", out]) == 0
+    assert [s["content"] for s in sent] == ["#1 T1", "#2 T2"] and sent[0]["priority"] == 3
+    # Missing labels are created together up front, existing ones keep their spelling.
+    assert label_requests == [["docs"]]
+    assert sent[0]["labels"] == ["Bug", "docs"]
+    # Submitting the same file again creates nothing new.
+    assert cli.main(["submit", out]) == 0
+    assert len(sent) == 2
+    assert capsys.readouterr().err.count("already created") == 2
+    # The exported content hashes were recorded, so a sync run sees the issues as unchanged.
+    assert cli.main(["a/b#1", "a/b#2", "--priority", "3", "--labels-as-tags", "--skip-unchanged", "-v"]) == 0
+    assert len(sent) == 2
+    assert capsys.readouterr().err.count("unchanged: a/b#") == 2
+
+
+def test_cli_writes_metrics_file(monkeypatch, tmp_path):
+    import gt.github as gh
+    import gt.todoist as td
+
+    monkeypatch.setattr(gh, "fetch_issues", batched(lambda repo, n: Issue(number=n, html_url=f"https://x/{n}")))
+
+    class DummyClient:
+        def __init__(self, token=None):
+            pass
+
+        def add_task(self, **kwargs):
+            return td.TodoistTask(id="t1", content=kwargs["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    monkeypatch.setattr(td, "TodoistClient", DummyClient)
+    path = tmp_path / "gh-gt.prom"
+    assert cli.main(["a/b#1", "a/b#2", "--metrics-file", str(path)]) == 0
+    text = path.read_text(encoding="utf-8")
+    assert 'gh_gt_outcomes_total{backend="rest",status="created"} 2' in text
+    assert "gh_gt_issues_fetched_total 2" in text
+    assert 'gh_gt_phase_seconds_count{phase="send"} 2' in text
@@ -0,0 +1,85 @@
+import json
+import threading
+
+import gt.config as cfg
+import gt.keychain as kc
+
+
+def test_save_token_keeps_other_settings(monkeypatch, tmp_path):
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(cfg, "_config_path", lambda: str(path))
+    cfg.set_default_project_id("p1")
+
+    ok, _ = kc.save_token("tok", where="file")
+    assert ok
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data == {"default_project_id": "p1", "todoist_token": "tok"}
+
+    msgs = kc.unset_token()
+    assert "deleted token from config file" in msgs
+    assert cfg.read_config() == {"default_project_id": "p1"}
+
+
+def test_read_config_cache_sees_external_writes(monkeypatch, tmp_path):
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(cfg, "_config_path", lambda: str(path))
+    cfg.write_config({"a": 1})
+    first = cfg.read_config()
+    first["mutated"] = True  # callers get a copy
+    assert cfg.read_config() == {"a": 1}
+
+    path.write_text(json.dumps({"a": 2, "pad": "changed size"}), encoding="utf-8")
+    assert cfg.read_config()["a"] == 2
+
+
+def test_concurrent_updates_are_merged(tmp_path):
+    path = str(tmp_path / "config.json")
+
+    def worker(i):
+        for j in range(20):
+            cfg.update_json(path, lambda d, k=f"k{i}_{j}": d.__setitem__(k, j))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    data = json.loads(open(path, encoding="utf-8").read())
+    assert len(data) == 80
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".tmp-")]
+
+
+def test_named_profile_settings_and_token(monkeypatch):
+    monkeypatch.delenv("TODOIST_API_TOKEN", raising=False)
+    monkeypatch.setitem(__import__("sys").modules, "keyring", None)
+    cfg.set_default_project_id("p-default")
+    cfg.set_default_project_id("p-work", profile="work")
+    ok, _ = kc.save_token("work-token", where="file", profile="work")
+    assert ok
+
+    assert cfg.list_profiles() == ["default", "work"]
+    assert cfg.get_default_project_id() == "p-default"
+    assert kc.get_token() is None
+    cfg.set_active_profile("work")
+    assert cfg.get_default_project_id() == "p-work"
+    assert kc.get_token() == "work-token"
+    assert kc.show_status().startswith("profile=work, env=unset")
+
+    monkeypatch.setenv("TODOIST_API_TOKEN_WORK", "env-token")
+    assert kc.get_token() == "env-token"
+
+    assert "deleted token from config file" in kc.unset_token()
+    assert cfg.read_config()["profiles"] == {"work": {"default_project_id": "p-work"}}
+
+
+def test_client_pool_reuses_client_per_profile(monkeypatch):
+    import gt.todoist as td
+
+    cfg.update_config(lambda d: d.update(profiles={"work": {"todoist_token": "w", "rate_limit": 30}}))
+    pool = td.ClientPool()
+    work = pool.get("work")
+    assert pool.get("work") is work
+    assert work.token == "w"
+    assert work.limiter.capacity == 30
+    default = pool.get()
+    assert default is not work and default.token == "test-token"
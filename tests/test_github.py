@@ -62,3 +62,131 @@ def test_fetch_issue_errors(monkeypatch, completed):
         assert False
     except RuntimeError as e:
         assert "missing" in str(e)
+
+
+def test_parse_issue_ref_forms():
+    assert gh.parse_issue_ref("12") == gh.IssueRef(repo=None, number=12)
+    assert gh.parse_issue_ref("#12") == gh.IssueRef(repo=None, number=12)
+    assert gh.parse_issue_ref("alice/proj#3") == gh.IssueRef(repo="alice/proj", number=3)
+    url = "https://github.com/alice/proj.js/issues/4#issuecomment-1"
+    assert gh.parse_issue_ref(url) == gh.IssueRef(repo="alice/proj.js", number=4)
+    try:
+        gh.parse_issue_ref("alice/proj")
+        assert False
+    except ValueError as e:
+        assert "alice/proj" in str(e)
+
+
+def test_fetch_issues_batched_graphql(monkeypatch, completed):
+    calls = []
+
+    def fake_run(args):
+        calls.append(args)
+        data = {
+            "data": {
+                "repository": {
+                    "i1": {"number": 1, "title": "One", "body": "b", "url": "https://x/1", "labels": {"nodes": [{"name": "bug"}]}},
+                    "i2": None,
+                }
+            },
+            "errors": [{"path": ["repository", "i2"], "message": "Could not resolve to an issue with the number of 2."}],
+        }
+        return completed(stdout=json.dumps(data), stderr="gh: GraphQL error", returncode=1)
+
+    monkeypatch.setattr(gh, "run_gh", fake_run)
+    out = gh.fetch_issues("alice/proj", [1, 2])
+    assert len(calls) == 1
+    assert "owner=alice" in calls[0] and "name=proj" in calls[0]
+    assert out[1].title == "One" and out[1].labels == ["bug"]
+    assert isinstance(out[2], RuntimeError) and "number of 2" in str(out[2])
+
+
+def test_fetch_issues_repo_error(monkeypatch, completed):
+    data = {"data": {"repository": None}, "errors": [{"message": "Could not resolve to a Repository"}]}
+    monkeypatch.setattr(gh, "run_gh", lambda args: completed(stdout=json.dumps(data), returncode=1))
+    out = gh.fetch_issues("alice/missing", [1, 2])
+    assert all("Could not resolve" in str(e) for e in out.values())
+
+
+def test_fetch_issues_with_comments_and_prs(monkeypatch, completed):
+    queries = []
+
+    def fake_run(args):
+        queries.append(next(a for a in args if a.startswith("query=")))
+        node = {
+            "number": 7,
+            "title": "T",
+            "body": "",
+            "url": "https://x/7",
+            "labels": {"nodes": []},
+            "comments": {"nodes": [{"author": {"login": "bob"}, "body": "lgtm", "createdAt": "2024-05-01T10:00:00Z"}]},
+            "timelineItems": {
+                "nodes": [
+                    {"source": {"number": 9, "title": "Fix", "url": "https://x/pull/9", "state": "MERGED"}},
+                    {"source": {}},
+                    {"subject": {"number": 9, "title": "Fix", "url": "https://x/pull/9", "state": "MERGED"}},
+                ]
+            },
+        }
+        return completed(stdout=json.dumps({"data": {"repository": {"i7": node}}}))
+
+    monkeypatch.setattr(gh, "run_gh", fake_run)
+    issue = gh.fetch_issues("a/b", [7], comments=3, linked_prs=True)[7]
+    assert "comments(last: 3)" in queries[0] and "CROSS_REFERENCED_EVENT" in queries[0]
+    assert issue.comments == [gh.Comment(author="bob", body="lgtm", created_at="2024-05-01T10:00:00Z")]
+    assert [pr.number for pr in issue.linked_prs] == [9]
+
+
+def test_fetch_issues_tracks_budget_and_retries_rate_limits(monkeypatch, completed):
+    from gt.ratelimit import GitHubBudget
+
+    node = {"number": 1, "title": "One", "body": "", "url": "https://x/1", "labels": {"nodes": []}}
+    ok = {"data": {"rateLimit": {"cost": 1, "remaining": 4200, "limit": 5000, "resetAt": "2030-01-01T00:00:00Z"}, "repository": {"i1": node}}}
+    replies = [
+        completed(stderr="gh: You have exceeded a secondary rate limit.", returncode=1),
+        completed(stdout=json.dumps(ok)),
+    ]
+    queries = []
+
+    def fake_run(args):
+        queries.append(next(a for a in args if a.startswith("query=")))
+        return replies.pop(0)
+
+    slept = []
+    budget = GitHubBudget(sleep=slept.append)
+    monkeypatch.setattr(gh, "run_gh", fake_run)
+    out = gh.fetch_issues("a/b", [1], budget=budget)
+    assert out[1].title == "One"
+    assert "rateLimit { cost remaining limit resetAt }" in queries[0]
+    assert slept == [60.0]
+    assert (budget.used, budget.remaining, budget.limit) == (1, 4200, 5000)
+    assert budget.reset_at == 1893456000.0
+
+
+def test_fetch_issues_runs_batches_concurrently(monkeypatch, completed):
+    import re
+    import threading
+    import time
+
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def fake_run(args):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.02)
+        query = next(a for a in args if a.startswith("query="))
+        nodes = {
+            f"i{n}": {"number": n, "title": f"T{n}", "body": "", "url": f"https://x/{n}", "labels": {"nodes": []}}
+            for n in map(int, re.findall(r"i(\d+):", query))
+        }
+        with lock:
+            active[0] -= 1
+        return completed(stdout=json.dumps({"data": {"repository": nodes}}))
+
+    monkeypatch.setattr(gh, "run_gh", fake_run)
+    numbers = list(range(1, 4 * gh.GRAPHQL_BATCH + 1))
+    out = gh.fetch_issues("a/b", numbers, jobs=4)
+    assert list(out) == numbers and all(out[n].title == f"T{n}" for n in numbers)
+    assert active[1] > 1
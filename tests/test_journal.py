@@ -0,0 +1,55 @@
+import json
+
+import gt.journal as jr
+
+
+def test_journal_roundtrip(tmp_path):
+    path = tmp_path / "run.journal"
+    j = jr.Journal(str(path), sync_every=2)
+    j.start(repo="alice/proj", numbers=[1, 2, 3])
+    j.record("alice/proj", 1, jr.FETCHED)
+    j.record("alice/proj", 1, jr.SUBMITTED)
+    j.record("alice/proj", 1, jr.CREATED, task_id="t1")
+    j.record("alice/proj", 2, jr.FETCHED)
+    j.close()
+
+    state = jr.load(str(path))
+    assert state.header["numbers"] == [1, 2, 3]
+    assert state.state_of("alice/proj", 1) == jr.CREATED
+    assert state.task_id_of("alice/proj", 1) == "t1"
+    assert state.state_of("alice/proj", 2) == jr.FETCHED
+    assert state.state_of("alice/proj", 3) is None
+
+
+def test_journal_ignores_torn_last_line(tmp_path):
+    path = tmp_path / "run.journal"
+    rec = {"repo": "a/b", "number": 5, "state": "created", "task_id": "t5"}
+    path.write_text(json.dumps(rec) + "\n" + '{"repo": "a/b", "num', encoding="utf-8")
+    state = jr.load(str(path))
+    assert state.state_of("a/b", 5) == jr.CREATED
+
+
+def test_journal_first_header_wins(tmp_path):
+    path = tmp_path / "run.journal"
+    j = jr.Journal(str(path))
+    j.start(repo="a/b", numbers=[1, 2])
+    j.close()
+    j = jr.Journal(str(path))
+    j.start(repo="a/b", numbers=[2], resumed=True)
+    j.close()
+    assert jr.load(str(path)).header["numbers"] == [1, 2]
+
+
+def test_record_many_syncs_a_submitted_batch_once(monkeypatch, tmp_path):
+    syncs = []
+    monkeypatch.setattr(jr.os, "fsync", lambda fd: syncs.append(fd))
+    path = tmp_path / "run.journal"
+    j = jr.Journal(str(path))
+    j.record_many([("a/b", n) for n in range(100)], jr.SUBMITTED)
+    assert len(syncs) == 1
+    j.record_many([("a/b", n) for n in range(10)], jr.FAILED)
+    assert len(syncs) == 1
+    j.close()
+
+    state = jr.load(str(path))
+    assert state.state_of("a/b", 5) == jr.FAILED and state.state_of("a/b", 50) == jr.SUBMITTED
@@ -0,0 +1,50 @@
+import gt.labels as lb
+
+
+class FakeClient:
+    token = "tok"
+
+    def __init__(self, existing):
+        self.existing = list(existing)
+        self.list_calls = 0
+        self.create_calls = []
+
+    def list_labels(self):
+        self.list_calls += 1
+        return list(self.existing)
+
+    def create_labels(self, names):
+        self.create_calls.append(list(names))
+        self.existing.extend(names)
+        return list(names)
+
+
+def test_normalize_labels_aliases_and_dupes():
+    aliases = {"type: bug": "bug"}
+    assert lb.normalize_labels(["Type:  Bug", "bug", " area/db ", "BUG"], aliases) == ["bug", "area/db"]
+    assert lb.normalize_labels([]) == []
+
+
+def test_ensure_creates_missing_in_one_call(tmp_path):
+    client = FakeClient(["Bug"])
+    sync = lb.LabelSync(client, cache_path=str(tmp_path / "labels.json"))
+    mapping = sync.ensure({"bug", "area/db", "docs"})
+    # Existing label keeps its Todoist spelling; the rest are created together
+    assert mapping["bug"] == "Bug"
+    assert len(client.create_calls) == 1
+    assert sorted(client.create_calls[0]) == ["area/db", "docs"]
+
+    # Known labels don't trigger more calls
+    sync.ensure({"docs", "BUG"})
+    assert len(client.create_calls) == 1
+    assert client.list_calls == 1
+
+
+def test_label_cache_is_reused(tmp_path):
+    path = str(tmp_path / "labels.json")
+    lb.LabelSync(FakeClient(["bug"]), cache_path=path).ensure({"bug"})
+
+    client = FakeClient(["bug"])
+    lb.LabelSync(client, cache_path=path).ensure({"bug"})
+    assert client.list_calls == 0
+    assert client.create_calls == []
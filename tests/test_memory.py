@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+resource = pytest.importorskip("resource")
+
+ISSUES = 50_000
+# Peak RSS budget for the whole interpreter, in MiB. Memory must stay flat in
+# the number of issues: a run that kept every issue or task alive would
+# need several times this.
+BUDGET_MB = 80
+
+_SCRIPT = textwrap.dedent(
+    """
+    import resource
+    import sys
+
+    import gt.cli as cli
+    import gt.github as gh
+    import gt.todoist as td
+
+    LABELS = ["bug", "enhancement", "area/db", "P1"]
+
+    def fetch_issues(repo, numbers, **kwargs):
+        return {
+            n: gh.Issue(
+                number=n,
+                title=f"Synthetic issue {n}",
+                body=("Steps to reproduce\\n" + "lorem ipsum dolor sit amet " * 40) + str(n),
+                html_url=f"https://github.com/{repo}/issues/{n}",
+                labels=[str(l) for l in LABELS],
+            )
+            for n in numbers
+        }
+
+    class Client:
+        def __init__(self, token=None):
+            pass
+
+        def add_task(self, **fields):
+            return td.TodoistTask(id=fields["content"].split()[0][1:], content=fields["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    gh.fetch_issues = fetch_issues
+    td.TodoistClient = Client
+    rc = cli.main(["--from-file", sys.argv[1], "--output", "jsonl", "--no-rules"])
+    print(rc, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)
+    """
+)
+
+
+def test_large_import_peak_rss_stays_under_budget(tmp_path):
+    refs = tmp_path / "issues.txt"
+    refs.write_text("".join(f"bench/repo#{n}\n" for n in range(1, ISSUES + 1)), encoding="utf-8")
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[1] / "src"))
+    proc = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, str(refs)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+        timeout=300,
+    )
+    rc, maxrss = proc.stderr.split()[-2:]
+    assert rc == "0", proc.stderr
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak_mb = int(maxrss) / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    assert peak_mb < BUDGET_MB, f"peak RSS {peak_mb:.0f} MiB over {BUDGET_MB} MiB budget"
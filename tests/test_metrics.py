@@ -0,0 +1,45 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+import gt.metrics as metrics
+
+
+def test_render_counters_and_histograms():
+    reg = metrics.Registry()
+    reg.describe("jobs_total", "counter", "Jobs done")
+    reg.inc("jobs_total", status="ok")
+    reg.inc("jobs_total", 2, status="ok")
+    reg.inc("jobs_total", status='say "hi"')
+    reg.observe("wait_seconds", 0.02, phase="send")
+    reg.observe("wait_seconds", 60, phase="send")
+    text = reg.render()
+    assert "# HELP jobs_total Jobs done\n# TYPE jobs_total counter\n" in text
+    assert 'jobs_total{status="ok"} 3\n' in text
+    assert 'jobs_total{status="say \\"hi\\""} 1\n' in text
+    assert 'wait_seconds_bucket{phase="send",le="0.01"} 0\n' in text
+    assert 'wait_seconds_bucket{phase="send",le="0.025"} 1\n' in text
+    assert 'wait_seconds_bucket{phase="send",le="+Inf"} 2\n' in text
+    assert 'wait_seconds_count{phase="send"} 2\n' in text
+    assert reg.value("jobs_total", status="ok") == 3
+
+
+def test_serve_and_textfile(tmp_path):
+    reg = metrics.Registry()
+    reg.inc("up_total")
+    server = metrics.serve(0, registry=reg)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(base + "/metrics") as resp:
+            assert resp.headers["Content-Type"] == metrics.CONTENT_TYPE
+            assert b"up_total 1" in resp.read()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(base + "/")
+    finally:
+        server.shutdown()
+    path = tmp_path / "gh-gt.prom"
+    metrics.write_textfile(str(path), reg)
+    assert path.read_text(encoding="utf-8") == reg.render()
+    assert metrics.parse_listen("9100") == ("127.0.0.1", 9100)
+    assert metrics.parse_listen("0.0.0.0:9100") == ("0.0.0.0", 9100)
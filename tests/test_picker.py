@@ -0,0 +1,64 @@
+import time
+
+import gt.picker as pk
+
+
+def tree(n=3):
+    return [
+        {"id": "w", "name": "Work", "depth": 0, "sections": [{"id": "s1", "name": "Backlog"}]},
+        {"id": "c", "name": "Client Launch", "depth": 1, "sections": []},
+        {"id": "h", "name": "Home", "depth": 0, "sections": []},
+        {"id": "x", "name": "Wobbly Bills", "depth": 0, "sections": []},
+    ][:n + 1]
+
+
+def test_fuzzy_ranking_prefers_word_starts():
+    index = pk.ProjectIndex(pk.entries_from_tree(tree()))
+    hits = index.search("wb")
+    assert [(e.project_id, e.section_id) for e in hits][:2] == [("w", "s1"), ("x", None)]
+    assert [e.project_id for e in index.search("work launch")] == ["c"]
+    assert index.search("zzz") == [] and index.count() == 0
+
+
+def test_incremental_search_matches_full_rescan():
+    entries = pk.entries_from_tree(tree())
+    index = pk.ProjectIndex(entries)
+    for q in ["w", "wo", "wor", "w", "h", "ho"]:
+        assert index.search(q) == pk.ProjectIndex(entries).search(q)
+
+
+def test_keystroke_search_is_fast_on_thousands_of_projects():
+    words = ["alpha", "work", "ops", "backlog", "release", "design", "infra", "roadmap"]
+    big = [
+        {
+            "id": str(i),
+            "name": f"{words[i % 8]} {words[(i // 8) % 8]} {i}",
+            "depth": 0,
+            "sections": [{"id": f"s{i}", "name": words[(i // 64) % 8]}],
+        }
+        for i in range(3000)
+    ]
+    index = pk.ProjectIndex(pk.entries_from_tree(big))
+    worst = 0.0
+    for q in ["r", "re", "rel", "rele", "relea", "release", "releasew", "releasewo"]:
+        started = time.perf_counter()
+        index.search(q)
+        worst = max(worst, time.perf_counter() - started)
+    # Well under one 60 Hz frame on a developer machine; loose for slow CI.
+    assert worst < 0.05
+
+
+def test_load_index_uses_cache_until_refresh(tmp_path):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return iter(tree())
+
+    path = str(tmp_path / "projects.json")
+    first = pk.load_index(fetch, "tok", cache_path=path)
+    assert pk.load_index(fetch, "tok", cache_path=path) == first
+    assert len(calls) == 1
+    pk.load_index(fetch, "other", cache_path=path)
+    pk.load_index(fetch, "tok", cache_path=path, refresh=True)
+    assert len(calls) == 3
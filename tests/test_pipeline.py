@@ -0,0 +1,419 @@
+import gt.github as gh
+import gt.pipeline as pl
+
+
+def make_issue(**kw):
+    base = dict(number=1, title="T", body="Body", html_url="https://x/1", labels=[])
+    base.update(kw)
+    return gh.Issue(**base)
+
+
+def test_build_task_fields_defaults():
+    fields = pl.build_task_fields(make_issue(), pl.ImportOptions(project_id="p", priority=2))
+    assert fields["content"] == "#1 T"
+    assert fields["description"] == "Body\n\nhttps://x/1"
+    assert fields["project_id"] == "p" and fields["priority"] == 2
+    assert fields["labels"] is None
+
+
+def test_rule_project_drops_the_runs_section():
+    import gt.rules as rs
+
+    rules = rs.compile_rules({"labels": {"ops": {"project_id": "ops"}, "db": {"section_id": "s-db"}}})
+    opts = pl.ImportOptions(project_id="p", section_id="s-default", rules=rules)
+    fields = pl.build_task_fields(make_issue(labels=["ops"]), opts)
+    assert fields["project_id"] == "ops" and fields["section_id"] is None
+    fields = pl.build_task_fields(make_issue(labels=["ops", "db"]), opts)
+    assert fields["project_id"] == "ops" and fields["section_id"] == "s-db"
+    fields = pl.build_task_fields(make_issue(labels=["other"]), opts)
+    assert fields["project_id"] == "p" and fields["section_id"] == "s-default"
+
+
+def test_build_task_fields_extras_within_budget():
+    issue = make_issue(
+        comments=[gh.Comment(author="bob", body="x" * 500, created_at="2024-05-01T10:00:00Z")],
+        linked_prs=[gh.LinkedPR(number=9, title="Fix", url="https://x/pull/9", state="MERGED")],
+    )
+    opts = pl.ImportOptions(include_comments=5, include_linked_prs=True, extra_bytes=120)
+    desc = pl.build_task_fields(issue, opts)["description"]
+    assert desc.startswith("Body\n\nLinked PRs:\n- #9 Fix (merged) https://x/pull/9")
+    assert desc.endswith("\n\nhttps://x/1")
+    extra = desc[len("Body\n\n") : -len("\n\nhttps://x/1")]
+    assert len(extra.encode("utf-8")) <= 120
+
+    # Not requested → not rendered, even if fetched
+    assert pl.build_task_fields(issue, pl.ImportOptions())["description"] == "Body\n\nhttps://x/1"
+
+
+def test_importer_batches_creates_for_sync_backend(monkeypatch, tmp_path):
+    import gt.journal as jr
+    import gt.todoist as td
+
+    monkeypatch.setattr(
+        gh, "fetch_issues", lambda repo, numbers, **kw: {n: make_issue(number=n, html_url=f"u{n}") for n in numbers}
+    )
+
+    class SyncClient:
+        backend = "sync"
+        calls = []
+
+        def add_tasks(self, batch):
+            self.calls.append([f["content"] for f in batch])
+            return [
+                RuntimeError("boom") if "#2 " in f["content"] else td.TodoistTask(id=f["content"][:2], content=f["content"])
+                for f in batch
+            ]
+
+    syncs = []
+    monkeypatch.setattr(jr.os, "fsync", lambda fd: syncs.append(fd))
+    journal = jr.Journal(str(tmp_path / "j.jsonl"))
+    importer = pl.Importer(SyncClient(), pl.ImportOptions(), default_repo=lambda: "a/b", journal=journal)
+    outcomes = list(importer.run(["1", "2", "3"]))
+    # One fsync for the window's "submitted" records, not one per task.
+    assert len(syncs) == 1
+    journal.close()
+    assert SyncClient.calls == [["#1 T", "#2 T", "#3 T"]]
+    assert [(o.number, o.status, o.backend) for o in outcomes] == [
+        (1, pl.CREATED, "sync"),
+        (2, pl.FAILED, None),
+        (3, pl.CREATED, "sync"),
+    ]
+    state = jr.load(str(tmp_path / "j.jsonl"))
+    assert state.state_of("a/b", 2) == jr.FAILED and state.task_id_of("a/b", 3) == "#3"
+
+
+def test_importer_queues_when_todoist_unreachable(monkeypatch, tmp_path):
+    import requests  # type: ignore
+
+    import gt.store as st
+    import gt.todoist as td
+
+    monkeypatch.setattr(
+        gh, "fetch_issues", lambda repo, numbers, **kw: {n: make_issue(number=n, html_url=f"u{n}") for n in numbers}
+    )
+    checks = []
+    monkeypatch.setattr(td, "reachable", lambda: checks.append(1) or False)
+    sends = []
+
+    class OfflineClient:
+        def add_task(self, **fields):
+            sends.append(fields["content"])
+            raise requests.exceptions.ConnectionError("no route to host")
+
+        def last_backend(self):
+            return "rest"
+
+    store = st.Store(str(tmp_path / "s.db"))
+    importer = pl.Importer(OfflineClient(), pl.ImportOptions(), default_repo=lambda: "a/b", jobs=1, store=store)
+    outcomes = list(importer.run(["1", "2", "3"]))
+    assert [o.status for o in outcomes] == [pl.QUEUED] * 3
+    assert len(sends) == 1 and len(checks) == 1
+    assert [i.number for i in store.pending()] == [1, 2, 3]
+
+    class OnlineClient:
+        def __init__(self):
+            self.n = 0
+
+        def add_task(self, **fields):
+            self.n += 1
+            return td.TodoistTask(id=f"t{self.n}", content=fields["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    store.record_task("a/b", 2, "t-existing")
+    flushed = list(pl.flush_outbox(OnlineClient(), store))
+    assert [(o.number, o.status) for o in flushed] == [(2, pl.SKIPPED), (1, pl.CREATED), (3, pl.CREATED)]
+    assert store.pending_count() == 0 and store.task_for("a/b", 3) == "t2"
+
+
+def test_importer_fails_fast_once_breaker_opens(monkeypatch):
+    import gt.breaker as br
+    import gt.todoist as td
+
+    monkeypatch.setattr(
+        gh, "fetch_issues", lambda repo, numbers, **kw: {n: make_issue(number=n, html_url=f"u{n}") for n in numbers}
+    )
+    sends = []
+
+    class FlakyClient:
+        def add_task(self, **fields):
+            sends.append(fields["content"])
+            raise td.TodoistError("Todoist API error 503: unavailable", status=503)
+
+        def last_backend(self):
+            return "rest"
+
+    importer = pl.Importer(
+        FlakyClient(),
+        pl.ImportOptions(),
+        default_repo=lambda: "a/b",
+        jobs=1,
+        breaker=br.CircuitBreaker(threshold=2, cooldown=60),
+    )
+    outcomes = list(importer.run(["1", "2", "3", "4"]))
+    assert [o.status for o in outcomes] == [pl.FAILED] * 4
+    assert len(sends) == 2
+    assert "consecutive failures" in outcomes[3].detail
+
+
+def test_upsert_updates_changed_fields_only(monkeypatch, tmp_path):
+    import gt.store as st
+    import gt.todoist as td
+
+    titles = {1: "One", 2: "Two", 3: "Three"}
+    monkeypatch.setattr(
+        gh,
+        "fetch_issues",
+        lambda repo, numbers, **kw: {
+            n: make_issue(number=n, title=titles[n], html_url=f"https://github.com/a/b/issues/{n}") for n in numbers
+        },
+    )
+
+    class Client:
+        def __init__(self):
+            self.added, self.updated = [], []
+
+        def add_task(self, **fields):
+            self.added.append(fields["content"])
+            return td.TodoistTask(id=f"t{len(self.added)}", content=fields["content"])
+
+        def update_task(self, task_id, **changes):
+            self.updated.append((task_id, changes))
+
+        def iter_tasks(self):
+            # Task 3 predates the local mapping; found by its issue URL.
+            yield {"id": "old3", "content": "#3 Three", "description": "Body\n\nhttps://github.com/a/b/issues/3"}
+
+        def last_backend(self):
+            return "rest"
+
+    store = st.Store(str(tmp_path / "s.db"))
+    client = Client()
+    first = list(pl.Importer(client, pl.ImportOptions(), default_repo=lambda: "a/b", jobs=1, store=store).run(["1", "2"]))
+    assert [o.status for o in first] == [pl.CREATED, pl.CREATED]
+
+    titles[2] = "Two (renamed)"
+    importer = pl.Importer(client, pl.ImportOptions(), default_repo=lambda: "a/b", jobs=1, store=store, upsert=True)
+    second = list(importer.run(["1", "2", "3"]))
+    assert [o.status for o in second] == [pl.UNCHANGED, pl.UPDATED, pl.UNCHANGED]
+    assert client.updated == [("t2", {"content": "#2 Two (renamed)"})]
+    assert len(client.added) == 2
+    assert store.task_for("a/b", 3) == "old3"
+
+
+def test_update_refused_by_an_open_breaker_is_journaled_failed(monkeypatch, tmp_path):
+    import gt.breaker as br
+    import gt.journal as jr
+    import gt.store as st
+
+    monkeypatch.setattr(gh, "fetch_issues", lambda repo, numbers, **kw: {n: make_issue(number=n) for n in numbers})
+    store = st.Store(str(tmp_path / "s.db"))
+    store.record_task("a/b", 1, "t1", {"content": "#1 Old"})
+    breaker = br.CircuitBreaker(threshold=1, cooldown=60)
+    breaker.failure(RuntimeError("Todoist API error 503"))
+    path = str(tmp_path / "j.jsonl")
+    journal = jr.Journal(path)
+    importer = pl.Importer(
+        object(), pl.ImportOptions(), default_repo=lambda: "a/b", journal=journal, store=store, breaker=breaker, upsert=True
+    )
+    outcomes = list(importer.run(["1"]))
+    journal.close()
+    assert [o.status for o in outcomes] == [pl.FAILED]
+    assert jr.load(path).state_of("a/b", 1) == jr.FAILED
+    store.close()
+
+
+def test_skip_unchanged_short_circuits_before_building(monkeypatch, tmp_path):
+    import gt.store as st
+    import gt.todoist as td
+
+    bodies = {1: "one", 2: "two"}
+    monkeypatch.setattr(
+        gh, "fetch_issues", lambda repo, numbers, **kw: {n: make_issue(number=n, body=bodies[n]) for n in numbers}
+    )
+    built = []
+    real_build = pl.build_task_fields
+    monkeypatch.setattr(pl, "build_task_fields", lambda issue, opts: built.append(issue.number) or real_build(issue, opts))
+
+    class Client:
+        def add_task(self, **fields):
+            return td.TodoistTask(id=fields["content"].split()[0], content=fields["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    store = st.Store(str(tmp_path / "s.db"))
+    run = lambda opts: list(  # noqa: E731
+        pl.Importer(Client(), opts, default_repo=lambda: "a/b", jobs=1, store=store, skip_unchanged=True).run(["1", "2"])
+    )
+    assert [o.status for o in run(pl.ImportOptions())] == [pl.CREATED, pl.CREATED]
+    bodies[2] = "two, edited"
+    built.clear()
+    # A changed issue that already has a task is left alone without --upsert, never duplicated.
+    outcomes = run(pl.ImportOptions())
+    assert [o.status for o in outcomes] == [pl.UNCHANGED, pl.SKIPPED]
+    assert "use --upsert" in outcomes[1].detail
+    assert built == []
+    # Different options (or rules) change what the task would look like.
+    assert [o.status for o in run(pl.ImportOptions(priority=4))] == [pl.SKIPPED, pl.SKIPPED]
+
+
+def test_flush_records_the_queued_content_hash(tmp_path):
+    import gt.store as st
+    import gt.todoist as td
+
+    class Client:
+        def add_task(self, **fields):
+            return td.TodoistTask(id="t1", content=fields["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    store = st.Store(str(tmp_path / "s.db"), profile="default")
+    store.enqueue("a/b", 1, {"content": "#1 T"}, "h1")
+    assert [o.status for o in pl.flush_outbox(Client(), store)] == [pl.CREATED]
+    assert store.mapped("a/b", [1, 2]) == {1: ("t1", "h1")}
+    store.close()
+
+
+def test_submit_maps_each_task_as_soon_as_it_is_created(tmp_path):
+    import pytest
+
+    import gt.store as st
+    import gt.todoist as td
+
+    sent = []
+
+    class Client:
+        def add_task(self, **fields):
+            if len(sent) == 2:
+                raise KeyboardInterrupt
+            sent.append(fields["content"])
+            return td.TodoistTask(id=f"t{len(sent)}", content=fields["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    store = st.Store(str(tmp_path / "s.db"), profile="default")
+    records = [("a/b", n, {"content": f"#{n}"}, None) for n in range(1, 5)]
+    with pytest.raises(KeyboardInterrupt):
+        list(pl.submit_tasks(Client(), records, store=store, jobs=1))
+    assert store.task_for("a/b", 1) == "t1" and store.task_for("a/b", 2) == "t2"
+
+    # Running the same submit again only sends what wasn't created.
+    sent.clear()
+    outcomes = list(pl.submit_tasks(Client(), records, store=store, jobs=1))
+    assert [o.status for o in outcomes] == [pl.SKIPPED, pl.SKIPPED, pl.CREATED, pl.CREATED]
+    assert sent == ["#3", "#4"]
+    store.close()
+
+
+def test_slow_stdin_is_processed_as_it_arrives(monkeypatch):
+    import io
+    import os
+    import sys
+    import threading
+
+    import gt.cli as cli
+
+    monkeypatch.setattr(gh, "fetch_issues", lambda repo, numbers, **kw: {n: make_issue(number=n) for n in numbers})
+    r, w = os.pipe()
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.FileIO(r, "r")))
+    ended = []
+
+    def end():
+        if not ended:
+            ended.append(True)
+            os.close(w)
+
+    # Ends the input if the run waits for a full window instead.
+    watchdog = threading.Timer(5, end)
+    watchdog.start()
+    try:
+        importer = pl.Importer(None, pl.ImportOptions(), default_repo=lambda: "a/b", dry_run=True, input_wait=0.05)
+        outcomes = importer.run(cli._iter_input_lines("-"))
+        os.write(w, b"1\n2\n")
+        assert [next(outcomes).ref, next(outcomes).ref] == ["a/b#1", "a/b#2"]
+        assert watchdog.is_alive()
+        os.write(w, b"3\n")
+        assert next(outcomes).ref == "a/b#3"
+    finally:
+        watchdog.cancel()
+        end()
+    assert list(outcomes) == []
+
+
+def test_submit_keeps_sends_that_may_have_created_a_task(tmp_path):
+    import requests  # type: ignore
+
+    import gt.store as st
+    import gt.todoist as td
+
+    sent = []
+    timeouts = ["#1"]
+
+    class Client:
+        def add_task(self, **fields):
+            sent.append(fields["content"])
+            if fields["content"] in timeouts:
+                timeouts.remove(fields["content"])
+                raise requests.exceptions.ReadTimeout("read timed out")
+            return td.TodoistTask(id=f"t{len(sent)}", content=fields["content"])
+
+        def last_backend(self):
+            return "rest"
+
+    store = st.Store(str(tmp_path / "s.db"), profile="default")
+    records = [("a/b", n, {"content": f"#{n}"}, None) for n in (1, 2)]
+    first = list(pl.submit_tasks(Client(), records, store=store, jobs=1))
+    assert [o.status for o in first] == [pl.FAILED, pl.CREATED]
+    assert "check there before retrying" in first[0].detail
+
+    # Submitting again does not send it a second time...
+    sent.clear()
+    again = list(pl.submit_tasks(Client(), records, store=store, jobs=1))
+    assert [o.status for o in again] == [pl.SKIPPED, pl.SKIPPED]
+    assert "--retry-unconfirmed" in again[0].detail and sent == []
+
+    # ...unless asked to, after which it is mapped like any other task.
+    retried = list(pl.submit_tasks(Client(), records, store=store, jobs=1, retry_unconfirmed=True))
+    assert [o.status for o in retried] == [pl.CREATED, pl.SKIPPED]
+    assert store.unconfirmed_for("a/b", 1) is None and store.task_for("a/b", 1)
+    store.close()
+
+
+def test_duplicates_are_skipped_across_windows_within_a_bounded_history(monkeypatch):
+    monkeypatch.setattr(gh, "fetch_issues", lambda repo, numbers, **kw: {n: make_issue(number=n) for n in numbers})
+    monkeypatch.setattr(pl, "DEDUPE_WINDOW", 3)
+    importer = pl.Importer(None, pl.ImportOptions(), default_repo=lambda: "a/b", batch_size=2, dry_run=True)
+    outcomes = list(importer.run(["1", "2", "3", "1", "4", "5", "1"]))
+    # The first repeat is in a later window but still remembered; the last one has aged out.
+    assert [o.status for o in outcomes] == [pl.PLANNED] * 3 + [pl.SKIPPED] + [pl.PLANNED] * 3
+    assert len(importer._recent) == 3
+
+
+def test_flush_drops_items_that_may_have_been_created(tmp_path):
+    import requests  # type: ignore
+
+    import gt.store as st
+    import gt.todoist as td
+
+    class Client:
+        def add_task(self, **fields):
+            if fields["content"] == "#1 T":
+                raise requests.exceptions.ReadTimeout("read timed out")
+            raise td.TodoistError("bad request", status=400)
+
+        def last_backend(self):
+            return "rest"
+
+    store = st.Store(str(tmp_path / "s.db"), profile="default")
+    store.enqueue("a/b", 1, {"content": "#1 T"})
+    store.enqueue("a/b", 2, {"content": "#2 T"})
+    outcomes = list(pl.flush_outbox(Client(), store))
+    assert [o.status for o in outcomes] == [pl.FAILED, pl.FAILED]
+    assert "may have reached Todoist" in outcomes[0].detail
+    # Only the certain failure stays queued for the next flush.
+    assert [(it.number, it.attempts) for it in store.pending()] == [(2, 1)]
+    store.close()
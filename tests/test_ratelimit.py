@@ -0,0 +1,59 @@
+import pytest
+
+from gt.ratelimit import GitHubBudget, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_burst_then_paced():
+    clock = FakeClock()
+    lim = RateLimiter(3, 3.0, clock=clock, sleep=clock.sleep)
+    assert [lim.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Fourth request waits for one token at 1 token/second
+    assert lim.acquire() == 1.0
+    assert clock.slept == [1.0]
+
+
+def test_penalize_backs_off_everyone():
+    clock = FakeClock()
+    lim = RateLimiter(10, 10.0, clock=clock, sleep=clock.sleep)
+    lim.penalize(5.0)
+    assert lim.acquire() == 5.0
+
+
+def test_github_budget_throttles_as_it_drains():
+    clock = FakeClock()
+    budget = GitHubBudget(max_concurrency=8, clock=clock, sleep=clock.sleep)
+    assert budget.concurrency() == 8
+    budget.update(cost=1, remaining=3000, limit=5000, reset_at=3600)
+    assert budget.concurrency() == 8
+    budget.update(cost=1, remaining=1000, limit=5000, reset_at=3600)
+    assert budget.concurrency() == 3
+    budget.update(cost=1, remaining=100, limit=5000, reset_at=3600)
+    assert budget.concurrency() == 1
+    # Below the 10% reserve the next request waits for the reset.
+    with budget.slot():
+        pass
+    assert clock.slept == [3600]
+    assert budget.used == 3
+
+
+def test_github_budget_cap():
+    budget = GitHubBudget(max_points=2)
+    budget.update(cost=1, remaining=4999, limit=5000, reset_at=None)
+    with budget.slot():
+        budget.update(cost=1, remaining=4998, limit=5000, reset_at=None)
+    with pytest.raises(RuntimeError, match="budget for this run"):
+        with budget.slot():
+            pass
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+import gt.rules as rs
+
+
+def test_compile_and_apply_precedence():
+    rules = rs.compile_rules(
+        {
+            "labels": {
+                "P0": {"priority": 4, "labels": ["urgent"]},
+                "area/db": {"section_id": "s-db", "priority": 2, "labels": ["db"]},
+            }
+        }
+    )
+    # First rule in the file wins for scalars; labels accumulate; case-insensitive
+    assert rules.apply(["area/db", "p0", "other"]) == {
+        "priority": 4,
+        "labels": ["urgent", "db"],
+        "section_id": "s-db",
+    }
+    assert rules.apply(["other"]) == {}
+
+
+def test_compile_rejects_bad_rules():
+    with pytest.raises(ValueError, match="unknown field"):
+        rs.compile_rules({"labels": {"P0": {"prio": 4}}})
+    with pytest.raises(ValueError, match="priority must be 1-4"):
+        rs.compile_rules({"labels": {"P0": {"priority": 9}}})
+    with pytest.raises(ValueError, match="section_id must be str"):
+        rs.compile_rules({"labels": {"x": {"section_id": 1}}})
+
+
+def test_version_tracks_content():
+    a = rs.compile_rules({"labels": {"P0": {"priority": 4}}})
+    b = rs.compile_rules({"labels": {"P0": {"priority": 3}}})
+    assert a.version and a.version != b.version
+
+
+def test_load_rules(tmp_path):
+    assert rs.load_rules(str(tmp_path / "missing.json")) is None
+    with pytest.raises(RuntimeError, match="not found"):
+        rs.load_rules(str(tmp_path / "missing.json"), required=True)
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"labels": {"bug": {"due": "today"}}}), encoding="utf-8")
+    assert rs.load_rules(str(path)).apply(["bug"]) == {"due": "today"}
@@ -0,0 +1,53 @@
+import gt.store as st
+
+
+def test_outbox_roundtrip_and_mapping(tmp_path):
+    store = st.Store(str(tmp_path / "s.db"), profile="default")
+    store.enqueue("a/b", 1, {"content": "#1 T"})
+    store.enqueue("a/b", 2, {"content": "#2 T"})
+    store.enqueue("a/b", 1, {"content": "#1 T (again)"})
+    items = store.pending()
+    assert [(i.number, i.fields["content"]) for i in items] == [(1, "#1 T (again)"), (2, "#2 T")]
+    assert store.pending(after=items[0].id)[0].number == 2
+
+    store.mark_failed(items[1].id, "boom")
+    assert store.pending()[1].attempts == 1
+    store.remove(items[0].id)
+    assert store.pending_count() == 1
+
+    store.record_task("a/b", 1, "t1")
+    assert store.task_for("a/b", 1) == "t1" and store.task_for("a/b", 2) is None
+    store.close()
+
+    # Profiles don't see each other's state.
+    other = st.Store(str(tmp_path / "s.db"), profile="work")
+    assert other.pending_count() == 0 and other.task_for("a/b", 1) is None
+    other.close()
+
+
+def test_snapshots_and_upgrade_of_older_database(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "s.db")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE tasks (profile TEXT NOT NULL, repo TEXT NOT NULL, number INTEGER NOT NULL,"
+        " task_id TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (profile, repo, number))"
+    )
+    db.execute("INSERT INTO tasks VALUES ('default', 'a/b', 1, 't1', 0)")
+    db.execute(
+        "CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, profile TEXT NOT NULL, repo TEXT NOT NULL,"
+        " number INTEGER NOT NULL, fields TEXT NOT NULL, queued_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+        " last_error TEXT, UNIQUE (profile, repo, number))"
+    )
+    db.commit()
+    db.close()
+
+    store = st.Store(path, profile="default")
+    assert store.snapshot_for("a/b", 1) == ("t1", None)
+    store.record_task("a/b", 2, "t2", {"content": "#2 T", "labels": ["bug"]})
+    assert store.snapshot_for("a/b", 2) == ("t2", {"content": "#2 T", "labels": ["bug"]})
+    assert store.snapshot_for("a/b", 3) is None
+    store.enqueue("a/b", 4, {"content": "#4 T"}, "h4")
+    assert store.pending()[0].content_hash == "h4"
+    store.close()
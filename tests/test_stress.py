@@ -0,0 +1,202 @@
+"""Concurrency stress harness for the bulk import path.
+
+Runs ``cli.main`` end to end, with the REST and the Sync backend, against
+in-process GitHub and Todoist stand-ins that answer with random latency (so
+concurrent requests finish out of order), GitHub secondary rate limits,
+Todoist 429s, 5xx errors, dropped connections and lost responses (the task
+is created but the answer never arrives). Checks that output order matches
+input order, that no issue ever gets two tasks, and that resuming / flushing
+leaves every issue with its task or reported for review.
+
+Set GH_GT_BENCH_OUT to a file path to append throughput figures to it.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+
+import pytest
+
+import gt.cli as cli
+import gt.config as cfg
+import gt.github as gh
+import gt.journal as jr
+import gt.ratelimit as rl
+import gt.store as st
+import gt.todoist as td
+
+requests = pytest.importorskip("requests")
+
+REPOS = ("acme/api", "acme/web", "acme/cli")
+ISSUES_PER_REPO = 120
+
+
+class FakeGitHub:
+    def __init__(self, rng, lock):
+        self.rng = rng
+        self.lock = lock
+        self.calls = 0
+
+    def run_gh(self, args, **kw):
+        with self.lock:
+            self.calls += 1
+            delay = self.rng.uniform(0, 0.01)
+            limited = self.rng.random() < 0.05
+        time.sleep(delay)
+        if limited:
+            return _Completed(stderr="gh: You have exceeded a secondary rate limit.", returncode=1)
+        query = next(a for a in args if a.startswith("query="))
+        repo = next(a for a in args if a.startswith("owner="))[6:] + "/" + next(a for a in args if a.startswith("name="))[5:]
+        nodes = {}
+        numbers = [int(n) for n in re.findall(r"i(\d+):", query)]
+        with self.lock:
+            self.rng.shuffle(numbers)
+        for n in numbers:
+            nodes[f"i{n}"] = {
+                "number": n,
+                "title": f"{repo} issue {n}",
+                "body": "body " * 20,
+                "url": f"https://github.com/{repo}/issues/{n}",
+                "labels": {"nodes": [{"name": "bug"}]},
+            }
+        return _Completed(stdout=json.dumps({"data": {"repository": nodes}}))
+
+
+class FakeTodoist:
+    def __init__(self, rng, lock):
+        self.rng = rng
+        self.lock = lock
+        self.tasks: dict[str, list[str]] = {}
+        self.requests = 0
+        self.lost = 0
+
+    def request(self, session, method, url, **kw):
+        with self.lock:
+            self.requests += 1
+            delay = self.rng.uniform(0, 0.005)
+            roll = self.rng.random()
+        time.sleep(delay)
+        if roll < 0.02:
+            raise requests.exceptions.ConnectionError("connection reset by peer")
+        if roll < 0.08:
+            return _Resp(429, {"error": "too many requests"}, {"Retry-After": "0"})
+        if roll < 0.10:
+            return _Resp(503, {"error": "unavailable"})
+        assert method == "POST"
+        if url == td.SYNC_URL:
+            commands = json.loads(kw["data"]["commands"])
+            ids = {cmd["temp_id"]: self._add(cmd["args"]["content"]) for cmd in commands}
+            body = {"sync_status": {cmd["uuid"]: "ok" for cmd in commands}, "temp_id_mapping": ids}
+        else:
+            assert url.endswith("/tasks")
+            content = kw["json"]["content"]
+            task_id = self._add(content)
+            body = {"id": task_id, "content": content, "url": f"https://todoist/{task_id}"}
+        with self.lock:
+            # Written on the server, but the answer is lost on the way back
+            # (always for the first write, so every run meets the case).
+            lost = roll < 0.13 or not self.lost
+            self.lost += lost
+        if lost:
+            raise requests.exceptions.ReadTimeout("read timed out")
+        return _Resp(200, body)
+
+    def _add(self, content):
+        with self.lock:
+            task_id = f"t{sum(len(v) for v in self.tasks.values()) + 1}"
+            self.tasks.setdefault(content, []).append(task_id)
+        return task_id
+
+
+class _Completed:
+    def __init__(self, stdout="", stderr="", returncode=0):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = returncode
+
+
+class _Resp:
+    def __init__(self, status_code, data, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+        self.text = json.dumps(data)
+
+    def json(self):
+        return self._data
+
+
+def _key(ref):
+    repo, _, number = ref.partition("#")
+    return repo, int(number)
+
+
+def _content(ref):
+    repo, number = _key(ref)
+    return f"#{number} {repo} issue {number}"
+
+
+@pytest.mark.parametrize("backend,seed", [("rest", 1), ("rest", 2), ("sync", 3)])
+def test_concurrent_import_is_exactly_once_and_ordered(monkeypatch, capsys, tmp_path, backend, seed):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    github, todoist = FakeGitHub(rng, lock), FakeTodoist(rng, lock)
+    monkeypatch.setattr(gh, "run_gh", github.run_gh)
+    monkeypatch.setattr(requests.Session, "request", lambda self, *a, **kw: todoist.request(self, *a, **kw))
+    monkeypatch.setattr(td, "reachable", lambda *a, **kw: True)
+    monkeypatch.setattr(rl, "SECONDARY_BACKOFF", 0.0)
+    # Every 429 drains the shared bucket; a large budget keeps the pacing after it short.
+    cfg.update_profile(lambda data: data.__setitem__("rate_limit", 90_000))
+
+    # Interleave repositories and repeat a few references, far apart.
+    refs = [f"{repo}#{n}" for n in range(1, ISSUES_PER_REPO + 1) for repo in REPOS]
+    refs += refs[:5]
+    path = tmp_path / "issues.txt"
+    path.write_text("\n".join(refs) + "\n", encoding="utf-8")
+    journal = str(tmp_path / "run.journal")
+    common = ["--backend", backend, "--output", "jsonl", "-j", "8", "--batch-size", "60", "--no-rules"]
+
+    started = time.perf_counter()
+    rc = cli.main(["--from-file", str(path), "--journal", journal, *common])
+    elapsed = time.perf_counter() - started
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert rc in (0, cli.EXIT_PARTIAL)
+
+    # One record per input line, in input order, whatever order requests finished in.
+    assert [f"{r['repo']}#{r['number']}" for r in records] == refs
+    assert all(r["status"] == "skipped" for r in records[-5:])
+    created = [r for r in records if r["status"] == "created"]
+    assert len({r["task_id"] for r in created}) == len(created)
+    assert all(len(ids) == 1 for ids in todoist.tasks.values())
+
+    # Flush what the circuit breaker queued and resume until nothing is left to retry.
+    # Sends that may have reached Todoist (lost answers, 5xx) are reported, never resent.
+    unique = refs[: len(REPOS) * ISSUES_PER_REPO]
+    store = st.Store()
+    try:
+        for _ in range(10):
+            cli.main(["flush", "--backend", backend])
+            cli.main(["--resume", journal, *common])
+            capsys.readouterr()
+            state = jr.load(journal)
+            settled = (jr.CREATED, jr.SUBMITTED, jr.QUEUED)
+            if not store.pending_count() and all(state.state_of(*_key(ref)) in settled for ref in unique):
+                break
+        assert not store.pending_count()
+    finally:
+        store.close()
+    assert all(len(ids) == 1 for ids in todoist.tasks.values())
+    for ref in unique:
+        assert _content(ref) in todoist.tasks or state.state_of(*_key(ref)) in (jr.SUBMITTED, jr.QUEUED)
+
+    bench_out = os.environ.get("GH_GT_BENCH_OUT")
+    if bench_out:
+        with open(bench_out, "a", encoding="utf-8") as f:
+            f.write(
+                f"stress backend={backend} seed={seed}: {len(refs)} refs, {len(created)} created on first pass"
+                f" in {elapsed:.2f}s ({len(created) / elapsed:.0f} tasks/s); {github.calls} gh calls,"
+                f" {todoist.requests} Todoist requests for {len(unique)} issues\n"
+            )
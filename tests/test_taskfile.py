@@ -0,0 +1,29 @@
+import gzip
+
+import pytest
+
+import gt.taskfile as tf
+
+
+def test_roundtrip_plain_and_gzip(tmp_path):
+    for name in ("tasks.ndjson", "tasks.ndjson.gz"):
+        path = str(tmp_path / name)
+        with tf.open_writer(path) as f:
+            tf.write_task(f, "a/b", 1, {"content": "#1 Ünïcode", "labels": ["bug"]})
+            tf.write_task(f, "a/b", 2, {"content": "#2 T"}, "abc123")
+        assert list(tf.read_tasks(path)) == [
+            ("a/b", 1, {"content": "#1 Ünïcode", "labels": ["bug"]}, None),
+            ("a/b", 2, {"content": "#2 T"}, "abc123"),
+        ]
+    # Compression is detected from the content, not the name.
+    renamed = tmp_path / "renamed"
+    renamed.write_bytes((tmp_path / "tasks.ndjson.gz").read_bytes())
+    assert len(list(tf.read_tasks(str(renamed)))) == 2
+    assert gzip.decompress(renamed.read_bytes()).count(b"\n") == 2
+
+
+def test_bad_record_names_the_line(tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    path.write_text('{"repo": "a/b", "number": 1, "task": {"content": "x"}}\n{"repo": "a/b"}\n', encoding="utf-8")
+    with pytest.raises(RuntimeError, match=r"tasks.ndjson:2"):
+        list(tf.read_tasks(str(path)))
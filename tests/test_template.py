@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+import gt.github as gh
+import gt.pipeline as pl
+from gt.template import compile_template
+
+
+def test_render_fields_filters_and_escapes():
+    t = compile_template("{{{name|upper}}}: {title | oneline}!", ["name", "title"])
+    assert t.names == {"name", "title"}
+    assert t.render({"name": "gt", "title": "  a\n b "}) == "{GT}: a b!"
+    assert compile_template("plain", []).render({}) == "plain"
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [("{nope}", "unknown field"), ("{title|shout}", "unknown filter"), ("a } b", "unmatched '}'"), ("{title", "unmatched '{'")],
+)
+def test_compile_errors(source, message):
+    with pytest.raises(ValueError, match=message):
+        compile_template(source, ["title"])
+
+
+def test_build_task_fields_uses_templates():
+    issue = gh.Issue(
+        number=7, title="Crash on start", body="**Steps**", html_url="https://github.com/a/b/issues/7", labels=["bug", "P1"]
+    )
+    opts = pl.ImportOptions(
+        strip_md=True,
+        content_template=pl.compile_template("[{repo}] {title} (#{number})"),
+        description_template=pl.compile_template("{labels}\n{body}\n{url}"),
+    )
+    fields = pl.build_task_fields(issue, opts)
+    assert fields["content"] == "[a/b] Crash on start (#7)"
+    assert fields["description"] == "bug, P1\nSteps\nhttps://github.com/a/b/issues/7"
+
+
+def test_rendering_10k_issues_is_negligible():
+    issues = [
+        gh.Issue(number=n, title=f"Issue {n}", body="text " * 200, html_url=f"https://github.com/a/b/issues/{n}", labels=["bug"])
+        for n in range(10_000)
+    ]
+    opts = pl.ImportOptions(
+        content_template=pl.compile_template("#{number} {title|oneline} [{labels}]"),
+        description_template=pl.compile_template("{body|first_line}\n\n{url}"),
+    )
+    started = time.perf_counter()
+    for issue in issues:
+        pl.build_task_fields(issue, opts)
+    templated = time.perf_counter() - started
+    started = time.perf_counter()
+    for issue in issues:
+        pl.build_task_fields(issue, pl.ImportOptions())
+    default = time.perf_counter() - started
+    # Tens of microseconds per issue; a small multiple of the hardcoded format.
+    assert templated < 1.0
+    assert templated < default * 3 + 0.05
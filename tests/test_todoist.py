@@ -1,6 +1,8 @@
 import sys
 import types
 
+import pytest
+
 import gt.todoist as td
 
 
@@ -32,7 +34,7 @@ class FakeAPI:
 def install_fake_sdk(monkeypatch):
     mod = types.ModuleType("todoist_api_python.api")
     mod.TodoistAPI = FakeAPI
-    sys.modules["todoist_api_python.api"] = mod
+    monkeypatch.setitem(sys.modules, "todoist_api_python.api", mod)
     return mod
 
 
@@ -65,16 +67,14 @@ def test_client_rest_fallback(monkeypatch):
         def json(self):
             return self._data
 
-    def fake_post(url, headers=None, json=None, timeout=0):  # noqa: A002
-        return Resp(200, {"id": "r1", "content": json["content"], "url": "http://t"})
-
-    def fake_get(url, headers=None, timeout=0):
+    def fake_request(self, method, url, json=None, timeout=0, **kw):  # noqa: A002
+        if method == "POST":
+            return Resp(200, {"id": "r1", "content": json["content"], "url": "http://t"})
         return Resp(200, [{"id": "p1", "name": "Inbox"}])
 
     import requests  # type: ignore
 
-    monkeypatch.setattr(requests, "post", fake_post)
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(requests.Session, "request", fake_request)
 
     client = td.TodoistClient()
     t = client.add_task(content="#2 Title")
@@ -98,7 +98,7 @@ def test_list_projects_rest_error(monkeypatch):
 
     import requests  # type: ignore
 
-    monkeypatch.setattr(requests, "get", lambda *a, **k: Resp())
+    monkeypatch.setattr(requests.Session, "request", lambda *a, **k: Resp())
     client = td.TodoistClient()
     try:
         client.list_projects()
@@ -111,3 +111,257 @@ def test_last_backend_default_rest(monkeypatch):
     monkeypatch.setenv("GT_DISABLE_TODOIST_SDK", "1")
     client = td.TodoistClient()
     assert client.last_backend() in {"rest", "sdk"}
+
+
+def test_rest_retries_after_429(monkeypatch):
+    monkeypatch.setenv("GT_DISABLE_TODOIST_SDK", "1")
+
+    class Resp:
+        def __init__(self, status_code, data=None, headers=None):
+            self.status_code = status_code
+            self._data = data or {}
+            self.headers = headers or {}
+            self.text = "slow down" if status_code == 429 else "ok"
+
+        def json(self):
+            return self._data
+
+    replies = [Resp(429, headers={"Retry-After": "0"}), Resp(200, {"id": "r2", "content": "c"})]
+
+    import requests  # type: ignore
+
+    monkeypatch.setattr(requests.Session, "request", lambda *a, **k: replies.pop(0))
+    client = td.TodoistClient()
+    assert client.add_task(content="c").id == "r2"
+    assert replies == []
+
+
+def test_create_labels_uses_one_sync_request(monkeypatch):
+    import json as _json
+
+    monkeypatch.setenv("GT_DISABLE_TODOIST_SDK", "1")
+    calls = []
+
+    class Resp:
+        status_code = 200
+        text = "ok"
+
+        def __init__(self, data):
+            self._data = data
+
+        def json(self):
+            return self._data
+
+    def fake_request(self, method, url, data=None, **kw):
+        commands = _json.loads(data["commands"])
+        calls.append(commands)
+        status = {c["uuid"]: "ok" for c in commands}
+        status[commands[-1]["uuid"]] = {"error": "LABEL_ALREADY_EXISTS"}
+        return Resp({"sync_status": status})
+
+    import requests  # type: ignore
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    client = td.TodoistClient()
+    created = client.create_labels(["a", "b", "c"])
+    assert len(calls) == 1
+    assert [c["args"]["name"] for c in calls[0]] == ["a", "b", "c"]
+    assert created == ["a", "b"]
+
+
+class _Resp:
+    status_code = 200
+    text = "ok"
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def test_auto_backend_remembers_what_worked(monkeypatch):
+    import gt.config as cfg
+    import requests  # type: ignore
+
+    monkeypatch.delenv("GT_DISABLE_TODOIST_SDK")
+    monkeypatch.setitem(sys.modules, "todoist_api_python.api", None)
+    monkeypatch.setattr(td, "_sdk_version", lambda: "none")
+    monkeypatch.setattr(requests.Session, "request", lambda *a, **k: _Resp({"id": "r1", "content": "c"}))
+
+    client = td.TodoistClient()
+    assert client.add_task(content="c").id == "r1"
+    assert cfg.read_json(td._capabilities_path()) == {"todoist-api-python==none": {"tasks": "rest"}}
+
+
+def test_auto_backend_uses_capability_record(monkeypatch):
+    import gt.config as cfg
+    import requests  # type: ignore
+
+    monkeypatch.delenv("GT_DISABLE_TODOIST_SDK")
+    install_fake_sdk(monkeypatch)
+    monkeypatch.setattr(td, "_sdk_version", lambda: "9.9")
+    cfg.write_json(td._capabilities_path(), {"todoist-api-python==9.9": {"tasks": "rest", "projects": "sdk"}})
+    calls = []
+
+    def fake_request(self, method, url, **kw):
+        calls.append((method, url))
+        return _Resp({"id": "r1", "content": "c"})
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    client = td.TodoistClient()
+    assert client.add_task(content="c").id == "r1"
+    assert client.last_backend() == "rest"
+    assert {p["name"] for p in client.list_projects()} == {"Inbox", "Work"}
+    assert client.last_backend() == "sdk"
+    assert calls == [("POST", td.REST_BASE + "/tasks")]
+
+
+def test_sync_backend_batches_task_creation(monkeypatch):
+    import json as _json
+    import requests  # type: ignore
+
+    calls = []
+
+    def fake_request(self, method, url, data=None, **kw):
+        commands = _json.loads(data["commands"])
+        calls.append(commands)
+        status = {c["uuid"]: "ok" for c in commands}
+        status[commands[-1]["uuid"]] = {"error": "invalid project"}
+        mapping = {c["temp_id"]: f"id{i}" for i, c in enumerate(commands[:-1])}
+        return _Resp({"sync_status": status, "temp_id_mapping": mapping})
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    client = td.TodoistClient(backend="sync")
+    results = client.add_tasks([{"content": "a", "due_string": "today"}, {"content": "b"}, {"content": "c"}])
+    assert len(calls) == 1
+    assert calls[0][0]["type"] == "item_add"
+    assert calls[0][0]["args"] == {"content": "a", "due": {"string": "today"}}
+    assert [r.id for r in results[:2]] == ["id0", "id1"]
+    assert isinstance(results[2], RuntimeError)
+    assert client.last_backend() == "sync"
+
+
+def test_rest_listing_follows_cursor_lazily(monkeypatch):
+    import requests  # type: ignore
+
+    pages = {None: {"results": [{"id": "p1", "name": "A"}], "next_cursor": "c2"}, "c2": {"results": [{"id": "p2", "name": "B", "parent_id": "p1"}]}}
+    calls = []
+
+    def fake_request(self, method, url, params=None, **kw):
+        cursor = (params or {}).get("cursor")
+        calls.append(cursor)
+        return _Resp(pages[cursor])
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    projects = td.TodoistClient().iter_projects()
+    assert next(projects) == {"id": "p1", "name": "A"}
+    assert calls == [None]
+    assert list(projects) == [{"id": "p2", "name": "B", "parent_id": "p1"}]
+    assert calls == [None, "c2"]
+
+
+def test_project_tree_from_one_sync_read(monkeypatch):
+    import requests  # type: ignore
+
+    calls = []
+
+    def fake_request(self, method, url, data=None, **kw):
+        calls.append((method, url))
+        return _Resp({
+            "projects": [
+                {"id": "c", "name": "Child", "parent_id": "w", "child_order": 1},
+                {"id": "w", "name": "Work", "child_order": 2},
+                {"id": "i", "name": "Inbox", "child_order": 1},
+                {"id": "x", "name": "Old", "is_archived": True},
+            ],
+            "sections": [
+                {"id": "s2", "name": "Later", "project_id": "w", "section_order": 2},
+                {"id": "s1", "name": "Now", "project_id": "w", "section_order": 1},
+            ],
+        })
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    tree = list(td.TodoistClient().project_tree())
+    assert calls == [("POST", td.SYNC_URL)]
+    assert [(p["name"], p["depth"]) for p in tree] == [("Inbox", 0), ("Work", 0), ("Child", 1)]
+    assert [s["name"] for s in tree[1]["sections"]] == ["Now", "Later"]
+
+
+def test_diff_fields_only_reports_changes():
+    old = {"content": "#1 A", "description": "x", "project_id": "p1", "section_id": None, "labels": ["b", "a"], "priority": None}
+    assert td.diff_fields(old, dict(old, labels=["a", "b"], description="x")) == {}
+    assert td.diff_fields(old, dict(old, content="#1 B", priority=4)) == {"content": "#1 B", "priority": 4}
+    # A move names both the project and the section.
+    assert td.diff_fields(old, dict(old, section_id="s9")) == {"project_id": "p1", "section_id": "s9"}
+
+
+def test_update_task_sends_changed_fields_and_moves(monkeypatch):
+    import json as _json
+    import requests  # type: ignore
+
+    sys.modules.pop("todoist_api_python.api", None)
+    calls = []
+
+    def fake_request(self, method, url, json=None, data=None, **kw):  # noqa: A002
+        if data:
+            commands = _json.loads(data["commands"])
+            calls.append(("sync", commands))
+            return _Resp({"sync_status": {c["uuid"]: "ok" for c in commands}})
+        calls.append((method, url, json))
+        return _Resp({})
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    client = td.TodoistClient()
+    client.update_task("t1", content="#1 B", labels=None, project_id="p2", section_id=None)
+    assert calls[0] == ("POST", td.REST_BASE + "/tasks/t1", {"content": "#1 B", "labels": []})
+    assert calls[1][0] == "sync"
+    assert [(c["type"], c["args"]) for c in calls[1][1]] == [("item_move", {"id": "t1", "project_id": "p2"})]
+
+
+def test_may_have_applied_only_for_ambiguous_failures():
+    import requests  # type: ignore
+
+    assert td.may_have_applied(requests.exceptions.ReadTimeout("slow"))
+    assert td.may_have_applied(td.TodoistError("bad gateway", status=502))
+    assert not td.may_have_applied(requests.exceptions.ConnectionError("refused"))
+    assert not td.may_have_applied(td.TodoistError("slow down", status=429))
+    assert not td.may_have_applied(td.TodoistError("bad request", status=400))
+
+    # SDK (httpx) status errors carry the status on their response.
+    httpx = pytest.importorskip("httpx")
+    request = httpx.Request("POST", "https://api.todoist.com/api/v1/tasks")
+    for status, expected in ((503, True), (429, False), (400, False)):
+        error = httpx.HTTPStatusError("x", request=request, response=httpx.Response(status, request=request))
+        try:
+            raise RuntimeError("Todoist add_task failed") from error
+        except RuntimeError as wrapped:
+            assert td.may_have_applied(wrapped) is expected
+
+
+def test_installed_sdk_gets_timeouts_retries_429_and_classifies_5xx(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("todoist_api_python.api")
+
+    # The default: auto mode with the SDK installed.
+    monkeypatch.delenv("GT_DISABLE_TODOIST_SDK")
+    answers = [
+        httpx.Response(429, headers={"Retry-After": "0"}, json={}),
+        httpx.Response(503, text="unavailable"),
+    ]
+    seen = []
+
+    def handle_request(self, request):
+        seen.append(request.url.path)
+        return answers.pop(0)
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", handle_request)
+    client = td.TodoistClient(connect_timeout=3, read_timeout=7)
+    assert client.last_backend() == "sdk"
+    timeout = client._lib_client._client.timeout
+    assert (timeout.connect, timeout.read) == (3, 7)
+
+    with pytest.raises(RuntimeError) as error:
+        client.add_task(content="c")
+    assert len(seen) == 2  # the 429 was retried
+    assert td.is_transient_error(error.value)
@@ -17,8 +17,9 @@ def test_strip_markdown_basic():
 def test_run_gh_builds_command(monkeypatch):
     calls = {}
 
-    def fake_run(cmd, stdout=None, stderr=None, text=None):  # noqa: A002
+    def fake_run(cmd, stdout=None, stderr=None, text=None, timeout=None):  # noqa: A002
         calls["cmd"] = cmd
+        calls["timeout"] = timeout
         class R:
             returncode = 0
             stdout = "{}"
@@ -28,9 +29,41 @@ def test_run_gh_builds_command(monkeypatch):
     monkeypatch.setattr(util.subprocess, "run", fake_run)
     res = util.run_gh(["--version"])  # just to exercise
     assert calls["cmd"][0] == "gh"
+    assert calls["timeout"] == 120.0
     assert res.returncode == 0
 
 
+def test_run_gh_timeout_becomes_failed_process(monkeypatch):
+    def fake_run(cmd, **kw):
+        raise util.subprocess.TimeoutExpired(cmd, kw["timeout"])
+
+    monkeypatch.setattr(util.subprocess, "run", fake_run)
+    res = util.run_gh(["api", "graphql"], timeout=3)
+    assert res.returncode == 124
+    assert "timed out after 3s" in res.stderr
+
+
+def test_run_gh_many_bounds_concurrency_and_keeps_order():
+    import threading
+    import time
+
+    lock = threading.Lock()
+    active = [0, 0]  # current, peak
+
+    def fake(args):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.02 * (5 - int(args[0]) % 5))
+        with lock:
+            active[0] -= 1
+        return args[0]
+
+    out = util.run_gh_many([[str(i)] for i in range(10)], jobs=3, run=fake)
+    assert out == [str(i) for i in range(10)]
+    assert active[1] == 3
+
+
 def test_open_url_branches(monkeypatch):
     opened = {"args": None}
 
@@ -63,3 +96,11 @@ def test_open_url_windows_branch(monkeypatch):
     monkeypatch.setattr(util.os, "startfile", lambda url: opened.setdefault("url", url), raising=False)
     util.open_url("http://w")
     assert opened.get("url") == "http://w"
+
+
+def test_truncate_utf8_keeps_characters_whole():
+    assert util.truncate_utf8("short", 10) == "short"
+    out = util.truncate_utf8("가나다라마", 10)
+    assert len(out.encode("utf-8")) <= 10
+    assert out.endswith("…")
+    assert out.startswith("가나")